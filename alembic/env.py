@@ -8,10 +8,17 @@ from sqlalchemy.ext.asyncio import async_engine_from_config
 import orm.base
 from alembic import context
 from orm.account import AccountOrm, TransactionOrm
+from orm.balance_checkpoint import BalanceCheckpointOrm
 from orm.bank_account import BankAccountOrm
-from orm.api import DB_URL, engine
+from orm.category_total import CategoryTotalOrm
+from orm.exchange_rate import ExchangeRateOrm
+from orm.engine import database_url, init, read_settings, shutdown
 from orm.organization import OrganizationOrm
-from orm.stock_account import StockAccountOrm
+from orm.partitions import is_partition
+from orm.stock_account import StockAccountOrm, StockTradeOrm
+from orm.transaction_archive import (TransactionArchiveOrm,
+                                    TransactionCompactionOrm)
+from orm.transaction_import import TransactionImportOrm
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -28,6 +35,12 @@ if config.config_file_name is not None:
 # target_metadata = mymodel.Base.metadata
 target_metadata = orm.base.Base.metadata
 
+
+def include_name(name, type_, parent_names) -> bool:
+    """Skips partitions of transactions, they are not mapped"""
+    return not (type_ == 'table' and is_partition(name))
+
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -47,10 +60,11 @@ def run_migrations_offline() -> None:
 
     """
     context.configure(
-        url=DB_URL,
+        url=database_url(read_settings()),
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_name=include_name,
     )
 
     with context.begin_transaction():
@@ -58,7 +72,9 @@ def run_migrations_offline() -> None:
 
 
 def do_run_migrations(connection: Connection) -> None:
-    context.configure(connection=connection, target_metadata=target_metadata)
+    context.configure(connection=connection,
+                      target_metadata=target_metadata,
+                      include_name=include_name)
 
     with context.begin_transaction():
         context.run_migrations()
@@ -70,10 +86,11 @@ async def run_async_migrations() -> None:
 
     """
 
+    engine = init()
     async with engine.connect() as connection:
         await connection.run_sync(do_run_migrations)
 
-    await engine.dispose()
+    await shutdown()
 
 
 def run_migrations_online() -> None:
@@ -0,0 +1,127 @@
+"""Partitioned transactions by month
+
+Revision ID: a83c5e1f9d24
+Revises: 177535a7063c
+Create Date: 2026-10-18 11:02:51.640187
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a83c5e1f9d24'
+down_revision: Union[str, None] = '177535a7063c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = 'id, uuid, value, currency, timing, reason, category, account_id'
+
+ENSURE_FUNCTION = """
+CREATE OR REPLACE FUNCTION ensure_transaction_partitions(
+    since timestamptz, until timestamptz) RETURNS void
+LANGUAGE plpgsql AS $$
+DECLARE
+    month_start timestamp := date_trunc(
+        'month', since AT TIME ZONE 'Europe/Moscow');
+    lower_bound timestamptz;
+    upper_bound timestamptz;
+    partition text;
+BEGIN
+    WHILE month_start AT TIME ZONE 'Europe/Moscow' <= until LOOP
+        partition := 'transactions_' || to_char(month_start, 'YYYY_MM');
+        lower_bound := month_start AT TIME ZONE 'Europe/Moscow';
+        month_start := month_start + interval '1 month';
+        upper_bound := month_start AT TIME ZONE 'Europe/Moscow';
+
+        CONTINUE WHEN to_regclass(partition) IS NOT NULL;
+
+        PERFORM pg_advisory_xact_lock(hashtext('transactions_partitions'));
+        CONTINUE WHEN to_regclass(partition) IS NOT NULL;
+
+        EXECUTE format('CREATE TABLE %I (LIKE transactions INCLUDING ALL)',
+                       partition);
+        EXECUTE format(
+            'WITH moved AS (DELETE FROM transactions_default'
+            ' WHERE timing >= $1 AND timing < $2 RETURNING *)'
+            ' INSERT INTO %I SELECT * FROM moved', partition)
+            USING lower_bound, upper_bound;
+        EXECUTE format(
+            'ALTER TABLE transactions ATTACH PARTITION %I'
+            ' FOR VALUES FROM (%L) TO (%L)',
+            partition, lower_bound, upper_bound);
+    END LOOP;
+END
+$$
+"""
+
+
+def _create_transactions(partitioned: bool) -> None:
+    # Keys of partitioned tables have to include the partition key
+    keys = []
+    options = {}
+    if partitioned:
+        keys = ['timing']
+        options = {'postgresql_partition_by': 'RANGE (timing)'}
+    op.create_table('transactions',
+    sa.Column('id', sa.Integer(), server_default=sa.text("nextval('transactions_id_seq')"), nullable=False),
+    sa.Column('uuid', sa.UUID(), nullable=False),
+    sa.Column('value', sa.DECIMAL(scale=2), nullable=False),
+    sa.Column('currency', sa.String(length=3), nullable=False),
+    sa.Column('timing', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('reason', sa.String(length=20), nullable=True),
+    sa.Column('category', sa.String(length=10), nullable=True),
+    sa.Column('account_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['account_id'], ['accounts.id'], ),
+    sa.PrimaryKeyConstraint('id', *keys),
+    sa.UniqueConstraint('account_id', 'uuid', *keys),
+    **options
+    )
+    op.execute('ALTER SEQUENCE transactions_id_seq OWNED BY transactions.id')
+
+
+def _replace_transactions(partitioned: bool) -> None:
+    """Recreates transactions with the same rows, old table is kept as
+    `transactions_old` until rows are copied"""
+    op.drop_index('ix_transactions_account_id_timing_id',
+                  table_name='transactions')
+    op.rename_table('transactions', 'transactions_old')
+    op.execute('ALTER INDEX transactions_pkey'
+               ' RENAME TO transactions_old_pkey')
+    for constraint in ('transactions_account_id_uuid_key',
+                       'transactions_account_id_uuid_timing_key'):
+        op.execute(f'ALTER TABLE transactions_old'
+                   f' DROP CONSTRAINT IF EXISTS {constraint}')
+
+    _create_transactions(partitioned)
+    op.create_index('ix_transactions_account_id_timing_id', 'transactions',
+                    ['account_id', 'timing', 'id'], unique=False)
+
+
+def upgrade() -> None:
+    _replace_transactions(partitioned=True)
+
+    op.execute('CREATE TABLE transactions_default'
+               ' PARTITION OF transactions DEFAULT')
+    op.execute(sa.text(ENSURE_FUNCTION))
+
+    # Partitions for the whole history and the next year
+    op.execute("""
+        SELECT ensure_transaction_partitions(
+            coalesce(min(timing), now()), now() + interval '1 year')
+        FROM transactions_old
+    """)
+    op.execute(f'INSERT INTO transactions ({COLUMNS})'
+               f' SELECT {COLUMNS} FROM transactions_old')
+    op.drop_table('transactions_old')
+
+
+def downgrade() -> None:
+    _replace_transactions(partitioned=False)
+
+    op.execute(f'INSERT INTO transactions ({COLUMNS})'
+               f' SELECT {COLUMNS} FROM transactions_old')
+    op.drop_table('transactions_old')
+    op.execute('DROP FUNCTION ensure_transaction_partitions')
@@ -0,0 +1,53 @@
+"""Compares per-keystroke field validation through a throwaway model
+instance with cached per-field validators
+
+Run from the repository root: python -m bench.field_validation
+"""
+import timeit
+from typing import Any, Optional
+
+from pydantic import BaseModel, ValidationError
+
+from money.account import Account
+from money.transaction import Transaction
+from money.utils import validate_field
+
+NUMBER = 20_000
+
+CASES = [
+    (Account, 'name', 'Some account'),
+    (Account, 'start_balance', '1000.50'),
+    (Transaction, 'value', '-120.00'),
+]
+
+
+def validate_assignment(model: BaseModel, field: str,
+                        value: Any) -> Optional[str]:
+    try:
+        model.__pydantic_validator__.validate_assignment(
+            model.model_construct(),
+            field,
+            value,
+        )
+    except ValidationError as e:
+        return e.errors()[0]['msg']
+
+
+def main():
+    print(f'{NUMBER} validations each, microseconds per call')
+    for model, field, value in CASES:
+        assert (validate_assignment(model, field, value) == validate_field(
+            model, field, value))
+
+        old = timeit.timeit(lambda: validate_assignment(model, field, value),
+                            number=NUMBER)
+        new = timeit.timeit(lambda: validate_field(model, field, value),
+                            number=NUMBER)
+
+        name = f'{model.__name__}.{field}'
+        print(f'{name:22} assignment {old / NUMBER * 1e6:6.2f}'
+              f'  registry {new / NUMBER * 1e6:6.2f}  {old / new:5.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""Compares validated and trusted loading of an account with long history
+
+Run from the repository root: python -m bench.trusted_load
+"""
+import time
+from datetime import timedelta
+from decimal import Decimal
+from uuid import uuid4
+
+from money.account import Account
+from money.utils import moscow_now
+from orm.account import AccountOrm, TransactionOrm
+
+TRANSACTIONS = 100_000
+REPEATS = 3
+
+
+def make_records(size: int):
+    start = moscow_now()
+    return [{
+        'uuid': uuid4(),
+        'value': Decimal(i % 1000).scaleb(-2),
+        'currency': 'RUB',
+        'timing': start + timedelta(minutes=i),
+        'reason': None,
+        'category': 'Еда',
+    } for i in range(size)]
+
+
+def make_account(transactions) -> dict:
+    return {
+        'id': 1,
+        'name': 'Benchmark',
+        'code': 'bench',
+        'start_date': moscow_now(),
+        'start_balance': Decimal(),
+        'transactions': transactions,
+    }
+
+
+def best_time(function, *args) -> float:
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        function(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    records = make_records(TRANSACTIONS)
+    account_orm = AccountOrm(
+        **make_account([TransactionOrm(**r) for r in records]))
+    account_records = make_account(records)
+
+    results = [
+        ('model_validate, ORM rows', lambda: Account.model_validate(
+            account_orm, from_attributes=True)),
+        ('from_trusted, ORM rows', lambda: Account.from_trusted(account_orm)),
+        ('model_validate, records',
+         lambda: Account.model_validate(account_records)),
+        ('from_trusted, records',
+         lambda: Account.from_trusted(account_records)),
+    ]
+
+    print(f'{TRANSACTIONS} transactions, best of {REPEATS}')
+    baseline = None
+    for name, function in results:
+        elapsed = best_time(function)
+        baseline = baseline or elapsed
+        print(f'{name:28} {elapsed:7.3f} s  {baseline / elapsed:5.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,6 @@
 import locale
-from typing import Union
+from decimal import Decimal
+from typing import Sequence, Union
 
 from aiogram import F, Router
 from aiogram.exceptions import TelegramBadRequest
@@ -13,10 +14,15 @@ from bot.main_menu import cancel_button, cancel_handler
 from bot.utils import DATE_FORMAT, unrecognized_handler
 from money.account import Account
 from money.bank_account import BankAccount
+from money.lookup import LookupIndex
 from money.stock_account import StockAccount
-from orm.api import (get_account_details, get_accounts,
-                     get_bank_account_details, get_bank_accounts,
-                     get_stock_account_details, get_stock_accounts)
+from orm.account import AccountOrm
+from orm.api import (get_account_balance, get_account_balances,
+                     get_account_index, get_accounts,
+                     get_bank_account_details, get_bank_account_index,
+                     get_bank_accounts, get_stock_account_details,
+                     get_stock_account_index, get_stock_accounts,
+                     get_typed_accounts)
 
 check_account_router = Router()
 
@@ -53,16 +59,11 @@ async def select_type(message: Message, state: FSMContext):
 
     account_type = message.text.split()[0].casefold()
     if account_type not in CheckAccountForm.allowed_types:
+        if await state.get_state() == CheckAccountForm.select_account:
+            return await find_account(message, state)
         return await unrecognized_handler(message)
 
-    if account_type == 'all':
-        accounts = await get_accounts()
-    elif account_type == 'bank':
-        accounts = await get_bank_accounts()
-    elif account_type == 'stock':
-        accounts = await get_stock_accounts()
-    else:
-        accounts = []
+    accounts = await get_accounts_of_type(account_type)
 
     if not accounts:
         await message.answer('No accounts of this type')
@@ -71,20 +72,54 @@ async def select_type(message: Message, state: FSMContext):
     await state.update_data(account_type=account_type, message_id=None)
     await state.set_state(CheckAccountForm.select_account)
 
+    balances = await get_account_balances([a.id for a in accounts])
     await message.answer(
-        'Select account',
-        reply_markup=accounts_inline_keyboard(accounts),
+        'Select account or type its name or code',
+        reply_markup=accounts_inline_keyboard(accounts, balances),
     )
 
 
-def describe_account(
-        account: Union[Account, BankAccount, StockAccount]) -> str:
+async def get_accounts_of_type(account_type: str) -> Sequence[AccountOrm]:
+    if account_type == 'all':
+        return await get_accounts()
+    elif account_type == 'bank':
+        return await get_bank_accounts()
+    elif account_type == 'stock':
+        return await get_stock_accounts()
+    return []
+
+
+async def get_index_of_type(account_type: str) -> LookupIndex[AccountOrm]:
+    if account_type == 'all':
+        return await get_account_index()
+    elif account_type == 'bank':
+        return await get_bank_account_index()
+    elif account_type == 'stock':
+        return await get_stock_account_index()
+    return LookupIndex()
+
+
+async def find_account(message: Message, state: FSMContext):
+    data = await state.get_data()
+
+    index = await get_index_of_type(data['account_type'])
+    accounts = index.match(message.text)
+    if not accounts:
+        await message.answer('No accounts match. Try again')
+        return
+
+    await message.answer('Select account',
+                         reply_markup=accounts_inline_keyboard(accounts))
+
+
+def describe_account(account: Union[Account, BankAccount, StockAccount],
+                     balance: Decimal) -> str:
     account_description = (
         f'Name: {account.name}\n'
         f'Code: {account.code}\n'
         f'Was opened at {account.start_date.strftime(DATE_FORMAT)}'
         f' with balance {locale.currency(account.start_balance)}\n'
-        f'Current balance is: {locale.currency(account.get_balance())}')
+        f'Current balance is: {locale.currency(balance)}')
 
     if isinstance(account, BankAccount):
         bank = account.bank
@@ -120,18 +155,22 @@ async def select_account(query: CallbackQuery, state: FSMContext):
     account_type = data['account_type']
 
     if account_type == 'all':
-        account = await get_account_details(account_id)
+        accounts = await get_typed_accounts([account_id])
+        account = accounts[0] if accounts else None
     elif account_type == 'bank':
-        account = await get_bank_account_details(account_id)
+        account = await get_bank_account_details(account_id,
+                                                 with_transactions=False)
     elif account_type == 'stock':
-        account = await get_stock_account_details(account_id)
+        account = await get_stock_account_details(account_id,
+                                                  with_transactions=False)
     else:
         return await query.answer('Not supported yet')
 
     if account is None:
         return await query.answer('No such account')
 
-    text = describe_account(account)
+    balance = await get_account_balance(account_id)
+    text = describe_account(account, balance)
 
     message_id = data.get('message_id')
     if message_id is not None:
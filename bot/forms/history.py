@@ -0,0 +1,214 @@
+import os
+from tempfile import TemporaryDirectory
+from typing import List, Optional, Tuple
+
+from aiogram import F, Router
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.fsm.context import FSMContext
+from aiogram.fsm.state import State, StatesGroup
+from aiogram.types import (FSInputFile, InlineKeyboardButton,
+                           InlineKeyboardMarkup, Message)
+from aiogram.types.callback_query import CallbackQuery
+from aiogram.utils.keyboard import InlineKeyboardBuilder
+
+from bot.keyboards.accounts_keyboard import accounts_inline_keyboard
+from bot.main_menu import cancel_handler
+from bot.utils import DATETIME_FORMAT
+from money.ledger import from_epoch, to_epoch
+from money.transaction import Transaction
+from orm.api import (Cursor, export_transactions, get_account_index,
+                     get_accounts, iter_transactions)
+
+history_router = Router()
+
+PAGE_SIZE = 10
+
+PREV = 'prev'
+NEXT = 'next'
+EXPORT = 'export'
+
+
+class HistoryForm(StatesGroup):
+    select_account = State()
+    browse = State()
+
+
+def encode_cursor(direction: str, cursor: Cursor) -> str:
+    timing, id = cursor
+    return f'{direction}:{to_epoch(timing)}:{id}'
+
+
+def decode_cursor(data: str) -> Optional[Tuple[str, Cursor]]:
+    parts = data.split(':')
+    if len(parts) != 3 or parts[0] not in (PREV, NEXT):
+        return None
+    if not parts[1].isnumeric() or not parts[2].isnumeric():
+        return None
+    return parts[0], (from_epoch(int(parts[1])), int(parts[2]))
+
+
+async def get_page(
+        account_id: int,
+        direction: str = NEXT,
+        cursor: Cursor = None
+) -> Tuple[List[Tuple[Cursor, Transaction]], bool, bool]:
+    """Page of transactions from the newest ones
+
+    Also returns whether there are newer and older transactions
+    """
+    if direction == PREV:
+        rows = [
+            row async for row in iter_transactions(
+                account_id, after=cursor, limit=PAGE_SIZE + 1)
+        ]
+        if len(rows) <= PAGE_SIZE:
+            return await get_page(account_id)
+        return rows[PAGE_SIZE - 1::-1], True, True
+
+    rows = [
+        row async for row in iter_transactions(
+            account_id, before=cursor, limit=PAGE_SIZE + 1)
+    ]
+    has_older = len(rows) > PAGE_SIZE
+    return rows[:PAGE_SIZE], cursor is not None, has_older
+
+
+def describe_page(rows: List[Tuple[Cursor, Transaction]]) -> str:
+    if not rows:
+        return 'No transactions'
+
+    lines = []
+    for _, transaction in rows:
+        line = (f'{transaction.timing.strftime(DATETIME_FORMAT)}'
+                f' {transaction.value:+} {transaction.currency}')
+        if transaction.category:
+            line = f'{line} [{transaction.category}]'
+        if transaction.reason:
+            line = f'{line} {transaction.reason}'
+        lines.append(line)
+    return '\n'.join(lines)
+
+
+def history_keyboard(rows: List[Tuple[Cursor, Transaction]], has_newer: bool,
+                     has_older: bool) -> InlineKeyboardMarkup:
+    keyboard = InlineKeyboardBuilder()
+
+    buttons = []
+    if has_newer:
+        buttons.append(
+            InlineKeyboardButton(text='Prev',
+                                 callback_data=encode_cursor(
+                                     PREV, rows[0][0])))
+    if has_older:
+        buttons.append(
+            InlineKeyboardButton(text='Next',
+                                 callback_data=encode_cursor(
+                                     NEXT, rows[-1][0])))
+    if buttons:
+        keyboard.row(*buttons)
+
+    keyboard.row(
+        InlineKeyboardButton(text='Export', callback_data=EXPORT),
+        InlineKeyboardButton(text='Cancel', callback_data='cancel'),
+    )
+
+    return keyboard.as_markup()
+
+
+@history_router.message(F.text.casefold() == 'history')
+async def start(message: Message, state: FSMContext):
+    accounts = await get_accounts()
+    if not accounts:
+        await message.answer('No accounts yet')
+        return
+
+    await state.set_state(HistoryForm.select_account)
+    await message.answer(
+        'Select account or type its name or code',
+        reply_markup=accounts_inline_keyboard(accounts),
+    )
+
+
+@history_router.message(HistoryForm.select_account)
+async def find_account(message: Message, state: FSMContext):
+    accounts = (await get_account_index()).match(message.text)
+    if not accounts:
+        await message.answer('No accounts match. Try again')
+        return
+
+    await message.answer('Select account',
+                         reply_markup=accounts_inline_keyboard(accounts))
+
+
+@history_router.callback_query(HistoryForm.select_account)
+async def select_account(query: CallbackQuery, state: FSMContext):
+    if query.data is None:
+        await query.answer('This message is outdated')
+        return
+    if query.data == 'cancel':
+        await query.answer('Cancelling')
+        await cancel_handler(query.message, state)
+        return
+    if not query.data.isnumeric():
+        await query.answer('Invalid callback')
+        return
+
+    account_id = int(query.data)
+    rows, has_newer, has_older = await get_page(account_id)
+
+    await state.update_data(account_id=account_id)
+    await state.set_state(HistoryForm.browse)
+    await query.message.answer(describe_page(rows),
+                               reply_markup=history_keyboard(
+                                   rows, has_newer, has_older))
+    await query.answer()
+
+
+@history_router.callback_query(HistoryForm.browse)
+async def browse(query: CallbackQuery, state: FSMContext):
+    if query.data is None:
+        await query.answer('This message is outdated')
+        return
+    if query.data == 'cancel':
+        await query.answer('Cancelling')
+        await cancel_handler(query.message, state)
+        return
+    if query.data == EXPORT:
+        await send_export(query, state)
+        return
+
+    decoded = decode_cursor(query.data)
+    if decoded is None:
+        await query.answer('Invalid callback')
+        return
+
+    data = await state.get_data()
+    rows, has_newer, has_older = await get_page(data['account_id'],
+                                                *decoded)
+
+    try:
+        await query.message.edit_text(describe_page(rows),
+                                      reply_markup=history_keyboard(
+                                          rows, has_newer, has_older))
+    except TelegramBadRequest as e:
+        if 'exactly the same' not in e.message:
+            raise
+    await query.answer()
+
+
+async def send_export(query: CallbackQuery, state: FSMContext):
+    """Uploads all transactions of account as a CSV document
+
+    Rows are streamed into a temporary file, so large histories are not
+    kept in memory
+    """
+    data = await state.get_data()
+    await query.answer('Exporting')
+
+    with TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'transactions.csv')
+        count = await export_transactions(path, 'csv', data['account_id'])
+        await query.message.answer_document(
+            FSInputFile(path),
+            caption=f'{count} transactions',
+        )
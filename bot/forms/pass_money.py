@@ -1,15 +1,21 @@
+from typing import Optional, Tuple
+
 from aiogram import F, Router
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
 from aiogram.types import KeyboardButton, Message, ReplyKeyboardMarkup
 from aiogram.types.callback_query import CallbackQuery
+from pydantic import ValidationError
 
 from bot.keyboards.accounts_keyboard import accounts_inline_keyboard
 from bot.main_menu import cancel_handler
-from bot.utils import collect_object_field
+from bot.utils import collect_value
 from money.account import Account
+from money.currency import BASE_CURRENCY
 from money.transaction import Transaction
-from orm.api import add_transactions, get_account_details, get_accounts
+from money.utils import validate_field
+from orm.api import (get_account_details, get_account_index, get_accounts,
+                     get_rate_store, transfer)
 from orm.exc import InvalidFieldsError
 
 pass_money_router = Router()
@@ -35,6 +41,28 @@ class PassMoneyForm(StatesGroup):
     ]
 
 
+def parse_sum(text: str) -> Tuple[str, str, str]:
+    """Splits `value [currency [target currency]]` input"""
+    value, *currencies = text.split()
+    currencies = [c.upper() for c in currencies]
+
+    currency = currencies[0] if currencies else BASE_CURRENCY
+    target_currency = currencies[1] if len(currencies) > 1 else currency
+    return value, currency, target_currency
+
+
+def validate_sum(text: str) -> Optional[str]:
+    parts = text.split()
+    if not 1 <= len(parts) <= 3:
+        return 'Expected sum with up to two currencies'
+
+    for currency in parts[1:]:
+        if len(currency) != 3 or not currency.isalpha():
+            return f'{currency} is not a currency code'
+
+    return validate_field(Transaction, 'value', parts[0])
+
+
 category_keyboard = ReplyKeyboardMarkup(
     keyboard=[[KeyboardButton(text=i) for i in PassMoneyForm.categories]],
     resize_keyboard=True,
@@ -48,7 +76,21 @@ async def start(message: Message, state: FSMContext):
     await state.set_state(PassMoneyForm.select_source)
 
     accounts = await get_accounts()
-    await message.answer('Select source account',
+    await message.answer(
+        'Select source account or type its name or code',
+        reply_markup=accounts_inline_keyboard(accounts),
+    )
+
+
+@pass_money_router.message(PassMoneyForm.select_source)
+@pass_money_router.message(PassMoneyForm.select_target)
+async def find_account(message: Message, state: FSMContext):
+    accounts = (await get_account_index()).match(message.text)
+    if not accounts:
+        await message.answer('No accounts match. Try again')
+        return
+
+    await message.answer('Select account',
                          reply_markup=accounts_inline_keyboard(accounts))
 
 
@@ -104,15 +146,17 @@ async def select_target_account(query: CallbackQuery, state: FSMContext):
     await state.set_state(PassMoneyForm.set_sum)
     await query.message.edit_text('Accounts selected:'
                                   f' from {source.name} to {target.name}')
-    await query.message.answer('Input sum')
+    await query.message.answer(
+        'Input sum. To pass money between currencies add source'
+        ' and target currencies, e.g. 100 USD RUB')
 
 
 @pass_money_router.message(PassMoneyForm.set_sum)
 async def set_sum(message: Message, state: FSMContext):
-    value = await collect_object_field(
+    value = await collect_value(
         message,
         state,
-        model=Transaction,
+        validator=validate_sum,
         field='value',
     )
     if value is None:
@@ -127,7 +171,14 @@ async def set_sum(message: Message, state: FSMContext):
 
 @pass_money_router.message(PassMoneyForm.set_category)
 async def set_category(message: Message, state: FSMContext):
-    await state.update_data(category=message.text)
+    category = await collect_value(
+        message,
+        state,
+        validator=lambda t: validate_field(Transaction, 'category', t),
+        field='category',
+    )
+    if category is None:
+        return
 
     await state.set_state(PassMoneyForm.set_comment)
     await message.answer('Input comment')
@@ -135,27 +186,46 @@ async def set_category(message: Message, state: FSMContext):
 
 @pass_money_router.message(PassMoneyForm.set_comment)
 async def set_comment(message: Message, state: FSMContext):
-    await state.update_data(category=message.text)
+    reason = await collect_value(
+        message,
+        state,
+        validator=lambda t: validate_field(Transaction, 'reason', t),
+        field='reason',
+    )
+    if reason is None:
+        return
 
     data = await state.get_data()
 
-    source: Account = await get_account_details(data['source_id'])
-    target: Account = await get_account_details(data['target_id'])
+    source: Account = data['source']
+    target: Account = data['target']
 
-    source.pass_money(
-        target=target,
-        value=data['value'],
-    )
+    value, currency, target_currency = parse_sum(data['value'])
 
-    try:
-        await add_transactions(source)
-        await add_transactions(target)
+    rates = None
+    if currency != target_currency:
+        rates = await get_rate_store()
 
-        text = (f'Transaction {source.name} -[{data["value"]}]-> {target.name} saved\n'
-                f'Actual balance: {source.name} ({source.get_balance()}), '
-                f'{target.name} ({target.get_balance()})')
-
-    except InvalidFieldsError:
+    try:
+        source_balance, target_balance = await transfer(
+            data['source_id'],
+            data['target_id'],
+            value,
+            category=data['category'],
+            reason=data['reason'],
+            currency=currency,
+            target_currency=target_currency,
+            rates=rates,
+        )
+    except KeyError as e:
+        await cancel_handler(message, state, e.args[0])
+        return
+    except (InvalidFieldsError, ValidationError):
         text = 'Error while saving transaction'
+    else:
+        text = (f'Transaction {source.name} -[{data["value"]}]->'
+                f' {target.name} saved\n'
+                f'Actual balance: {source.name} ({source_balance}), '
+                f'{target.name} ({target_balance})')
 
     await cancel_handler(message, state, text)
@@ -1,4 +1,6 @@
-from typing import List
+import locale
+from decimal import Decimal
+from typing import Dict, List
 
 from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 from aiogram.utils.keyboard import InlineKeyboardBuilder
@@ -7,11 +9,17 @@ from money.account import Account
 from orm.api import get_organizations
 
 
-def accounts_inline_keyboard(accounts: List[Account]) -> InlineKeyboardMarkup:
+def accounts_inline_keyboard(
+        accounts: List[Account],
+        balances: Dict[int, Decimal] = None) -> InlineKeyboardMarkup:
     keyboard = InlineKeyboardBuilder()
 
     for account in accounts:
-        button = InlineKeyboardButton(text=account.name,
+        text = account.name
+        if balances is not None and account.id in balances:
+            text = f'{text}: {locale.currency(balances[account.id])}'
+
+        button = InlineKeyboardButton(text=text,
                                       callback_data=f'{account.id}')
         keyboard.row(button)
 
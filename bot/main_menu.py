@@ -6,6 +6,7 @@ main_keyboard = ReplyKeyboardMarkup(
         [KeyboardButton(text='Check account')],
         [KeyboardButton(text='Add account')],
         [KeyboardButton(text='Pass money')],
+        [KeyboardButton(text='History')],
         # [KeyboardButton(text='Help')],
     ],
     resize_keyboard=True,
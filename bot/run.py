@@ -6,17 +6,19 @@ from aiogram import Bot
 from aiogram.enums import ParseMode
 
 from bot.logistics import dispatcher
-
-config = configparser.ConfigParser()
-config.read('settings.ini')
-
-API_TOKEN = config['bot']['ApiKey']
+from orm.api import init, shutdown
 
 
 async def main() -> None:
-    bot = Bot(API_TOKEN, parse_mode=ParseMode.HTML)
-
-    return await dispatcher.start_polling(bot)
+    config = configparser.ConfigParser()
+    config.read('settings.ini')
+
+    init()
+    bot = Bot(config['bot']['ApiKey'], parse_mode=ParseMode.HTML)
+    try:
+        return await dispatcher.start_polling(bot)
+    finally:
+        await shutdown()
 
 
 if __name__ == '__main__':
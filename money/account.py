@@ -1,11 +1,21 @@
 from datetime import datetime
 from decimal import Decimal
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
-from pydantic import AwareDatetime, BaseModel, ConfigDict, Field
+from pydantic import AwareDatetime, BaseModel, ConfigDict, Field, PrivateAttr
 
+from money.balance_index import BalanceIndex
+from money.currency import BASE_CURRENCY, RateStore
+from money.ledger import Ledger
 from money.transaction import Transaction
-from money.utils import moscow_now
+from money.utils import CENT, construct_trusted, moscow_now, trusted_fields
+
+# What the balance index depends on, per transaction
+IndexedRow = Tuple[int, datetime, Decimal, str]
+
+
+def _indexed_rows(transactions: List[Transaction]) -> List[IndexedRow]:
+    return [(id(t), t.timing, t.value, t.currency) for t in transactions]
 
 
 class Account(BaseModel):
@@ -21,6 +31,25 @@ class Account(BaseModel):
 
     transactions: List[Transaction] = []
 
+    _index: Optional[BalanceIndex] = PrivateAttr(default=None)
+    _indexed_rows: List[IndexedRow] = PrivateAttr(default_factory=list)
+    _checkpoint: Optional[Tuple[datetime, Decimal]] = PrivateAttr(
+        default=None)
+
+    @classmethod
+    def _trusted_data(cls, source: Any) -> Dict[str, Any]:
+        data = trusted_fields(cls, source)
+        data['transactions'] = [
+            Transaction.from_trusted(t)
+            for t in data.get('transactions', [])
+        ]
+        return data
+
+    @classmethod
+    def from_trusted(cls, source: Any) -> 'Account':
+        """Builds account without validation, e.g. from a database row"""
+        return construct_trusted(cls, cls._trusted_data(source))
+
     def __eq__(self, other):
         if isinstance(other, int):
             code = self.code.casefold()
@@ -37,38 +66,140 @@ class Account(BaseModel):
 
         return NotImplemented
 
-    def get_balance(self, time: datetime = None) -> Decimal:
+    def __hash__(self) -> int:
+        return hash(self.code.casefold())
+
+    @property
+    def checkpoint(self) -> Optional[Tuple[datetime, Decimal]]:
+        return self._checkpoint
+
+    def set_checkpoint(self, period_end: datetime, balance: Decimal):
+        """Known balance right before `period_end`
+
+        Later balances are computed from it, so only transactions since
+        `period_end` have to be loaded. Earlier balances, conversions and
+        ledgers need the full history and raise ValueError
+        """
+        self._checkpoint = (period_end, balance)
+
+    def _require_history(self, purpose: str):
+        if self._checkpoint is not None:
+            raise ValueError(f'{purpose} needs the full history,'
+                             ' account is loaded since a checkpoint')
+
+    def get_balance(self,
+                    time: datetime = None,
+                    in_currency: str = None,
+                    rates: RateStore = None) -> Decimal:
+        """Balance at `time`
+
+        Without `in_currency` values of all currencies are simply added.
+        Otherwise the balance of each currency is converted with `rates`
+        at `time`, the starting balance is in the base currency
+        """
         if time is None:
             time = moscow_now()
 
-        balance = self.start_balance
-
-        for transaction in self.transactions:
-            if transaction.timing >= time and transaction.timing <= self.start_date:
-                balance -= transaction.value
-            if transaction.timing <= time and transaction.timing >= self.start_date:
-                balance += transaction.value
-        return balance
+        index = self.get_index()
+        checkpoint = self._checkpoint
+        if in_currency is None:
+            if checkpoint is None:
+                return index.balance(time, self.start_date,
+                                     self.start_balance)
+            period_end, balance = checkpoint
+            if time < period_end:
+                self._require_history('Balance before the checkpoint')
+            return balance + index.sum_between(period_end, time)
+
+        self._require_history('Conversion of balance')
+        if rates is None:
+            raise ValueError('Exchange rates are required for conversion')
+
+        balances = index.currency_balances(time, self.start_date)
+        balances[BASE_CURRENCY] = (balances.get(BASE_CURRENCY, Decimal()) +
+                                   self.start_balance)
+
+        balance = sum(
+            rates.convert(value, currency, in_currency, time)
+            for currency, value in balances.items())
+        return balance.quantize(CENT)
+
+    def to_ledger(self) -> Ledger:
+        self._require_history('Ledger')
+        return Ledger.from_transactions(self.transactions)
+
+    def get_index(self) -> BalanceIndex:
+        """Index of transactions, appended ones are added to it
+
+        Any other change of the list or of indexed transactions rebuilds it
+        """
+        index = self._index
+        transactions = self.transactions
+        indexed = self._indexed_rows
+
+        if (index is None or
+                _indexed_rows(transactions[:len(indexed)]) != indexed):
+            index = BalanceIndex(transactions)
+
+            self._index = index
+            self._indexed_rows = _indexed_rows(transactions)
+            return index
+
+        added = transactions[len(indexed):]
+        for transaction in added:
+            index.add(transaction)
+        indexed.extend(_indexed_rows(added))
+        return index
 
     def pass_money(self,
                    target: 'Account',
                    value: Decimal,
-                   currency: str = 'RUB',
+                   currency: str = BASE_CURRENCY,
                    timing: datetime = None,
+                   target_currency: str = None,
+                   rates: RateStore = None,
                    **kwargs) -> 'Transaction':
-        if timing is None:
-            timing = moscow_now()
-
-        transaction = Transaction(
-            value=value,
+        transaction, twin = transfer_legs(
+            value,
             currency=currency,
             timing=timing,
+            target_currency=target_currency,
+            rates=rates,
             **kwargs,
         )
-        transaction.value = -transaction.value
-        twin = transaction.create_twin()
 
         self.transactions.append(transaction)
         target.transactions.append(twin)
 
         return transaction
+
+
+def transfer_legs(value: Decimal,
+                  currency: str = BASE_CURRENCY,
+                  timing: datetime = None,
+                  target_currency: str = None,
+                  rates: RateStore = None,
+                  **kwargs) -> Tuple[Transaction, Transaction]:
+    """Outgoing transaction of source and its twin for target"""
+    if timing is None:
+        timing = moscow_now()
+
+    transaction = Transaction(
+        value=value,
+        currency=currency,
+        timing=timing,
+        **kwargs,
+    )
+    transaction.value = -transaction.value
+
+    if target_currency is None or target_currency == currency:
+        twin = transaction.create_twin()
+    elif rates is None:
+        raise ValueError('Exchange rates are required for conversion')
+    else:
+        target_value = rates.convert(-transaction.value, currency,
+                                     target_currency, timing)
+        twin = transaction.create_twin(value=target_value.quantize(CENT),
+                                       currency=target_currency)
+
+    return transaction, twin
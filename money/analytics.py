@@ -0,0 +1,98 @@
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import List, Optional, Tuple
+
+from pydantic import BaseModel
+
+from money.account import Account
+from money.ledger import MICROSECOND, Ledger
+from money.utils import MOSCOW, moscow_now
+
+PERIODS = ['day', 'week', 'month']
+
+
+class CategoryTotal(BaseModel):
+    category: Optional[str] = None
+    month: date
+    currency: str
+    total: Decimal
+    count: int
+
+
+def month_start(time: datetime) -> date:
+    return time.astimezone(MOSCOW).date().replace(day=1)
+
+
+def _period_start(day: date, period: str) -> date:
+    if period == 'week':
+        return day - timedelta(days=day.weekday())
+    if period == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def _next_period(day: date, period: str) -> date:
+    if period == 'week':
+        return day + timedelta(weeks=1)
+    if period == 'month':
+        if day.month == 12:
+            return day.replace(year=day.year + 1, month=1)
+        return day.replace(month=day.month + 1)
+    return day + timedelta(days=1)
+
+
+def _local_midnight(day: date) -> datetime:
+    return MOSCOW.localize(datetime(day.year, day.month, day.day))
+
+
+def period_bounds(since: datetime, until: datetime,
+                  period: str) -> List[Tuple[datetime, datetime]]:
+    """Splits time into Moscow days, weeks or months
+
+    Returns (start, end) for each period touching [since, until], where
+    `end` is the last moment of the period or `until` for the last one
+    """
+    if period not in PERIODS:
+        raise ValueError(f'Period must be one of {PERIODS}')
+
+    day = _period_start(since.astimezone(MOSCOW).date(), period)
+    last = until.astimezone(MOSCOW).date()
+
+    bounds = []
+    while day <= last:
+        following = _next_period(day, period)
+
+        end = _local_midnight(following) - MICROSECOND
+        bounds.append((_local_midnight(day), min(end, until)))
+
+        day = following
+    return bounds
+
+
+def balance_series(account: Account,
+                   period: str = 'day',
+                   since: datetime = None,
+                   until: datetime = None,
+                   ledger: Ledger = None) -> List[Tuple[date, Decimal]]:
+    """Balance at the end of every period between `since` and `until`
+
+    Periods are labeled by their first day in Moscow time. All balances
+    are computed at once from the account ledger, pass `ledger` to reuse
+    an already built one
+    """
+    if since is None:
+        since = account.start_date
+    if until is None:
+        until = moscow_now()
+    if ledger is None:
+        ledger = account.to_ledger()
+
+    bounds = period_bounds(since, until, period)
+    balances = ledger.balances(
+        [end for _, end in bounds],
+        account.start_date,
+        account.start_balance,
+    )
+
+    return [(start.date(), balance)
+            for (start, _), balance in zip(bounds, balances)]
@@ -0,0 +1,61 @@
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from pydantic import BaseModel
+
+from money.account import Account
+from money.interest import INTEREST_CATEGORY
+from money.transaction import Transaction
+
+# Single-leg transactions that are not transfers between accounts
+SINGLE_LEG_CATEGORIES = (INTEREST_CATEGORY, )
+
+
+class TwinIssue(BaseModel):
+    uuid: UUID
+    legs: int
+    problem: str
+
+
+def twin_problem(legs: int, accounts: int, balanced: bool) -> Optional[str]:
+    if legs == 1:
+        return 'orphan'
+    if legs > 2:
+        return 'extra legs'
+    if accounts != 2:
+        return 'same account'
+    if not balanced:
+        return 'mismatch'
+    return None
+
+
+def find_twin_issues(
+    accounts: Iterable[Account],
+    exclude_categories: Sequence[str] = SINGLE_LEG_CATEGORIES,
+) -> List[TwinIssue]:
+    """Checks that every transaction has exactly one twin in other account
+
+    Legs are grouped by uuid in a hash index, so the check is linear
+    """
+    legs: Dict[UUID, List[Tuple[int, Transaction]]] = defaultdict(list)
+
+    for number, account in enumerate(accounts):
+        for transaction in account.transactions:
+            if transaction.category in exclude_categories:
+                continue
+            legs[transaction.uuid].append((number, transaction))
+
+    issues = []
+    for uuid, group in legs.items():
+        balanced = len(group) == 2 and group[0][1].is_twin(group[1][1])
+        problem = twin_problem(
+            len(group),
+            len({number for number, _ in group}),
+            balanced,
+        )
+
+        if problem is not None:
+            issues.append(TwinIssue(uuid=uuid, legs=len(group),
+                                    problem=problem))
+    return issues
@@ -0,0 +1,110 @@
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from decimal import Decimal
+from itertools import accumulate
+from typing import Dict, Iterable, List
+
+from money.transaction import Transaction
+
+
+def _insert_prefix(prefix: List[Decimal], position: int, value: Decimal):
+    if position == len(prefix) - 1:
+        prefix.append(prefix[-1] + value)
+        return
+
+    prefix.insert(position + 1, prefix[position] + value)
+    for i in range(position + 2, len(prefix)):
+        prefix[i] += value
+
+
+class BalanceIndex:
+    """Transactions sorted by timing with prefix sums of their values
+
+    Prefix sums are also kept for each currency separately. While all
+    transactions share one currency its prefix is the total one
+    """
+
+    timings: List[datetime]
+    values: List[Decimal]
+    currencies: List[str]
+
+    prefix: List[Decimal]
+    currency_prefix: Dict[str, List[Decimal]]
+
+    def __init__(self, transactions: Iterable[Transaction] = ()):
+        rows = sorted(((t.timing, t.value, t.currency) for t in transactions),
+                      key=lambda row: row[0])
+
+        self.timings = [timing for timing, _, _ in rows]
+        self.values = [value for _, value, _ in rows]
+        self.currencies = [currency for _, _, currency in rows]
+
+        self.prefix = [Decimal(), *accumulate(self.values)]
+        self.currency_prefix = {}
+
+        currencies = set(self.currencies)
+        if len(currencies) == 1:
+            self.currency_prefix[currencies.pop()] = self.prefix
+            return
+
+        for currency in currencies:
+            self.currency_prefix[currency] = [
+                Decimal(), *accumulate(
+                    v if c == currency else Decimal()
+                    for v, c in zip(self.values, self.currencies))
+            ]
+
+    def __len__(self) -> int:
+        return len(self.timings)
+
+    def add(self, transaction: Transaction):
+        value = transaction.value
+        currency = transaction.currency
+        position = bisect_right(self.timings, transaction.timing)
+
+        if not self.currency_prefix:
+            self.currency_prefix[currency] = self.prefix
+        elif currency not in self.currency_prefix:
+            for other, prefix in self.currency_prefix.items():
+                if prefix is self.prefix:
+                    self.currency_prefix[other] = prefix.copy()
+
+            self.currency_prefix[currency] = [Decimal()] * len(self.prefix)
+
+        self.timings.insert(position, transaction.timing)
+        self.values.insert(position, value)
+        self.currencies.insert(position, currency)
+
+        _insert_prefix(self.prefix, position, value)
+        for other, prefix in self.currency_prefix.items():
+            if prefix is self.prefix:
+                continue
+            _insert_prefix(prefix, position,
+                           value if other == currency else Decimal())
+
+    def _sum_between(self, prefix: List[Decimal], start: datetime,
+                     end: datetime) -> Decimal:
+        if end < start:
+            return Decimal()
+
+        right = bisect_right(self.timings, end)
+        left = bisect_left(self.timings, start)
+        return prefix[right] - prefix[left]
+
+    def sum_between(self, start: datetime, end: datetime) -> Decimal:
+        """Sum of values with `start <= timing <= end`"""
+        return self._sum_between(self.prefix, start, end)
+
+    def balance(self, time: datetime, start_date: datetime,
+                start_balance: Decimal) -> Decimal:
+        return (start_balance + self.sum_between(start_date, time) -
+                self.sum_between(time, start_date))
+
+    def currency_balances(self, time: datetime,
+                          start_date: datetime) -> Dict[str, Decimal]:
+        """Change of the balance since `start_date` for each currency"""
+        return {
+            currency: (self._sum_between(prefix, start_date, time) -
+                       self._sum_between(prefix, time, start_date))
+            for currency, prefix in self.currency_prefix.items()
+        }
@@ -1,5 +1,6 @@
 from datetime import timedelta
 from decimal import Decimal
+from typing import Any, Dict
 
 from pydantic import Field
 
@@ -11,3 +12,9 @@ class BankAccount(Account):
     bank: Organization
     annual_interest: Decimal = Field(default=Decimal(), decimal_places=2)
     interest_period: timedelta = Field(default_factory=timedelta)
+
+    @classmethod
+    def _trusted_data(cls, source: Any) -> Dict[str, Any]:
+        data = super()._trusted_data(source)
+        data['bank'] = Organization.from_trusted(data['bank'])
+        return data
@@ -0,0 +1,93 @@
+import csv
+from bisect import bisect_right
+from collections import OrderedDict
+from datetime import date, datetime
+from decimal import Decimal
+from os import PathLike
+from typing import Dict, Iterable, List, Tuple, Union
+
+from money.utils import MOSCOW
+
+BASE_CURRENCY = 'RUB'
+CACHE_SIZE = 4096
+
+# (currency, date, rate), where rate is a price of one unit in base currency
+RateRow = Tuple[str, date, Decimal]
+
+
+class RateStore:
+    """Exchange rates indexed by currency and date
+
+    Each currency keeps its dates sorted, so the rate for any day is the
+    latest one known on or before it (or the earliest one, if the day is
+    before all of them). Recent lookups are kept in an LRU cache.
+    """
+
+    def __init__(self,
+                 rows: Iterable[RateRow] = (),
+                 cache_size: int = CACHE_SIZE):
+        self._dates: Dict[str, List[date]] = {}
+        self._rates: Dict[str, List[Decimal]] = {}
+
+        self._cache: 'OrderedDict[Tuple[str, date], Decimal]' = OrderedDict()
+        self.cache_size = cache_size
+
+        self.extend(rows)
+
+    @classmethod
+    def from_file(cls, path: Union[str, PathLike], **kwargs) -> 'RateStore':
+        """Loads rates from CSV file with `currency,date,rate` columns"""
+        with open(path, newline='', encoding='utf-8') as file:
+            rows = [(row['currency'].upper(), date.fromisoformat(row['date']),
+                     Decimal(row['rate'])) for row in csv.DictReader(file)]
+        return cls(rows, **kwargs)
+
+    @property
+    def currencies(self) -> List[str]:
+        return [BASE_CURRENCY, *self._dates]
+
+    def extend(self, rows: Iterable[RateRow]):
+        updated = set()
+        for currency, day, rate in rows:
+            self._dates.setdefault(currency, []).append(day)
+            self._rates.setdefault(currency, []).append(rate)
+            updated.add(currency)
+
+        for currency in updated:
+            pairs = sorted(zip(self._dates[currency], self._rates[currency]))
+            self._dates[currency] = [day for day, _ in pairs]
+            self._rates[currency] = [rate for _, rate in pairs]
+
+        if updated:
+            self._cache.clear()
+
+    def rate(self, currency: str, at: Union[date, datetime]) -> Decimal:
+        if currency == BASE_CURRENCY:
+            return Decimal(1)
+
+        if isinstance(at, datetime):
+            at = at.astimezone(MOSCOW).date()
+
+        key = (currency, at)
+        rate = self._cache.get(key)
+        if rate is not None:
+            self._cache.move_to_end(key)
+            return rate
+
+        dates = self._dates.get(currency)
+        if not dates:
+            raise KeyError(f'No exchange rates for {currency}')
+
+        position = max(bisect_right(dates, at) - 1, 0)
+        rate = self._rates[currency][position]
+
+        self._cache[key] = rate
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return rate
+
+    def convert(self, value: Decimal, currency: str, to: str,
+                at: Union[date, datetime]) -> Decimal:
+        if currency == to:
+            return value
+        return value * self.rate(currency, at) / self.rate(to, at)
@@ -0,0 +1,49 @@
+import csv
+import json
+from typing import Any, Dict, TextIO
+
+from money.transaction import Transaction
+
+FORMATS = ['csv', 'jsonl']
+
+EXPORT_COLUMNS = [
+    'account_id', 'uuid', 'timing', 'value', 'currency', 'category', 'reason'
+]
+
+
+def export_record(account_id: int,
+                  transaction: Transaction) -> Dict[str, Any]:
+    return {
+        'account_id': account_id,
+        'uuid': str(transaction.uuid),
+        'timing': transaction.timing.isoformat(),
+        'value': str(transaction.value),
+        'currency': transaction.currency,
+        'category': transaction.category,
+        'reason': transaction.reason,
+    }
+
+
+class TransactionWriter:
+    """Writes transactions to a text file one row or line at a time"""
+
+    def __init__(self, file: TextIO, format: str = 'csv'):
+        if format not in FORMATS:
+            raise ValueError(f'Format must be one of {FORMATS}')
+
+        self.file = file
+        self.format = format
+        self.count = 0
+
+        self._csv = None
+        if format == 'csv':
+            self._csv = csv.DictWriter(file, EXPORT_COLUMNS)
+            self._csv.writeheader()
+
+    def write(self, account_id: int, transaction: Transaction):
+        record = export_record(account_id, transaction)
+        if self._csv is not None:
+            self._csv.writerow(record)
+        else:
+            self.file.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self.count += 1
@@ -0,0 +1,121 @@
+from bisect import bisect_right
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import List, Optional
+from uuid import NAMESPACE_OID, uuid5
+
+from pydantic import BaseModel
+
+from money.bank_account import BankAccount
+from money.ledger import MICROSECOND
+from money.transaction import Transaction
+from money.utils import CENT, moscow_now
+
+INTEREST_CATEGORY = 'Interest'
+INTEREST_REASON = 'Interest'
+
+YEAR = timedelta(days=365)
+
+
+class InterestAccrual(BaseModel):
+    postings: List[Transaction] = []
+    pending: Decimal = Decimal()
+
+
+def last_interest_posting(account: BankAccount) -> Optional[datetime]:
+    timings = [
+        t.timing for t in account.transactions
+        if t.category == INTEREST_CATEGORY
+    ]
+    return max(timings, default=None)
+
+
+def interest_posting(account: BankAccount, value: Decimal,
+                     timing: datetime) -> Transaction:
+    # Same period always gets the same uuid, so repeated runs
+    # are deduplicated when saved
+    uuid = uuid5(NAMESPACE_OID, f'{account.code}/{timing.isoformat()}')
+
+    return Transaction(
+        uuid=uuid,
+        value=value,
+        timing=timing,
+        reason=INTEREST_REASON,
+        category=INTEREST_CATEGORY,
+    )
+
+
+def accrue_interest(account: BankAccount,
+                    until: datetime = None,
+                    since: datetime = None) -> InterestAccrual:
+    """Computes interest postings for every full period up to `until`
+
+    Interest is accrued on the positive balance, which changes with every
+    transaction, and is posted at the end of each `interest_period`
+    counted from `since`. By default it continues from the last interest
+    posting or from the account start date. Interest accrued in the
+    unfinished period is returned as `pending`
+    """
+    accrual = InterestAccrual()
+
+    period = account.interest_period
+    if not period or not account.annual_interest:
+        return accrual
+
+    if account.checkpoint is not None:
+        raise ValueError('Interest needs the full history,'
+                         ' account is loaded since a checkpoint')
+
+    if until is None:
+        until = moscow_now()
+    if since is None:
+        since = last_interest_posting(account) or account.start_date
+
+    # Interest per unit of balance for one microsecond
+    rate = account.annual_interest / 100 / (YEAR // MICROSECOND)
+
+    index = account.get_index()
+    balance = index.balance(since, account.start_date, account.start_balance)
+    position = bisect_right(index.timings, since)
+
+    period_start = since
+    while period_start < until:
+        period_end = min(period_start + period, until)
+
+        accrued = Decimal()
+        moment = period_start
+        while (position < len(index)
+               and index.timings[position] < period_end):
+            timing = index.timings[position]
+            accrued += max(balance, Decimal()) * ((timing - moment) //
+                                                   MICROSECOND)
+
+            balance += index.values[position]
+            moment = timing
+            position += 1
+
+        accrued += max(balance, Decimal()) * ((period_end - moment) //
+                                               MICROSECOND)
+        interest = accrued * rate
+
+        if period_end - period_start < period:
+            accrual.pending = interest.quantize(CENT)
+            break
+
+        interest = interest.quantize(CENT)
+        if interest:
+            accrual.postings.append(
+                interest_posting(account, interest, period_end))
+            balance += interest
+
+        period_start = period_end
+
+    return accrual
+
+
+def post_interest(account: BankAccount,
+                  until: datetime = None) -> List[Transaction]:
+    """Accrues interest since the last posting and adds it to the account"""
+    accrual = accrue_interest(account, until)
+    account.transactions.extend(accrual.postings)
+    return accrual.postings
@@ -0,0 +1,261 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+import numpy as np
+from pytz import utc
+
+from money.transaction import Transaction
+from money.utils import MOSCOW
+
+MINOR_DIGITS = 2
+
+EPOCH = datetime(1970, 1, 1, tzinfo=utc)
+MICROSECOND = timedelta(microseconds=1)
+
+NO_CODE = -1
+
+# (uuid, value, currency, timing, reason, category), e.g. a database row
+Row = Tuple[UUID, Decimal, str, datetime, Optional[str], Optional[str]]
+
+
+def to_minor(value: Decimal) -> int:
+    return int(value.scaleb(MINOR_DIGITS).to_integral_value())
+
+
+def from_minor(value: int) -> Decimal:
+    return Decimal(int(value)).scaleb(-MINOR_DIGITS)
+
+
+def to_epoch(time: datetime) -> int:
+    return (time - EPOCH) // MICROSECOND
+
+
+def from_epoch(value: int) -> datetime:
+    return (EPOCH + timedelta(microseconds=int(value))).astimezone(MOSCOW)
+
+
+class _Dictionary:
+    """Encodes repeating strings as small integer codes"""
+
+    def __init__(self):
+        self.names: List[str] = []
+        self.codes: Dict[str, int] = {}
+
+    def encode(self, name: Optional[str]) -> int:
+        if name is None:
+            return NO_CODE
+
+        code = self.codes.get(name)
+        if code is None:
+            code = len(self.names)
+            self.codes[name] = code
+            self.names.append(name)
+        return code
+
+    def decode(self, code: int) -> Optional[str]:
+        if code == NO_CODE:
+            return None
+        return self.names[code]
+
+
+class Ledger:
+    """Columnar storage of transactions
+
+    Values are kept as integer minor units, timings as microseconds since
+    the epoch and uuids as one packed buffer of 16-byte chunks. Currencies
+    and categories are dictionary-encoded. Rows are materialized as
+    `Transaction` objects only when accessed.
+    """
+
+    def __init__(self, capacity: int = 0):
+        self._size = 0
+
+        self._values = np.zeros(capacity, dtype=np.int64)
+        self._timings = np.zeros(capacity, dtype=np.int64)
+        self._currencies = np.zeros(capacity, dtype=np.int32)
+        self._categories = np.zeros(capacity, dtype=np.int32)
+
+        self._uuids = bytearray()
+        self._reasons: List[Optional[str]] = []
+
+        self._currency_names = _Dictionary()
+        self._category_names = _Dictionary()
+
+        self._sorted: Optional[Tuple[np.ndarray, np.ndarray]] = None
+
+    @classmethod
+    def from_transactions(cls,
+                          transactions: Sequence[Transaction]) -> 'Ledger':
+        ledger = cls(capacity=len(transactions))
+        ledger.extend(transactions)
+        return ledger
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[Row]) -> 'Ledger':
+        ledger = cls(capacity=len(rows))
+        ledger.extend_rows(rows)
+        return ledger
+
+    @property
+    def values(self) -> np.ndarray:
+        return self._values[:self._size]
+
+    @property
+    def timings(self) -> np.ndarray:
+        return self._timings[:self._size]
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[Transaction]:
+        for i in range(self._size):
+            yield self[i]
+
+    def __getitem__(self, i: int) -> Transaction:
+        if i < 0:
+            i += self._size
+        if not 0 <= i < self._size:
+            raise IndexError('Ledger index out of range')
+
+        return Transaction.model_construct(
+            uuid=UUID(bytes=bytes(self._uuids[16 * i:16 * (i + 1)])),
+            value=from_minor(self._values[i]),
+            currency=self._currency_names.decode(self._currencies[i]),
+            timing=from_epoch(self._timings[i]),
+            reason=self._reasons[i],
+            category=self._category_names.decode(self._categories[i]),
+        )
+
+    def _reserve(self, size: int):
+        capacity = len(self._values)
+        if size <= capacity:
+            return
+
+        capacity = max(size, 2 * capacity, 16)
+        for name in ('_values', '_timings', '_currencies', '_categories'):
+            column = getattr(self, name)
+            grown = np.zeros(capacity, dtype=column.dtype)
+            grown[:self._size] = column[:self._size]
+            setattr(self, name, grown)
+
+    def _append(self, uuid: UUID, value: Decimal, currency: str,
+                timing: datetime, reason: Optional[str],
+                category: Optional[str]):
+        self._reserve(self._size + 1)
+
+        i = self._size
+        self._values[i] = to_minor(value)
+        self._timings[i] = to_epoch(timing)
+        self._currencies[i] = self._currency_names.encode(currency)
+        self._categories[i] = self._category_names.encode(category)
+
+        self._uuids += uuid.bytes
+        self._reasons.append(reason)
+
+        self._size += 1
+        self._sorted = None
+
+    def append(self, transaction: Transaction):
+        self._append(
+            transaction.uuid,
+            transaction.value,
+            transaction.currency,
+            transaction.timing,
+            transaction.reason,
+            transaction.category,
+        )
+
+    def extend(self, transactions: Iterable[Transaction]):
+        for transaction in transactions:
+            self.append(transaction)
+
+    def extend_rows(self, rows: Iterable[Row]):
+        for row in rows:
+            self._append(*row)
+
+    def _get_sorted(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns sorted timings and prefix sums of values in that order"""
+        if self._sorted is None:
+            order = np.argsort(self.timings, kind='stable')
+            prefix = np.zeros(self._size + 1, dtype=np.int64)
+            np.cumsum(self.values[order], out=prefix[1:])
+
+            self._sorted = (self.timings[order], prefix)
+        return self._sorted
+
+    def _sums_between(self, start: np.ndarray, end: np.ndarray) -> np.ndarray:
+        """Sums of values with `start <= timing <= end`, in minor units"""
+        timings, prefix = self._get_sorted()
+
+        right = np.searchsorted(timings, end, side='right')
+        left = np.searchsorted(timings, start, side='left')
+        return np.where(end < start, 0, prefix[right] - prefix[left])
+
+    def balances(self, times: Sequence[datetime], start_date: datetime,
+                 start_balance: Decimal) -> List[Decimal]:
+        """Balances at every one of `times`, same as `Account.get_balance`"""
+        times = np.fromiter((to_epoch(t) for t in times),
+                            dtype=np.int64,
+                            count=len(times))
+        start = np.full_like(times, to_epoch(start_date))
+
+        balances = (to_minor(start_balance) +
+                    self._sums_between(start, times) -
+                    self._sums_between(times, start))
+        return [from_minor(b) for b in balances]
+
+    def balance(self, time: datetime, start_date: datetime,
+                start_balance: Decimal) -> Decimal:
+        return self.balances([time], start_date, start_balance)[0]
+
+    def _mask(self,
+              since: datetime = None,
+              until: datetime = None,
+              currency: str = None,
+              category: str = None) -> np.ndarray:
+        mask = np.ones(self._size, dtype=bool)
+
+        if since is not None:
+            mask &= self.timings >= to_epoch(since)
+        if until is not None:
+            mask &= self.timings <= to_epoch(until)
+        if currency is not None:
+            code = self._currency_names.codes.get(currency, NO_CODE)
+            mask &= self._currencies[:self._size] == code
+        if category is not None:
+            code = self._category_names.codes.get(category, NO_CODE)
+            mask &= self._categories[:self._size] == code
+        return mask
+
+    def sum(self,
+            since: datetime = None,
+            until: datetime = None,
+            currency: str = None,
+            category: str = None) -> Decimal:
+        mask = self._mask(since, until, currency, category)
+        return from_minor(self.values[mask].sum())
+
+    def filter(self,
+               since: datetime = None,
+               until: datetime = None,
+               currency: str = None,
+               category: str = None) -> 'Ledger':
+        mask = self._mask(since, until, currency, category)
+        indices = np.flatnonzero(mask)
+
+        ledger = Ledger()
+        ledger._size = len(indices)
+        ledger._values = self.values[indices]
+        ledger._timings = self.timings[indices]
+        ledger._currencies = self._currencies[indices]
+        ledger._categories = self._categories[indices]
+
+        uuids = np.frombuffer(self._uuids, dtype='V16')
+        ledger._uuids = bytearray(uuids[indices].tobytes())
+        ledger._reasons = [self._reasons[i] for i in indices]
+
+        ledger._currency_names = self._currency_names
+        ledger._category_names = self._category_names
+        return ledger
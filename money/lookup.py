@@ -0,0 +1,91 @@
+from typing import (Callable, Dict, Generic, Iterable, List, Optional,
+                    TypeVar)
+
+Item = TypeVar('Item')
+
+SUGGESTIONS = 10
+
+
+def normalize(text: str) -> str:
+    return text.casefold().strip()
+
+
+def account_keys(account) -> List[str]:
+    return [account.name, account.code]
+
+
+def organization_keys(organization) -> List[str]:
+    return [organization.name, organization.shortcut]
+
+
+class _Node(Generic[Item]):
+    __slots__ = ('children', 'items')
+
+    def __init__(self):
+        self.children: Dict[str, _Node[Item]] = {}
+        self.items: List[Item] = []
+
+
+class LookupIndex(Generic[Item]):
+    """Finds objects by casefolded keys, like account name or code
+
+    Exact keys are looked up in a dict, prefixes are completed with a trie
+    """
+
+    def __init__(self,
+                 items: Iterable[Item] = (),
+                 keys: Callable[[Item], Iterable[str]] = account_keys):
+        self.keys = keys
+
+        self._exact: Dict[str, Item] = {}
+        self._root: _Node[Item] = _Node()
+
+        for item in items:
+            self.add(item)
+
+    def __len__(self) -> int:
+        return len(self._exact)
+
+    def add(self, item: Item):
+        for key in self.keys(item):
+            key = normalize(str(key))
+
+            self._exact.setdefault(key, item)
+
+            node = self._root
+            for char in key:
+                node = node.children.setdefault(char, _Node())
+            node.items.append(item)
+
+    def get(self, text: str) -> Optional[Item]:
+        return self._exact.get(normalize(text))
+
+    def complete(self, prefix: str, limit: int = SUGGESTIONS) -> List[Item]:
+        """Items with any key starting with `prefix`, shorter keys first"""
+        node = self._root
+        for char in normalize(prefix):
+            node = node.children.get(char)
+            if node is None:
+                return []
+
+        found = []
+        seen = set()
+        level = [node]
+        while level and len(found) < limit:
+            for node in level:
+                for item in node.items:
+                    if id(item) in seen:
+                        continue
+                    seen.add(id(item))
+                    found.append(item)
+            level = [
+                child for node in level for child in node.children.values()
+            ]
+        return found[:limit]
+
+    def match(self, text: str, limit: int = SUGGESTIONS) -> List[Item]:
+        """Exact match if there is one, completions of `text` otherwise"""
+        item = self.get(text)
+        if item is not None:
+            return [item]
+        return self.complete(text, limit)
@@ -1,6 +1,8 @@
-from typing import Optional
+from typing import Any, Optional
 from pydantic import BaseModel, Field
 
+from money.utils import construct_trusted, trusted_fields
+
 
 class Organization(BaseModel):
     id: Optional[int] = None
@@ -8,6 +10,10 @@ class Organization(BaseModel):
     name: str = Field(max_length=50)
     shortcut: str = Field(max_length=10)
 
+    @classmethod
+    def from_trusted(cls, source: Any) -> 'Organization':
+        return construct_trusted(cls, trusted_fields(cls, source))
+
     def __eq__(self, other):
         if isinstance(other, str):
             other = other.casefold().strip()
@@ -22,3 +28,6 @@ class Organization(BaseModel):
             return ((self.name.casefold() == name)
                     and (self.shortcut.casefold() == shortcut))
         return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash((self.name.casefold(), self.shortcut.casefold()))
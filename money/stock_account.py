@@ -1,13 +1,31 @@
 from decimal import Decimal
+from typing import Any, Dict, List
 
 from pydantic import Field
 
 from money.account import Account
 from money.organization import Organization
+from money.stock_position import FIFO, Portfolio, StockTrade
+from money.utils import construct_trusted, trusted_fields
 
 
 class StockAccount(Account):
     broker: Organization
     is_iia: bool = False
 
-    stock_value: Decimal = Field(default=0, decimal_places=2)
+    stock_value: Decimal = Field(default=Decimal(), decimal_places=2)
+
+    trades: List[StockTrade] = []
+
+    @classmethod
+    def _trusted_data(cls, source: Any) -> Dict[str, Any]:
+        data = super()._trusted_data(source)
+        data['broker'] = Organization.from_trusted(data['broker'])
+        data['trades'] = [
+            construct_trusted(StockTrade, trusted_fields(StockTrade, t))
+            for t in data.get('trades', [])
+        ]
+        return data
+
+    def get_portfolio(self, method: str = FIFO) -> Portfolio:
+        return Portfolio(self.trades, method)
@@ -0,0 +1,218 @@
+from collections import deque
+from datetime import date
+from decimal import Decimal
+from os import PathLike
+from pathlib import Path
+from typing import Deque, Dict, Iterable, List, Optional, Sequence, Tuple
+from uuid import UUID, uuid4
+
+import numpy as np
+from pydantic import AwareDatetime, BaseModel, Field
+
+from money.utils import moscow_now
+
+FIFO = 'fifo'
+AVERAGE = 'average'
+METHODS = [FIFO, AVERAGE]
+
+PRICE_DIGITS = 4
+EPOCH_DAY = date(1970, 1, 1)
+
+# (ticker, date, price)
+PriceRow = Tuple[str, date, Decimal]
+
+
+class StockTrade(BaseModel):
+    uuid: UUID = Field(default_factory=uuid4)
+    ticker: str = Field(max_length=12)
+
+    # Positive for buys, negative for sells
+    quantity: Decimal = Field(decimal_places=6)
+    price: Decimal = Field(ge=0, decimal_places=PRICE_DIGITS)
+
+    timing: AwareDatetime = Field(default_factory=moscow_now)
+
+
+class Lot:
+    __slots__ = ('quantity', 'price')
+
+    def __init__(self, quantity: Decimal, price: Decimal):
+        self.quantity = quantity
+        self.price = price
+
+
+class Position:
+    """Holdings of one ticker as a queue of bought lots
+
+    With FIFO cost basis sells consume the oldest lots first. With average
+    cost basis all lots are merged into one at their average price.
+    """
+
+    def __init__(self, ticker: str, method: str = FIFO):
+        if method not in METHODS:
+            raise ValueError(f'Method must be one of {METHODS}')
+
+        self.ticker = ticker
+        self.method = method
+
+        self.lots: Deque[Lot] = deque()
+        self.quantity = Decimal()
+        self.cost = Decimal()
+        self.realized = Decimal()
+
+    @property
+    def average_cost(self) -> Decimal:
+        if not self.quantity:
+            return Decimal()
+        return self.cost / self.quantity
+
+    def buy(self, quantity: Decimal, price: Decimal):
+        self.quantity += quantity
+        self.cost += quantity * price
+
+        if self.method == AVERAGE:
+            self.lots = deque([Lot(self.quantity, self.average_cost)])
+        else:
+            self.lots.append(Lot(quantity, price))
+
+    def sell(self, quantity: Decimal, price: Decimal) -> Decimal:
+        """Removes sold shares from lots, returns realized profit"""
+        if quantity > self.quantity:
+            raise ValueError(
+                f'Cannot sell {quantity} {self.ticker}, only'
+                f' {self.quantity} held')
+
+        realized = Decimal()
+        remaining = quantity
+        while remaining:
+            lot = self.lots[0]
+            sold = min(lot.quantity, remaining)
+
+            realized += sold * (price - lot.price)
+            self.cost -= sold * lot.price
+
+            lot.quantity -= sold
+            remaining -= sold
+            if not lot.quantity:
+                self.lots.popleft()
+
+        self.quantity -= quantity
+        self.realized += realized
+        return realized
+
+    def apply(self, trade: StockTrade) -> Decimal:
+        if trade.quantity > 0:
+            self.buy(trade.quantity, trade.price)
+            return Decimal()
+        return self.sell(-trade.quantity, trade.price)
+
+    def unrealized(self, price: Decimal) -> Decimal:
+        return self.quantity * price - self.cost
+
+
+class PriceHistory:
+    """Daily prices stored in memory-mapped NumPy files
+
+    Prices are sorted by a key combining ticker number and day, so the
+    latest price on or before a date is found for many tickers at once
+    with one `searchsorted` over the mapped keys
+    """
+
+    def __init__(self, directory: PathLike):
+        directory = Path(directory)
+
+        tickers = np.load(directory / 'tickers.npy')
+        self.tickers: Dict[str, int] = {
+            str(t): i
+            for i, t in enumerate(tickers)
+        }
+
+        self.keys = np.load(directory / 'keys.npy', mmap_mode='r')
+        self.values = np.load(directory / 'prices.npy', mmap_mode='r')
+
+    @staticmethod
+    def _key(ticker: np.ndarray, day: np.ndarray) -> np.ndarray:
+        return (ticker.astype(np.int64) << 32) | day.astype(np.int64)
+
+    @staticmethod
+    def write(directory: PathLike, rows: Iterable[PriceRow]):
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+
+        tickers: Dict[str, int] = {}
+        numbers, days, prices = [], [], []
+        for ticker, day, price in rows:
+            numbers.append(tickers.setdefault(ticker, len(tickers)))
+            days.append((day - EPOCH_DAY).days)
+            scaled = price.scaleb(PRICE_DIGITS)
+            if scaled != scaled.to_integral_value():
+                raise ValueError(f'{ticker} price {price} on {day} has more '
+                                 f'than {PRICE_DIGITS} decimal places')
+            prices.append(int(scaled))
+
+        keys = PriceHistory._key(np.array(numbers, dtype=np.int64),
+                                 np.array(days, dtype=np.int64))
+        order = np.argsort(keys, kind='stable')
+
+        np.save(directory / 'tickers.npy', np.array(list(tickers), dtype=str))
+        np.save(directory / 'keys.npy', keys[order])
+        np.save(directory / 'prices.npy',
+                np.array(prices, dtype=np.int64)[order])
+
+    def prices(self, tickers: Sequence[str],
+               at: date) -> List[Optional[Decimal]]:
+        """Latest prices on or before `at`, None for unknown tickers"""
+        if not len(self.keys):
+            return [None] * len(tickers)
+
+        numbers = np.array([self.tickers.get(t, -1) for t in tickers],
+                           dtype=np.int64)
+        keys = self._key(numbers, np.full_like(numbers,
+                                               (at - EPOCH_DAY).days))
+
+        positions = np.searchsorted(self.keys, keys, side='right') - 1
+        clipped = positions.clip(0)
+        found = ((numbers >= 0) & (positions >= 0) &
+                 ((self.keys[clipped] >> 32) == numbers))
+
+        values = self.values[clipped]
+        return [
+            Decimal(int(v)).scaleb(-PRICE_DIGITS) if f else None
+            for v, f in zip(values, found)
+        ]
+
+
+class Portfolio:
+    """Positions built by replaying trades in time order"""
+
+    def __init__(self, trades: Iterable[StockTrade] = (), method: str = FIFO):
+        self.method = method
+        self.positions: Dict[str, Position] = {}
+
+        for trade in sorted(trades, key=lambda t: t.timing):
+            self.apply(trade)
+
+    def apply(self, trade: StockTrade) -> Decimal:
+        position = self.positions.get(trade.ticker)
+        if position is None:
+            position = Position(trade.ticker, self.method)
+            self.positions[trade.ticker] = position
+        return position.apply(trade)
+
+    @property
+    def realized(self) -> Decimal:
+        return sum((p.realized for p in self.positions.values()), Decimal())
+
+    def valuate(self, history: PriceHistory,
+                at: date) -> Dict[str, Tuple[Decimal, Decimal]]:
+        """Market value and unrealized profit of every held position
+
+        Positions without known price are skipped
+        """
+        held = [p for p in self.positions.values() if p.quantity]
+        prices = history.prices([p.ticker for p in held], at)
+
+        return {
+            p.ticker: (p.quantity * price, p.unrealized(price))
+            for p, price in zip(held, prices) if price is not None
+        }
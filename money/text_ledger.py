@@ -0,0 +1,87 @@
+import logging
+from contextlib import nullcontext
+from itertools import islice
+from os import PathLike
+from typing import (Callable, ContextManager, Iterable, Iterator, TextIO,
+                    Union)
+
+from money.transaction import Transaction
+
+logger = logging.getLogger(__name__)
+
+LedgerFile = Union[str, PathLike, TextIO]
+ErrorHandler = Callable[[int, str, ValueError], None]
+
+CHUNK_SIZE = 1000
+
+
+def _open(file: LedgerFile, mode: str) -> ContextManager[TextIO]:
+    if isinstance(file, (str, PathLike)):
+        return open(file, mode, encoding='utf-8')
+    return nullcontext(file)
+
+
+def _log_error(number: int, line: str, error: ValueError):
+    logger.warning('Skipping invalid ledger line %d: %r (%s)', number, line,
+                   error)
+
+
+def read_ledger(
+    file: LedgerFile,
+    chunk_size: int = CHUNK_SIZE,
+    on_error: ErrorHandler = _log_error,
+    strict: bool = False,
+) -> Iterator[Transaction]:
+    """Lazily parses transactions written by `write_ledger`
+
+    Lines are read `chunk_size` at a time. Invalid lines are passed to
+    `on_error` with their 1-based number and skipped, or raise ValueError
+    if `strict`.
+    """
+    number = 0
+
+    with _open(file, 'r') as source:
+        while True:
+            lines = list(islice(source, chunk_size))
+            if not lines:
+                return
+
+            for line in lines:
+                number += 1
+
+                line = line.rstrip('\r\n')
+                if not line.strip():
+                    continue
+
+                try:
+                    transaction = Transaction.from_str(line)
+                except ValueError as e:
+                    if strict:
+                        raise ValueError(
+                            f'Invalid ledger line {number}: {line!r}') from e
+                    on_error(number, line, e)
+                    continue
+                yield transaction
+
+
+def write_ledger(
+    transactions: Iterable[Transaction],
+    file: LedgerFile,
+    chunk_size: int = CHUNK_SIZE,
+) -> int:
+    """Writes transactions one per line, returns how many were written
+
+    Reasons and categories with punctuation are quoted, so any text is read
+    back as written
+    """
+    count = 0
+    iterator = iter(transactions)
+
+    with _open(file, 'w') as target:
+        while True:
+            chunk = [str(t) for t in islice(iterator, chunk_size)]
+            if not chunk:
+                return count
+
+            target.write('\n'.join(chunk) + '\n')
+            count += len(chunk)
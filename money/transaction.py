@@ -1,17 +1,42 @@
+import json
 import re
 from datetime import datetime
 from decimal import Decimal
-from typing import List, Optional
+from typing import Any, Optional
 from uuid import UUID, uuid4
 
 from pydantic import AwareDatetime, BaseModel, Field
 
-from money.utils import moscow_now
+from money.utils import construct_trusted, moscow_now, trusted_fields
+
+# Lengths of the database columns
+REASON_LENGTH = 20
+CATEGORY_LENGTH = 20
+
+# Reasons and categories of other characters are written as JSON strings
+PLAIN_TEXT_RE = re.compile(r'[\w ]+')
+TEXT_PATTERN = r'([\w\s]+|"(?:[^"\\]|\\.)*")?'
 
 TRANSACTION_RE = re.compile(
-    r'(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}[+-]\d{2}:\d{2}) #'
+    r'(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(?:\.\d+)?[+-]\d{2}:\d{2}) #'
     r' (\w{32}) - ([+-]\d+\.\d+) (\w+)'
-    r' - ([\w\s]+)? - ([\w\s]+)?')
+    f' - {TEXT_PATTERN} - {TEXT_PATTERN}')
+
+
+def _quote(text: Optional[str]) -> str:
+    if text is None:
+        return ''
+    if PLAIN_TEXT_RE.fullmatch(text):
+        return text
+    return json.dumps(text, ensure_ascii=False)
+
+
+def _unquote(text: Optional[str]) -> Optional[str]:
+    if not text:
+        return None
+    if text.startswith('"'):
+        return json.loads(text)
+    return text
 
 
 class Transaction(BaseModel):
@@ -19,22 +44,34 @@ class Transaction(BaseModel):
     value: Decimal = Field(decimal_places=2)
     currency: str = 'RUB'
     timing: AwareDatetime = Field(default_factory=moscow_now)
-    reason: Optional[str] = None
-    category: Optional[str] = None
+    reason: Optional[str] = Field(default=None, max_length=REASON_LENGTH)
+    category: Optional[str] = Field(default=None,
+                                    max_length=CATEGORY_LENGTH)
+
+    @classmethod
+    def from_trusted(cls, source: Any) -> 'Transaction':
+        return construct_trusted(cls, trusted_fields(cls, source))
+
+    def create_twin(self,
+                    value: Decimal = None,
+                    currency: str = None) -> 'Transaction':
+        """Creates the opposite leg of a transfer
 
-    def create_twin(self) -> 'Transaction':
+        Value and currency differ from negated ones for transfers
+        between currencies
+        """
         return Transaction(
             uuid=self.uuid,
-            value=-self.value,
-            currency=self.currency,
+            value=-self.value if value is None else value,
+            currency=currency or self.currency,
             timing=self.timing,
             reason=self.reason,
             category=self.category,
         )
 
     def __str__(self) -> str:
-        reason = self.reason or ''
-        category = self.category or ''
+        reason = _quote(self.reason)
+        category = _quote(self.category)
 
         return (f'{self.timing.isoformat()} # {self.uuid.hex} - '
                 f'{self.value:+.2f} {self.currency} '
@@ -42,7 +79,7 @@ class Transaction(BaseModel):
 
     @staticmethod
     def from_str(string: str) -> 'Transaction':
-        match = TRANSACTION_RE.match(string)
+        match = TRANSACTION_RE.fullmatch(string)
         if match is None:
             raise ValueError('String is not a valid Transaction string')
 
@@ -51,8 +88,8 @@ class Transaction(BaseModel):
         data['uuid'] = match.group(2)
         data['value'] = match.group(3)
         data['currency'] = match.group(4)
-        data['reason'] = match.group(5) or None
-        data['category'] = match.group(6) or None
+        data['reason'] = _unquote(match.group(5))
+        data['category'] = _unquote(match.group(6))
 
         return Transaction.model_validate(data)
 
@@ -65,4 +102,8 @@ class Transaction(BaseModel):
             return NotImplemented
 
     def is_twin(self, other: 'Transaction') -> bool:
-        return self.uuid == other.uuid and self.value == -other.value
+        if self.uuid != other.uuid:
+            return False
+        if self.currency == other.currency:
+            return self.value == -other.value
+        return (self.value < 0) != (other.value < 0)
@@ -1,21 +1,67 @@
+from collections.abc import Mapping
 from datetime import datetime
-from typing import Any, Optional
+from decimal import Decimal
+from functools import lru_cache
+from typing import Annotated, Any, Dict, Optional, Type, TypeVar
 
-from pydantic import BaseModel, ValidationError
+from pydantic import BaseModel, TypeAdapter, ValidationError
 from pytz import timezone
 
+MOSCOW = timezone('Europe/Moscow')
+
+CENT = Decimal('0.01')
+
+Model = TypeVar('Model', bound=BaseModel)
+
+_MISSING = object()
+
 
 def moscow_now() -> datetime:
-    return datetime.now(timezone('Europe/Moscow'))
+    return datetime.now(MOSCOW)
 
 
-def validate_field(model: BaseModel, field: str, value: Any) -> Optional[str]:
+@lru_cache(maxsize=None)
+def field_validator(model: Type[BaseModel], field: str) -> TypeAdapter:
+    """Validator of a single model field, built once per model and field"""
+    info = model.model_fields[field]
+    return TypeAdapter(Annotated[info.annotation, info],
+                       config=model.model_config)
+
+
+def validate_field(model: Type[BaseModel], field: str,
+                   value: Any) -> Optional[str]:
     try:
-        model.__pydantic_validator__.validate_assignment(
-            model.model_construct(),
-            field,
-            value,
-        )
+        field_validator(model, field).validate_python(value)
     except ValidationError as e:
         error = e.errors()[0]
         return error['msg']
+
+
+def trusted_fields(model: Type[BaseModel], source: Any) -> Dict[str, Any]:
+    """Collects values of model fields from a mapping or an object
+
+    Values are taken as is, so the source must already hold correct types,
+    like ORM rows loaded from the database
+    """
+    if isinstance(source, Mapping):
+        return {f: source[f] for f in model.model_fields if f in source}
+
+    data = {f: getattr(source, f, _MISSING) for f in model.model_fields}
+    return {f: value for f, value in data.items() if value is not _MISSING}
+
+
+def construct_trusted(model: Type[Model], data: Dict[str, Any]) -> Model:
+    """Creates model instance from valid data without running validators
+
+    When every field is present the instance is assembled directly,
+    skipping the defaults handling of `model_construct`
+    """
+    if len(data) < len(model.model_fields) or model.__pydantic_post_init__:
+        return model.model_construct(**data)
+
+    instance = model.__new__(model)
+    object.__setattr__(instance, '__dict__', data)
+    object.__setattr__(instance, '__pydantic_fields_set__', set(data))
+    object.__setattr__(instance, '__pydantic_extra__', None)
+    object.__setattr__(instance, '__pydantic_private__', None)
+    return instance
@@ -3,27 +3,50 @@ from decimal import Decimal
 from typing import List, Optional
 from uuid import UUID, uuid4
 
-from sqlalchemy import DATETIME, DECIMAL, TIMESTAMP, ForeignKey, String
+from sqlalchemy import (DATETIME, DECIMAL, TIMESTAMP, ForeignKey, Index,
+                        String, UniqueConstraint)
 from sqlalchemy.dialects.postgresql import UUID as SQL_UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import false, func
 
+from money.transaction import CATEGORY_LENGTH, REASON_LENGTH
 from orm.base import Base
 
 
 class TransactionOrm(Base):
+    """Transaction of an account, partitioned by Moscow months of timing
+
+    Unique keys of partitioned tables have to include the partition key,
+    so the database only keeps (account_id, uuid, timing) unique. Writers
+    keep (account_id, uuid) unique: under the lock of the account they skip
+    uuids found by the (account_id, uuid) index at any timing
+    """
     __tablename__ = 'transactions'
+    __table_args__ = (
+        UniqueConstraint('account_id', 'uuid', 'timing'),
+        Index('ix_transactions_account_id_timing_id', 'account_id', 'timing',
+              'id'),
+        Index('ix_transactions_account_id_uuid', 'account_id', 'uuid'),
+        {
+            'postgresql_partition_by': 'RANGE (timing)'
+        },
+    )
 
-    id: Mapped[int] = mapped_column(primary_key=True)
+    # Keys of partitioned tables have to include the partition key
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     uuid: Mapped[UUID] = mapped_column(SQL_UUID(as_uuid=True), default=uuid4)
 
     value: Mapped[Decimal] = mapped_column(DECIMAL(scale=2))
     currency: Mapped[str] = mapped_column(String(3), default='RUB')
     timing: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True),
+                                             primary_key=True,
                                              server_default=func.now())
 
-    reason: Mapped[Optional[str]] = mapped_column(String(20))
-    category: Mapped[Optional[str]] = mapped_column(String(10))
+    reason: Mapped[Optional[str]] = mapped_column(String(REASON_LENGTH))
+    category: Mapped[Optional[str]] = mapped_column(
+        String(CATEGORY_LENGTH))
+    # Merged by bulk import, such rows have no twins by design
+    imported: Mapped[bool] = mapped_column(server_default=false())
 
     account_id: Mapped[int] = mapped_column(ForeignKey('accounts.id'))
     account: Mapped['AccountOrm'] = relationship(back_populates='transactions')
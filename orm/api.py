@@ -1,39 +1,136 @@
-import configparser
-from typing import Optional, Sequence, Union
+from datetime import date, datetime
+from decimal import Decimal
+from os import PathLike
+from typing import (Any, AsyncIterator, Dict, Iterable, List, Optional,
+                    Sequence, Set, Tuple, Type, Union)
 
-from money.account import Account
+from money.account import Account, transfer_legs
+from money.analytics import CategoryTotal, month_start, period_bounds
+from money.audit import SINGLE_LEG_CATEGORIES, TwinIssue, twin_problem
 from money.bank_account import BankAccount
+from money.currency import BASE_CURRENCY, RateRow, RateStore
+from money.export import FORMATS, TransactionWriter
+from money.ledger import Ledger
+from money.lookup import LookupIndex
 from money.organization import Organization
 from money.stock_account import StockAccount
+from money.stock_position import StockTrade
+from money.utils import moscow_now
+from money.transaction import Transaction
 from orm.account import AccountOrm, TransactionOrm
+from orm.balance_checkpoint import BalanceCheckpointOrm
 from orm.bank_account import BankAccountOrm
+from orm.cache import AsyncCache, CacheStats, cached
+from orm.category_total import CategoryTotalOrm
+from orm.engine import PoolStats, async_session, get_engine
+from orm.engine import init as init_engine
+from orm.engine import pool_stats, read_settings
+from orm.engine import shutdown as shutdown_engine
 from orm.exc import InvalidFieldsError
+from orm.exchange_rate import ExchangeRateOrm
 from orm.organization import OrganizationOrm
-from orm.stock_account import StockAccountOrm
-from sqlalchemy import func, select
+from orm.partitions import ensure_partitions, forget_partitions
+from orm.stock_account import StockAccountOrm, StockTradeOrm
+from orm.transaction_archive import (TransactionArchiveOrm,
+                                    TransactionCompactionOrm)
+from orm.transaction_import import TransactionImportOrm
+from sqlalchemy import (Date, Row, and_, any_, case, delete, func, literal,
+                        or_, select, true, tuple_, union, union_all, update)
+from sqlalchemy.dialects.postgresql import ARRAY, UUID, insert
 from sqlalchemy.exc import DBAPIError
-from sqlalchemy.ext.asyncio import (AsyncSession, async_sessionmaker,
-                                    create_async_engine)
-from sqlalchemy.orm import joinedload, noload
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import (aliased, joinedload, noload, selectinload,
+                            with_polymorphic)
+from sqlalchemy.sql import ColumnElement
 
-config = configparser.ConfigParser()
-config.read('settings.ini')
+# Lists of accounts and organizations, only changed by create/delete_account
+list_cache = AsyncCache(ttl=300, max_size=128)
 
-USER = config['orm']['User']
-PASSWORD = config['orm']['Password']
-HOST = config['orm']['Host']
-DB_NAME = config['orm']['Database']
 
-DB_URL = ('postgresql+asyncpg://'
-          f'{USER}:{PASSWORD}@'
-          f'{HOST}/{DB_NAME}')
+def init(url: str = None, **options):
+    """Creates the engine, database and options are read from settings.ini
 
-engine = create_async_engine(DB_URL, echo=True)
-async_session = async_sessionmaker(engine, expire_on_commit=False)
+    Nothing is connected on import, without `init` the engine is created
+    from settings on first use
+    """
+    settings = read_settings()
+    list_cache.ttl = settings.getfloat('CacheTtl', fallback=list_cache.ttl)
+    list_cache.max_size = settings.getint('CacheSize',
+                                          fallback=list_cache.max_size)
+
+    init_engine(url, settings, **options)
+
+
+async def shutdown():
+    list_cache.invalidate()
+    forget_partitions()
+    await shutdown_engine()
+
+
+TRANSACTION_COLUMNS = (
+    TransactionOrm.uuid,
+    TransactionOrm.value,
+    TransactionOrm.currency,
+    TransactionOrm.timing,
+    TransactionOrm.reason,
+    TransactionOrm.category,
+)
+ARCHIVE_COLUMNS = (
+    TransactionArchiveOrm.uuid,
+    TransactionArchiveOrm.value,
+    TransactionArchiveOrm.currency,
+    TransactionArchiveOrm.timing,
+    TransactionArchiveOrm.reason,
+    TransactionArchiveOrm.category,
+)
+COLUMN_NAMES = [c.key for c in TRANSACTION_COLUMNS]
+# Returned by inserts for category totals and checkpoints
+ADDED_COLUMNS = (
+    TransactionOrm.account_id,
+    TransactionOrm.value,
+    TransactionOrm.currency,
+    TransactionOrm.timing,
+    TransactionOrm.category,
+)
+
+
+TIMEZONE = 'Europe/Moscow'
+
+PAGE_SIZE = 50
+MERGE_BATCH = 10_000
+STREAM_BATCH = 1000
+
+# First key of advisory locks of accounts, the second one is the id
+ACCOUNT_LOCK = 1
+
+# Models of account rows by their mapped class
+ACCOUNT_MODELS = {
+    AccountOrm: Account,
+    BankAccountOrm: BankAccount,
+    StockAccountOrm: StockAccount,
+}
+
+# (timing, id) of a transaction, orders transactions of one account
+Cursor = Tuple[datetime, int]
+
+
+def _moscow_month(timing: ColumnElement) -> ColumnElement:
+    local = func.timezone(TIMEZONE, timing)
+    return func.date_trunc('month', local).cast(Date)
 
 
 async def end_connection() -> None:
-    await engine.dispose()
+    """Closes pooled connections, the engine stays usable"""
+    await get_engine().dispose()
+
+
+def get_pool_stats() -> PoolStats:
+    """Live statistics of the connection pool"""
+    return pool_stats(get_engine())
+
+
+def get_cache_stats() -> CacheStats:
+    return list_cache.stats
 
 
 async def _get_accounts(
@@ -47,18 +144,38 @@ async def _get_accounts(
             return result.scalars().all()
 
 
+@cached(list_cache, 'accounts')
 async def get_accounts() -> Sequence[AccountOrm]:
     return await _get_accounts(AccountOrm)
 
 
+@cached(list_cache, 'bank_accounts')
 async def get_bank_accounts() -> Sequence[BankAccountOrm]:
     return await _get_accounts(BankAccountOrm)
 
 
+@cached(list_cache, 'stock_accounts')
 async def get_stock_accounts() -> Sequence[StockAccountOrm]:
     return await _get_accounts(StockAccountOrm)
 
 
+# Indexes are built once per cached list and dropped with it
+@cached(list_cache, 'account_index')
+async def get_account_index() -> LookupIndex[AccountOrm]:
+    return LookupIndex(await get_accounts())
+
+
+@cached(list_cache, 'bank_account_index')
+async def get_bank_account_index() -> LookupIndex[BankAccountOrm]:
+    return LookupIndex(await get_bank_accounts())
+
+
+@cached(list_cache, 'stock_account_index')
+async def get_stock_account_index() -> LookupIndex[StockAccountOrm]:
+    return LookupIndex(await get_stock_accounts())
+
+
+@cached(list_cache, 'organizations')
 async def get_organizations() -> Sequence[OrganizationOrm]:
     async with async_session() as session:
         async with session.begin():
@@ -68,80 +185,332 @@ async def get_organizations() -> Sequence[OrganizationOrm]:
             return result.scalars().all()
 
 
-async def get_organization(id: int) -> Organization:
+async def get_organization(id: int) -> Optional[Organization]:
     async with async_session() as session:
         async with session.begin():
             statement = select(OrganizationOrm).where(OrganizationOrm.id == id)
 
             result = await session.execute(statement)
             orm = result.scalar()
-    return Organization.model_validate(orm, from_attributes=True)
+    if orm is None:
+        return None
+    return Organization.from_trusted(orm)
+
+
+async def _get_transactions(account_id: int,
+                            session: AsyncSession,
+                            since: datetime = None) -> List[Transaction]:
+    statement = select(*TRANSACTION_COLUMNS).where(
+        TransactionOrm.account_id == account_id)
+    if since is not None:
+        statement = statement.where(TransactionOrm.timing >= since)
+
+    result = await session.execute(statement)
+    return [Transaction.from_trusted(row) for row in result.mappings()]
 
 
 async def _get_account_details(
     id: int,
     type: Union[AccountOrm, BankAccountOrm, StockAccountOrm],
+    model: Union[Type[Account], Type[BankAccount], Type[StockAccount]],
     with_transactions=True,
-) -> Union[AccountOrm, BankAccountOrm, StockAccountOrm]:
+    recent_only=False,
+) -> Optional[Union[Account, BankAccount, StockAccount]]:
     async with async_session() as session:
         async with session.begin():
-            statement = select(type).where(type.id == id)
-
-            if with_transactions:
-                statement = statement.options(joinedload(type.transactions))
-            else:
-                statement = statement.options(noload(type.transactions))
+            statement = select(type).where(type.id == id).options(
+                noload(type.transactions))
 
             if type == BankAccountOrm:
                 statement = statement.options(joinedload(BankAccountOrm.bank))
             if type == StockAccountOrm:
                 statement = statement.options(
-                    joinedload(StockAccountOrm.broker))
+                    joinedload(StockAccountOrm.broker),
+                    selectinload(StockAccountOrm.trades))
 
             result = await session.execute(statement)
-            return result.scalar()
+            account_orm = result.scalar()
+            if account_orm is None:
+                return None
+
+            account = model.from_trusted(account_orm)
+            if not with_transactions:
+                return account
+
+            since = None
+            if recent_only:
+                checkpoint = await _latest_checkpoint(session, id)
+                if checkpoint is not None:
+                    account.set_checkpoint(*checkpoint)
+                    since = checkpoint[0]
+
+            account.transactions = await _get_transactions(
+                id, session, since)
+    return account
 
 
 async def get_account_details(
     id: int,
     with_transactions=True,
+    recent_only=False,
 ) -> Optional[Account]:
-    account = await _get_account_details(
+    return await _get_account_details(
         id,
         AccountOrm,
+        Account,
         with_transactions=with_transactions,
+        recent_only=recent_only,
     )
-    if account is None:
-        return None
-    return Account.model_validate(account, from_attributes=True)
 
 
 async def get_bank_account_details(
     id: int,
     with_transactions=True,
+    recent_only=False,
 ) -> Optional[BankAccount]:
-    account = await _get_account_details(
+    return await _get_account_details(
         id,
         BankAccountOrm,
+        BankAccount,
         with_transactions=with_transactions,
+        recent_only=recent_only,
     )
-    if account is None:
-        return None
-    return BankAccount.model_validate(account, from_attributes=True)
 
 
 async def get_stock_account_details(
     id: int,
     with_transactions=True,
+    recent_only=False,
 ) -> Optional[StockAccount]:
-    account = await _get_account_details(
+    return await _get_account_details(
         id,
         StockAccountOrm,
+        StockAccount,
         with_transactions=with_transactions,
+        recent_only=recent_only,
     )
-    if account is None:
-        return None
-    return StockAccount.model_validate(account, from_attributes=True)
+
+
+async def get_typed_accounts(
+    ids: Sequence[int] = None
+) -> List[Union[Account, BankAccount, StockAccount]]:
+    """Accounts as models of their types with bank or broker but without
+    transactions and trades
+
+    Subclass tables and organizations are joined, so a mixed list takes a
+    single query
+    """
+    accounts = with_polymorphic(AccountOrm, [BankAccountOrm, StockAccountOrm])
+    statement = select(accounts).options(
+        noload(accounts.transactions),
+        joinedload(accounts.BankAccountOrm.bank),
+        joinedload(accounts.StockAccountOrm.broker),
+        noload(accounts.StockAccountOrm.trades),
+    ).order_by(accounts.id)
+    if ids is not None:
+        statement = statement.where(accounts.id.in_(ids))
+
+    async with async_session() as session:
+        async with session.begin():
+            result = await session.scalars(statement)
+            return [
+                ACCOUNT_MODELS[type(account)].from_trusted(account)
+                for account in result.unique()
+            ]
+
+
+async def _latest_checkpoint(
+        session: AsyncSession,
+        account_id: int,
+        at: datetime = None) -> Optional[Tuple[datetime, Decimal]]:
+    statement = select(
+        BalanceCheckpointOrm.period_end,
+        BalanceCheckpointOrm.balance,
+    ).where(BalanceCheckpointOrm.account_id == account_id).order_by(
+        BalanceCheckpointOrm.period_end.desc()).limit(1)
+    if at is not None:
+        statement = statement.where(BalanceCheckpointOrm.period_end <= at)
+
+    result = await session.execute(statement)
+    return result.first()
+
+
+def _balance_statement(at: datetime):
+    """Balances of accounts at `at`, same rules as `Account.get_balance`
+
+    The nearest checkpoint before `at` is taken as the starting balance,
+    so only transactions after it are summed. A checkpoint exactly at `at`
+    is skipped, rows at it would cancel out as if it was the start. Each
+    sum has `at` as one of its bounds, so partitions out of range are
+    pruned
+    """
+    checkpoint = select(
+        BalanceCheckpointOrm.period_end,
+        BalanceCheckpointOrm.balance,
+    ).where(
+        BalanceCheckpointOrm.account_id == AccountOrm.id,
+        BalanceCheckpointOrm.period_end > AccountOrm.start_date,
+        BalanceCheckpointOrm.period_end < at,
+    ).order_by(BalanceCheckpointOrm.period_end.desc()).limit(1).lateral()
+
+    timing = TransactionOrm.timing
+    start_date = func.coalesce(checkpoint.c.period_end, AccountOrm.start_date)
+    start_balance = func.coalesce(checkpoint.c.balance,
+                                  AccountOrm.start_balance)
+
+    def total(*bounds: ColumnElement):
+        return select(
+            func.coalesce(func.sum(TransactionOrm.value),
+                          0).label('total')).where(
+                              TransactionOrm.account_id == AccountOrm.id,
+                              *bounds).lateral()
+
+    after_start = total(timing >= start_date, timing <= at)
+    before_start = total(timing >= at, timing <= start_date)
+
+    balance = start_balance + after_start.c.total - before_start.c.total
+
+    return select(AccountOrm.id, balance.label('balance')).outerjoin(
+        checkpoint, true()).join(after_start,
+                                 true()).join(before_start, true())
+
+
+async def get_account_balances(ids: Sequence[int] = None,
+                               at: datetime = None) -> Dict[int, Decimal]:
+    """Balances of many accounts computed in one aggregate query"""
+    if at is None:
+        at = moscow_now()
+
+    statement = _balance_statement(at)
+    if ids is not None:
+        statement = statement.where(AccountOrm.id.in_(ids))
+
+    async with async_session() as session:
+        async with session.begin():
+            result = await session.execute(statement)
+            return {row.id: row.balance for row in result}
+
+
+async def get_account_balance(id: int,
+                              at: datetime = None) -> Optional[Decimal]:
+    balances = await get_account_balances([id], at)
+    return balances.get(id)
+
+
+async def iter_transactions(
+    account_id: int,
+    before: Cursor = None,
+    limit: int = None,
+    since: datetime = None,
+    until: datetime = None,
+    after: Cursor = None,
+    page_size: int = PAGE_SIZE,
+) -> AsyncIterator[Tuple[Cursor, Transaction]]:
+    """Transactions of account from the newest one, with their cursors
+
+    Rows are fetched in pages with keyset pagination over (timing, id),
+    pass the cursor of the last seen transaction as `before` to continue.
+    With `after` transactions are walked forward in time instead
+    """
+    forward = after is not None
+    cursor = after if forward else before
+
+    while limit is None or limit > 0:
+        statement = select(TransactionOrm.id, *TRANSACTION_COLUMNS).where(
+            TransactionOrm.account_id == account_id)
+        if since is not None:
+            statement = statement.where(TransactionOrm.timing >= since)
+        if until is not None:
+            statement = statement.where(TransactionOrm.timing <= until)
+
+        # Row comparisons do not prune partitions, the plain bound on
+        # timing does
+        key = tuple_(TransactionOrm.timing, TransactionOrm.id)
+        if forward:
+            if cursor is not None:
+                statement = statement.where(key > tuple_(*cursor),
+                                            TransactionOrm.timing >= cursor[0])
+            statement = statement.order_by(TransactionOrm.timing,
+                                           TransactionOrm.id)
+        else:
+            if cursor is not None:
+                statement = statement.where(key < tuple_(*cursor),
+                                            TransactionOrm.timing <= cursor[0])
+            statement = statement.order_by(TransactionOrm.timing.desc(),
+                                           TransactionOrm.id.desc())
+
+        size = page_size if limit is None else min(page_size, limit)
+        async with async_session() as session:
+            async with session.begin():
+                result = await session.execute(statement.limit(size))
+                rows = result.mappings().all()
+
+        for row in rows:
+            cursor = (row['timing'], row['id'])
+            yield cursor, Transaction.from_trusted(row)
+
+        if len(rows) < size:
+            return
+        if limit is not None:
+            limit -= len(rows)
+
+
+async def get_account_ledger(id: int, partition_size: int = 1000) -> Ledger:
+    ledger = Ledger()
+
+    async with async_session() as session:
+        async with session.begin():
+            statement = select(*TRANSACTION_COLUMNS).where(
+                TransactionOrm.account_id == id)
+
+            result = await session.stream(statement)
+            async for rows in result.partitions(partition_size):
+                ledger.extend_rows(rows)
+    return ledger
+
+
+async def stream_transactions(
+    account_id: int = None,
+    yield_per: int = STREAM_BATCH,
+) -> AsyncIterator[Tuple[int, Transaction]]:
+    """Transactions of account or all of them with their account ids
+
+    Rows are read with a server-side cursor, only `yield_per` of them are
+    held in memory at a time
+    """
+    statement = select(TransactionOrm.account_id,
+                       *TRANSACTION_COLUMNS).order_by(
+                           TransactionOrm.account_id, TransactionOrm.timing,
+                           TransactionOrm.id)
+    if account_id is not None:
+        statement = statement.where(TransactionOrm.account_id == account_id)
+
+    async with async_session() as session:
+        async with session.begin():
+            result = await session.stream(
+                statement.execution_options(yield_per=yield_per))
+            async for rows in result.mappings().partitions():
+                for row in rows:
+                    yield row['account_id'], Transaction.from_trusted(row)
+
+
+async def export_transactions(file: Union[str, PathLike],
+                              format: str = 'csv',
+                              account_id: int = None,
+                              yield_per: int = STREAM_BATCH) -> int:
+    """Writes transactions to `file` while they are read
+
+    Returns the number of written transactions
+    """
+    if format not in FORMATS:
+        raise ValueError(f'Format must be one of {FORMATS}')
+
+    with open(file, 'w', newline='', encoding='utf-8') as target:
+        writer = TransactionWriter(target, format)
+        async for owner, transaction in stream_transactions(
+                account_id, yield_per):
+            writer.write(owner, transaction)
+    return writer.count
 
 
 async def _get_organization(organization: Organization,
@@ -162,12 +531,7 @@ async def _get_organization(organization: Organization,
 
 
 async def create_account(account: Account) -> AccountOrm:
-    transactions = []
-    for transaction in account.transactions:
-        transactions.append(TransactionOrm(**transaction.model_dump()))
-
-    data = account.model_dump()
-    data['transactions'] = transactions
+    data = account.model_dump(exclude={'transactions'})
 
     async with async_session() as session:
         async with session.begin():
@@ -177,6 +541,7 @@ async def create_account(account: Account) -> AccountOrm:
             elif isinstance(account, StockAccount):
                 data['broker'] = await _get_organization(
                     account.broker, session)
+                data['trades'] = [StockTradeOrm(**t) for t in data['trades']]
                 new_account = StockAccountOrm(**data)
             else:
                 new_account = AccountOrm(**data)
@@ -184,10 +549,16 @@ async def create_account(account: Account) -> AccountOrm:
             session.add(new_account)
 
             try:
+                await session.flush()
+                added = await _insert_transactions(session, new_account.id,
+                                                   account.transactions)
+                await _add_category_totals(session, added)
+                await _update_checkpoints(session, new_account.id, added)
                 await session.commit()
             except DBAPIError as e:
                 raise InvalidFieldsError(e)
 
+    list_cache.invalidate()
     return new_account
 
 
@@ -211,35 +582,844 @@ async def delete_account(*, account: Account = None, id: int = None):
             await session.delete(account_orm)
             await session.commit()
 
+    list_cache.invalidate()
+
+
+async def _add_category_totals(session: AsyncSession,
+                               transactions: Sequence[Row]):
+    totals: Dict[Tuple[int, str, date, str], Tuple[Decimal, int]] = {}
+    for transaction in transactions:
+        key = (
+            transaction.account_id,
+            transaction.category or '',
+            month_start(transaction.timing),
+            transaction.currency,
+        )
+        total, count = totals.get(key, (Decimal(), 0))
+        totals[key] = (total + transaction.value, count + 1)
+
+    if not totals:
+        return
+
+    rows = []
+    for (account_id, category, month, currency), (total,
+                                                   count) in totals.items():
+        rows.append({
+            'account_id': account_id,
+            'category': category,
+            'month': month,
+            'currency': currency,
+            'total': total,
+            'count': count,
+        })
+
+    statement = insert(CategoryTotalOrm).values(rows)
+    statement = statement.on_conflict_do_update(
+        index_elements=[
+            CategoryTotalOrm.account_id,
+            CategoryTotalOrm.category,
+            CategoryTotalOrm.month,
+            CategoryTotalOrm.currency,
+        ],
+        set_={
+            'total': CategoryTotalOrm.total + statement.excluded.total,
+            'count': CategoryTotalOrm.count + statement.excluded.count,
+        },
+    )
+    await session.execute(statement)
+
+
+async def _lock_account(session: AsyncSession, account_id: int):
+    """Holds a lock on account until the end of the database transaction"""
+    await session.execute(
+        select(func.pg_advisory_xact_lock(ACCOUNT_LOCK, account_id)))
+
+
+async def _lock_accounts(session: AsyncSession, account_ids: Iterable[int]):
+    """Locks accounts in the order of ids, so writers do not deadlock
+
+    Functions of the select list are evaluated after sorting
+    """
+    await session.execute(
+        select(func.pg_advisory_xact_lock(ACCOUNT_LOCK, AccountOrm.id)).where(
+            AccountOrm.id.in_(set(account_ids))).order_by(AccountOrm.id))
 
-async def add_transactions(account: Account):
+
+async def _update_checkpoints(session: AsyncSession, account_id: int,
+                              transactions: Sequence[Row]):
+    """Drops checkpoints after added transactions and adds missing ones
+
+    Writers hold the lock of the account since before they insert, so
+    checkpoints are computed from transactions committed by the others
+    """
+    if transactions:
+        earliest = min(t.timing for t in transactions)
+        await _invalidate_checkpoints(session, account_id, earliest)
+    await _extend_checkpoints(session, account_id)
+
+
+async def _invalidate_checkpoints(session: AsyncSession, account_id: int,
+                                  earliest: datetime):
+    await session.execute(
+        delete(BalanceCheckpointOrm).where(
+            BalanceCheckpointOrm.account_id == account_id,
+            BalanceCheckpointOrm.period_end > earliest,
+        ))
+
+
+async def _extend_checkpoints(session: AsyncSession, account_id: int):
+    """Places checkpoints at every Moscow month start up to now"""
+    checkpoint = await _latest_checkpoint(session, account_id)
+    if checkpoint is None:
+        account_orm = await session.get(AccountOrm, account_id)
+        checkpoint = (account_orm.start_date, account_orm.start_balance)
+    since, balance = checkpoint
+
+    period_ends = [
+        start for start, _ in period_bounds(since, moscow_now(), 'month')
+    ][1:]
+    if not period_ends:
+        return
+
+    month = _moscow_month(TransactionOrm.timing)
+    statement = select(month, func.sum(TransactionOrm.value)).where(
+        TransactionOrm.account_id == account_id,
+        TransactionOrm.timing >= since,
+        TransactionOrm.timing < period_ends[-1],
+    ).group_by(month)
+    result = await session.execute(statement)
+    totals = dict(result.all())
+
+    rows = []
+    previous = month_start(since)
+    for period_end in period_ends:
+        balance += totals.get(previous, Decimal())
+        rows.append({
+            'account_id': account_id,
+            'period_end': period_end,
+            'balance': balance,
+        })
+        previous = period_end.date()
+
+    statement = insert(BalanceCheckpointOrm).values(rows)
+    await session.execute(
+        statement.on_conflict_do_update(
+            index_elements=[
+                BalanceCheckpointOrm.account_id,
+                BalanceCheckpointOrm.period_end,
+            ],
+            set_={'balance': statement.excluded.balance},
+        ))
+
+
+async def _insert_transactions(
+        session: AsyncSession, account_id: int,
+        transactions: Sequence[Transaction]) -> Sequence[Row]:
+    """Inserts transactions with multi-row statements, skipping known ones
+
+    A uuid is known if the account has it at any timing, archived
+    transactions included. Takes the lock of the account, returns rows of
+    the transactions that were actually added
+    """
+    if not transactions:
+        return []
+
+    await _lock_account(session, account_id)
+    uuids = literal([t.uuid for t in transactions], ARRAY(UUID()))
+    known = set(await session.scalars(
+        union(
+            select(TransactionOrm.uuid).where(
+                TransactionOrm.account_id == account_id,
+                TransactionOrm.uuid == any_(uuids)),
+            select(TransactionArchiveOrm.uuid).where(
+                TransactionArchiveOrm.account_id == account_id,
+                TransactionArchiveOrm.uuid == any_(uuids)),
+        )))
+
+    new = {}
+    for transaction in transactions:
+        if transaction.uuid not in known:
+            new.setdefault(transaction.uuid, transaction)
+    transactions = list(new.values())
+    if not transactions:
+        return []
+
+    timings = [t.timing for t in transactions]
+    await ensure_partitions(session, min(timings), max(timings))
+
+    statement = insert(TransactionOrm).on_conflict_do_nothing(
+        index_elements=[
+            TransactionOrm.account_id,
+            TransactionOrm.uuid,
+            TransactionOrm.timing,
+        ],
+    ).returning(*ADDED_COLUMNS)
+    result = await session.execute(
+        statement,
+        [{
+            **t.model_dump(), 'account_id': account_id
+        } for t in transactions],
+    )
+    return result.all()
+
+
+async def add_transactions(account_id: int,
+                           transactions: Sequence[Transaction]) -> int:
+    """Adds new transactions to account, returns the number of added ones
+
+    Only the given transactions are sent, the history of the account is not
+    needed. Known ones are skipped, so adding them again is safe
+    """
     async with async_session() as session:
         async with session.begin():
-            transactions = [
-                TransactionOrm(**t.model_dump()) for t in account.transactions
-            ]
-            if account.id is not None:
-                account_orm = await session.get(
+            try:
+                added = await _insert_transactions(session, account_id,
+                                                   transactions)
+                await _add_category_totals(session, added)
+                await _update_checkpoints(session, account_id, added)
+            except DBAPIError as e:
+                raise InvalidFieldsError(e)
+    return len(added)
+
+
+async def transfer(source_id: int,
+                   target_id: int,
+                   value: Decimal,
+                   category: str = None,
+                   reason: str = None,
+                   timing: datetime = None,
+                   currency: str = BASE_CURRENCY,
+                   target_currency: str = None,
+                   rates: RateStore = None) -> Tuple[Decimal, Decimal]:
+    """Passes money between accounts, returns their new balances
+
+    The accounts are locked by one statement, then the legs, category
+    totals, invalidated checkpoints and the balances are written and read
+    by another. Missing checkpoints are added by a few more statements
+    only for the first transfer of a month, a new partition or a transfer
+    into the past. Histories of the accounts are not loaded
+    """
+    if source_id == target_id:
+        raise ValueError('Cannot transfer money to the same account')
+
+    legs = transfer_legs(
+        value,
+        currency=currency,
+        timing=timing,
+        target_currency=target_currency,
+        rates=rates,
+        category=category,
+        reason=reason,
+    )
+    rows = [{
+        **leg.model_dump(), 'account_id': account_id
+    } for leg, account_id in zip(legs, (source_id, target_id))]
+    at = max(legs[0].timing, moscow_now())
+
+    async with async_session() as session:
+        async with session.begin():
+            await _lock_accounts(session, (source_id, target_id))
+            await ensure_partitions(session, legs[0].timing, legs[0].timing)
+
+            try:
+                result = await session.execute(_transfer_statement(rows, at))
+            except DBAPIError as e:
+                raise InvalidFieldsError(e)
+
+            balances = {}
+            for account_id, balance, stale in sorted(result.all()):
+                balances[account_id] = balance
+                if stale:
+                    await _extend_checkpoints(session, account_id)
+
+    return balances[source_id], balances[target_id]
+
+
+def _totals_statement(added):
+    """Adds rows of `added` with `ADDED_COLUMNS` to category totals"""
+    category = func.coalesce(added.c.category, '')
+    month = _moscow_month(added.c.timing)
+    statement = insert(CategoryTotalOrm).from_select(
+        ['account_id', 'category', 'month', 'currency', 'total', 'count'],
+        select(
+            added.c.account_id,
+            category,
+            month,
+            added.c.currency,
+            func.sum(added.c.value),
+            func.count(),
+        ).group_by(added.c.account_id, category, month, added.c.currency),
+    )
+    return statement.on_conflict_do_update(
+        index_elements=[
+            CategoryTotalOrm.account_id,
+            CategoryTotalOrm.category,
+            CategoryTotalOrm.month,
+            CategoryTotalOrm.currency,
+        ],
+        set_={
+            'total': CategoryTotalOrm.total + statement.excluded.total,
+            'count': CategoryTotalOrm.count + statement.excluded.count,
+        },
+    )
+
+
+def _transfer_statement(rows: Sequence[Dict[str, Any]], at: datetime):
+    """Inserts legs of a transfer, updating category totals
+
+    Checkpoints after the legs are dropped. Returns balances of the
+    accounts at `at` with the legs and whether their checkpoints have to be
+    extended, as they were dropped or a month has passed since the latest
+    """
+    legs = insert(TransactionOrm).values(rows).returning(
+        *ADDED_COLUMNS).cte('legs')
+
+    checkpoint = BalanceCheckpointOrm
+    invalidated = delete(checkpoint).where(
+        checkpoint.account_id == legs.c.account_id,
+        checkpoint.period_end > legs.c.timing,
+    ).returning(checkpoint.account_id).cte('invalidated')
+
+    # The legs are not visible to the other parts of the statement, their
+    # part of the balance is added the way `_balance_statement` counts it
+    start_date = AccountOrm.start_date
+    timing = legs.c.timing
+    part = case(
+        (and_(timing >= start_date, timing <= at), legs.c.value),
+        else_=0) - case(
+            (and_(timing >= at, timing <= start_date), legs.c.value),
+            else_=0)
+    added = select(func.coalesce(func.sum(part), 0)).where(
+        legs.c.account_id == AccountOrm.id).scalar_subquery()
+
+    latest = select(func.max(checkpoint.period_end)).where(
+        checkpoint.account_id == AccountOrm.id).scalar_subquery()
+    current = period_bounds(at, at, 'month')[0][0]
+    stale = or_(
+        select(invalidated.c.account_id).where(
+            invalidated.c.account_id == AccountOrm.id).exists(),
+        func.coalesce(latest, start_date) < current,
+    )
+
+    balances = _balance_statement(at).where(
+        AccountOrm.id.in_({row['account_id'] for row in rows})).subquery()
+    return select(
+        balances.c.id,
+        (balances.c.balance + added).label('balance'),
+        stale.label('stale'),
+    ).join(AccountOrm, AccountOrm.id == balances.c.id).add_cte(
+        _totals_statement(legs).cte('totals'))
+
+
+def _merge_statement(account_id: int, batch_size: int):
+    """Moves one batch of staged transactions, updating category totals
+
+    Uuids known to the account at any timing, archived ones included, are
+    skipped. Returns the number of merged staged rows, of added
+    transactions and the earliest added timing
+    """
+    staged = TransactionImportOrm
+    batch = delete(staged).where(
+        staged.id.in_(
+            select(staged.id).where(staged.account_id == account_id).order_by(
+                staged.id).limit(batch_size))).returning(
+                    staged.uuid,
+                    staged.value,
+                    staged.currency,
+                    staged.timing,
+                    staged.reason,
+                    staged.category,
+                ).cte('batch')
+
+    archive = TransactionArchiveOrm
+    archived = select(archive.id).where(archive.account_id == account_id,
+                                        archive.uuid == batch.c.uuid)
+    known = select(TransactionOrm.id).where(
+        TransactionOrm.account_id == account_id,
+        TransactionOrm.uuid == batch.c.uuid)
+    inserted = insert(TransactionOrm).from_select(
+        ['uuid', 'value', 'currency', 'timing', 'reason', 'category',
+         'account_id', 'imported'],
+        select(batch, literal(account_id), true()).where(
+            ~known.exists(), ~archived.exists()).distinct(batch.c.uuid),
+    ).on_conflict_do_nothing(
+        index_elements=[
+            TransactionOrm.account_id,
+            TransactionOrm.uuid,
+            TransactionOrm.timing,
+        ],
+    ).returning(*ADDED_COLUMNS).cte('inserted')
+
+    merged = select(func.count()).select_from(batch).scalar_subquery()
+    earliest = func.min(inserted.c.timing)
+    return select(merged, func.count(),
+                  earliest).select_from(inserted).add_cte(
+                      _totals_statement(inserted).cte('totals'))
+
+
+async def _assign_import_uuids(session: AsyncSession, account_id: int):
+    """Derives uuids of staged rows without one from their content
+
+    Equal rows are told apart by their order in the file, so overlapping
+    exports give the rows they share the same uuids
+    """
+    staged = TransactionImportOrm
+    content = (staged.timing, staged.value, staged.currency, staged.reason,
+               staged.category)
+    numbered = select(
+        staged.id,
+        func.row_number().over(partition_by=content,
+                               order_by=staged.id).label('occurrence'),
+    ).where(staged.account_id == account_id,
+            staged.uuid.is_(None)).subquery()
+
+    key = func.concat_ws(
+        '|',
+        staged.account_id,
+        func.extract('epoch', staged.timing),
+        staged.value,
+        staged.currency,
+        func.coalesce(staged.reason, ''),
+        func.coalesce(staged.category, ''),
+        numbered.c.occurrence,
+    )
+    await session.execute(
+        update(staged).where(staged.id == numbered.c.id).values(
+            uuid=func.md5(key).cast(staged.uuid.type)))
+
+
+async def merge_imported_transactions(account_id: int,
+                                      batch_size: int = MERGE_BATCH) -> int:
+    """Moves transactions staged by bulk import of account to the ledger
+
+    Each batch is merged, removed from staging and reflected in the
+    checkpoints in one database transaction, so an interrupted merge
+    continues where it stopped.
+    Returns the number of added transactions, known ones are skipped
+    """
+    async with async_session() as session:
+        async with session.begin():
+            result = await session.execute(
+                select(func.min(TransactionImportOrm.timing),
+                       func.max(TransactionImportOrm.timing)).where(
+                           TransactionImportOrm.account_id == account_id))
+            earliest, latest = result.one()
+            if earliest is None:
+                return 0
+            await ensure_partitions(session, earliest, latest)
+            await _assign_import_uuids(session, account_id)
+
+    added = 0
+    merged = batch_size
+    while merged == batch_size:
+        async with async_session() as session:
+            async with session.begin():
+                # Checkpoints stay consistent with every merged batch, as
+                # other writers of the account may come in between
+                await _lock_account(session, account_id)
+                result = await session.execute(
+                    _merge_statement(account_id, batch_size))
+                merged, inserted, earliest = result.one()
+                if earliest is not None:
+                    await _invalidate_checkpoints(session, account_id,
+                                                  earliest)
+                    await _extend_checkpoints(session, account_id)
+        added += inserted
+    return added
+
+
+async def _compacted_accounts(
+        session: AsyncSession, cutoff: datetime,
+        account_ids: Optional[Sequence[int]]) -> Set[int]:
+    """Accounts whose transactions up to `cutoff` can be archived
+
+    Accounts with other currencies before `cutoff` are left out, their
+    converted balances depend on the currency of every transaction. So are
+    accounts with twin legs after `cutoff` or in accounts left out, both
+    legs of a transfer are always archived together. Takes locks of the
+    accounts, so their balances do not change until they are compacted
+    """
+    statement = select(AccountOrm.id)
+    if account_ids is not None:
+        statement = statement.where(AccountOrm.id.in_(account_ids))
+    compacted = set(await session.scalars(statement))
+    await _lock_accounts(session, compacted)
+
+    old = TransactionOrm.timing <= cutoff
+    compacted.difference_update(await session.scalars(
+        select(TransactionOrm.account_id).where(
+            old, TransactionOrm.currency != BASE_CURRENCY).distinct()))
+
+    twin = aliased(TransactionOrm)
+    result = await session.execute(
+        select(TransactionOrm.account_id, twin.account_id,
+               func.bool_or(twin.timing > cutoff)).join(
+                   twin,
+                   and_(twin.uuid == TransactionOrm.uuid,
+                        twin.account_id != TransactionOrm.account_id),
+               ).where(old).group_by(TransactionOrm.account_id,
+                                     twin.account_id))
+    pairs = result.all()
+
+    changed = True
+    while changed:
+        changed = False
+        for account_id, twin_id, late in pairs:
+            if account_id in compacted and (late or
+                                            twin_id not in compacted):
+                compacted.remove(account_id)
+                changed = True
+    return compacted
+
+
+def _archived_up_to(cutoff: datetime,
+                    start_date: ColumnElement) -> ColumnElement:
+    """Whether transaction is archived by compaction at `cutoff`
+
+    Rows at the start count only after it, so ones at `cutoff` are kept
+    unless the start is moved to `cutoff` from an earlier one
+    """
+    timing = TransactionOrm.timing
+    return or_(timing < cutoff, and_(timing == cutoff, start_date < cutoff))
+
+
+def _archive_statement(compaction_ids: Sequence[int], cutoff: datetime):
+    """Moves transactions up to `cutoff` of compacted accounts to the archive
+
+    Returns numbers of archived transactions by account
+    """
+    compaction = TransactionCompactionOrm
+    moved = delete(TransactionOrm).where(
+        TransactionOrm.account_id == compaction.account_id,
+        compaction.id.in_(compaction_ids),
+        _archived_up_to(cutoff, compaction.start_date),
+    ).returning(TransactionOrm.id, TransactionOrm.account_id,
+                TransactionOrm.imported, *TRANSACTION_COLUMNS).cte('moved')
+
+    archived = insert(TransactionArchiveOrm).from_select(
+        ['compaction_id', 'id', 'account_id', 'imported', *COLUMN_NAMES],
+        select(compaction.id, moved).join(
+            compaction,
+            and_(compaction.account_id == moved.c.account_id,
+                 compaction.id.in_(compaction_ids))),
+    ).returning(TransactionArchiveOrm.account_id).cte('archived')
+
+    return select(archived.c.account_id,
+                  func.count()).group_by(archived.c.account_id)
+
+
+async def compact_transactions(
+        cutoff: datetime,
+        account_ids: Sequence[int] = None) -> Dict[int, int]:
+    """Archives transactions up to `cutoff` and moves starts of accounts
+
+    Accounts that start earlier get `cutoff` as their start date and their
+    balance at it as the start balance, so balances from `cutoff` on stay
+    the same. Category totals keep archived transactions. Returns numbers
+    of archived transactions by compacted account
+    """
+    if cutoff > moscow_now():
+        raise ValueError('Cut-off cannot be in the future')
+
+    async with async_session() as session:
+        async with session.begin():
+            compacted = await _compacted_accounts(session, cutoff,
+                                                  account_ids)
+            if not compacted:
+                return {}
+
+            result = await session.execute(
+                select(TransactionOrm.account_id, func.count()).join(
                     AccountOrm,
-                    account.id,
-                    options=[joinedload(AccountOrm.transactions)])
-            else:
-                statement = select(AccountOrm).where(
-                    func.lower(AccountOrm.name)
-                    == account.name.casefold()).options(
-                        joinedload(TransactionOrm))
+                    AccountOrm.id == TransactionOrm.account_id).where(
+                        TransactionOrm.account_id.in_(compacted),
+                        _archived_up_to(cutoff, AccountOrm.start_date),
+                    ).group_by(TransactionOrm.account_id))
+            counts = dict(result.all())
 
-                result = await session.execute(statement)
-                account_orm = result.scalar()
+            result = await session.execute(
+                select(AccountOrm.id, AccountOrm.start_date,
+                       AccountOrm.start_balance).where(
+                           AccountOrm.id.in_(compacted)))
+            accounts = [
+                a for a in result
+                if a.start_date < cutoff or counts.get(a.id)
+            ]
+            if not accounts:
+                return {}
+
+            moved = [a.id for a in accounts if a.start_date < cutoff]
+            result = await session.execute(
+                _balance_statement(cutoff).where(AccountOrm.id.in_(moved)))
+            balances = dict(result.all())
+
+            result = await session.execute(
+                insert(TransactionCompactionOrm).returning(
+                    TransactionCompactionOrm.id), [{
+                        'account_id': a.id,
+                        'cutoff': cutoff,
+                        'start_date': a.start_date,
+                        'start_balance': a.start_balance,
+                    } for a in accounts])
+            compaction_ids = result.scalars().all()
+
+            result = await session.execute(
+                _archive_statement(compaction_ids, cutoff))
+            archived = dict(result.all())
+
+            if moved:
+                await session.execute(update(AccountOrm), [{
+                    'id': id,
+                    'start_date': cutoff,
+                    'start_balance': balances[id],
+                } for id in moved])
+                await session.execute(
+                    delete(BalanceCheckpointOrm).where(
+                        BalanceCheckpointOrm.account_id.in_(moved),
+                        BalanceCheckpointOrm.period_end <= cutoff,
+                    ))
 
-            uuids = [t.uuid for t in account_orm.transactions]
-            for transaction in transactions:
-                if transaction.uuid in uuids:
-                    continue
-                transaction.account = account_orm
-                session.add(transaction)
+    list_cache.invalidate()
+    return {a.id: archived.get(a.id, 0) for a in accounts}
 
+
+async def restore_transactions(cutoff: datetime) -> int:
+    """Undoes compactions at or after `cutoff`, the latest first
+
+    Archived transactions are moved back and accounts get their previous
+    starts. Returns the number of restored transactions
+    """
+    restored = 0
+    async with async_session() as session:
+        async with session.begin():
+            compactions = await session.scalars(
+                select(TransactionCompactionOrm).where(
+                    TransactionCompactionOrm.cutoff >= cutoff).order_by(
+                        TransactionCompactionOrm.id.desc()))
+            compactions = compactions.all()
+            await _lock_accounts(session,
+                                 {c.account_id for c in compactions})
+
+            for compaction in compactions:
+                archive = TransactionArchiveOrm
+                result = await session.execute(
+                    select(func.min(archive.timing),
+                           func.max(archive.timing)).where(
+                               archive.compaction_id == compaction.id))
+                earliest, latest = result.one()
+                if earliest is not None:
+                    await ensure_partitions(session, earliest, latest)
+
+                moved = delete(archive).where(
+                    archive.compaction_id == compaction.id).returning(
+                        archive.id, archive.account_id, archive.imported,
+                        *ARCHIVE_COLUMNS).cte('moved')
+                result = await session.execute(
+                    insert(TransactionOrm).from_select(
+                        ['id', 'account_id', 'imported', *COLUMN_NAMES],
+                        select(moved)))
+                restored += result.rowcount
+
+                await session.execute(
+                    update(AccountOrm).where(
+                        AccountOrm.id == compaction.account_id).values(
+                            start_date=compaction.start_date,
+                            start_balance=compaction.start_balance))
+                await session.delete(compaction)
+
+            for account_id in {c.account_id for c in compactions}:
+                await session.execute(
+                    delete(BalanceCheckpointOrm).where(
+                        BalanceCheckpointOrm.account_id == account_id))
+                await _extend_checkpoints(session, account_id)
+
+    list_cache.invalidate()
+    return restored
+
+
+async def get_rate_store() -> RateStore:
+    async with async_session() as session:
+        async with session.begin():
+            statement = select(
+                ExchangeRateOrm.currency,
+                ExchangeRateOrm.day,
+                ExchangeRateOrm.rate,
+            )
+
+            result = await session.execute(statement)
+            return RateStore(result.all())
+
+
+async def add_exchange_rates(rows: Iterable[RateRow]):
+    values = [{
+        'currency': currency,
+        'day': day,
+        'rate': rate
+    } for currency, day, rate in rows]
+    if not values:
+        return
+
+    statement = insert(ExchangeRateOrm).values(values)
+    statement = statement.on_conflict_do_update(
+        index_elements=[ExchangeRateOrm.currency, ExchangeRateOrm.day],
+        set_={'rate': statement.excluded.rate},
+    )
+
+    async with async_session() as session:
+        async with session.begin():
+            await session.execute(statement)
+
+
+def _all_transactions():
+    """Transactions with archived ones, as far as category totals go"""
+    return union_all(
+        *(select(table.account_id, table.category, table.timing,
+                 table.currency, table.value)
+          for table in (TransactionOrm, TransactionArchiveOrm))).subquery()
+
+
+async def rebuild_category_totals():
+    """Recomputes the rollup table from all transactions, archived included"""
+    rows = _all_transactions()
+
+    month = _moscow_month(rows.c.timing)
+    category = func.coalesce(rows.c.category, '')
+    aggregate = select(
+        rows.c.account_id,
+        category,
+        month,
+        rows.c.currency,
+        func.sum(rows.c.value),
+        func.count(),
+    ).group_by(rows.c.account_id, category, month, rows.c.currency)
+
+    async with async_session() as session:
+        async with session.begin():
+            await session.execute(delete(CategoryTotalOrm))
+            await session.execute(
+                insert(CategoryTotalOrm).from_select([
+                    'account_id', 'category', 'month', 'currency', 'total',
+                    'count'
+                ], aggregate))
+
+
+async def get_category_totals(
+    account_id: int = None,
+    since: datetime = None,
+    until: datetime = None,
+) -> List[CategoryTotal]:
+    """Totals by category and Moscow month aggregated from transactions
+
+    Archived transactions are included. Without `account_id` all accounts
+    are summed up
+    """
+    rows = _all_transactions()
+    month = _moscow_month(rows.c.timing).label('month')
+    statement = select(
+        rows.c.category,
+        month,
+        rows.c.currency,
+        func.sum(rows.c.value).label('total'),
+        func.count().label('count'),
+    ).group_by(rows.c.category, month,
+               rows.c.currency).order_by(month, rows.c.category)
+
+    if account_id is not None:
+        statement = statement.where(rows.c.account_id == account_id)
+    if since is not None:
+        statement = statement.where(rows.c.timing >= since)
+    if until is not None:
+        statement = statement.where(rows.c.timing <= until)
+
+    async with async_session() as session:
+        async with session.begin():
+            result = await session.execute(statement)
+            return [
+                CategoryTotal.model_validate(row, from_attributes=True)
+                for row in result
+            ]
+
+
+async def get_category_rollups(account_id: int = None) -> List[CategoryTotal]:
+    """Same totals as `get_category_totals`, read from the rollup table"""
+    category = func.nullif(CategoryTotalOrm.category, '').label('category')
+    statement = select(
+        category,
+        CategoryTotalOrm.month,
+        CategoryTotalOrm.currency,
+        func.sum(CategoryTotalOrm.total).label('total'),
+        func.sum(CategoryTotalOrm.count).label('count'),
+    ).group_by(CategoryTotalOrm.category, CategoryTotalOrm.month,
+               CategoryTotalOrm.currency).order_by(
+                   CategoryTotalOrm.month, category)
+
+    if account_id is not None:
+        statement = statement.where(CategoryTotalOrm.account_id == account_id)
+
+    async with async_session() as session:
+        async with session.begin():
+            result = await session.execute(statement)
+            return [
+                CategoryTotal.model_validate(row, from_attributes=True)
+                for row in result
+            ]
+
+
+async def audit_twins(
+    exclude_categories: Sequence[str] = SINGLE_LEG_CATEGORIES
+) -> List[TwinIssue]:
+    """Finds transactions without exactly one matching twin in one query
+
+    Imported transactions are single legs by design and are not checked
+    """
+    value = TransactionOrm.value
+    legs = func.count()
+    accounts = func.count(TransactionOrm.account_id.distinct())
+    currencies = func.count(TransactionOrm.currency.distinct())
+    balanced = or_(
+        and_(currencies == 1, func.sum(value) == 0),
+        and_(currencies > 1, func.bool_or(value > 0),
+             func.bool_or(value < 0)),
+    )
+
+    statement = select(
+        TransactionOrm.uuid,
+        legs.label('legs'),
+        accounts.label('accounts'),
+        balanced.label('balanced'),
+    ).where(
+        ~TransactionOrm.imported,
+        or_(TransactionOrm.category.is_(None),
+            TransactionOrm.category.not_in(exclude_categories))).group_by(
+                TransactionOrm.uuid).having(
+                    or_(legs != 2, accounts != 2, ~balanced))
+
+    async with async_session() as session:
+        async with session.begin():
+            result = await session.execute(statement)
+            return [
+                TwinIssue(uuid=row.uuid,
+                          legs=row.legs,
+                          problem=twin_problem(row.legs, row.accounts,
+                                               row.balanced))
+                for row in result
+            ]
+
+
+async def add_trades(account_id: int, trades: Sequence[StockTrade]):
+    """Saves stock trades, skipping already saved ones"""
+    if not trades:
+        return
+
+    statement = insert(StockTradeOrm).values(
+        [{
+            **t.model_dump(), 'account_id': account_id
+        } for t in trades]).on_conflict_do_nothing(
+            index_elements=[StockTradeOrm.account_id, StockTradeOrm.uuid])
+
+    async with async_session() as session:
+        async with session.begin():
             try:
-                await session.commit()
+                await session.execute(statement)
             except DBAPIError as e:
                 raise InvalidFieldsError(e)
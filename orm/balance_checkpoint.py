@@ -0,0 +1,22 @@
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import DECIMAL, TIMESTAMP, ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column
+
+from orm.base import Base
+
+
+class BalanceCheckpointOrm(Base):
+    """Balance of account right before `period_end`, kept up to date on write
+
+    Checkpoints are placed at starts of Moscow months after `start_date`
+    """
+    __tablename__ = 'balance_checkpoints'
+
+    account_id: Mapped[int] = mapped_column(
+        ForeignKey('accounts.id', ondelete='CASCADE'), primary_key=True)
+    period_end: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True),
+                                                 primary_key=True)
+
+    balance: Mapped[Decimal] = mapped_column(DECIMAL(scale=2))
@@ -0,0 +1,255 @@
+"""Bulk import of bank exports in CSV format
+
+Exports must have `timing` and `value` columns, optionally `currency`,
+`category`, `reason` and `uuid`. Run from the repository root:
+
+    python -m orm.bulk_import ACCOUNT export.csv
+
+Rows are validated in a process pool, copied into a staging table and
+merged into transactions. Rows without uuid get one derived from their
+content and the number of equal rows before them, so importing the same
+or an overlapping export again adds nothing. If the merge is interrupted,
+run with --resume instead of the file to merge staged rows
+"""
+import argparse
+import asyncio
+import csv
+import logging
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from decimal import Decimal
+from itertools import islice
+from os import PathLike
+from time import perf_counter
+from typing import (Callable, Deque, Dict, Iterator, List, Optional,
+                    Sequence, Tuple, Union)
+from uuid import UUID
+
+from pydantic import BaseModel, ValidationError
+
+from money.transaction import Transaction
+from money.utils import MOSCOW
+from orm.api import (get_account_index, init, merge_imported_transactions,
+                     shutdown)
+from orm.engine import get_engine
+from orm.transaction_import import TransactionImportOrm
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 5000
+
+# Columns of `transaction_imports` in the order of staged records
+STAGING_COLUMNS = ('account_id', 'uuid', 'value', 'currency', 'timing',
+                   'reason', 'category')
+
+# (account_id, uuid, value, currency, timing, reason, category)
+StagedRecord = Tuple[int, Optional[UUID], Decimal, str, datetime,
+                     Optional[str], Optional[str]]
+ErrorHandler = Callable[[int, str], None]
+
+
+class ImportReport(BaseModel):
+    rows: int = 0
+    errors: int = 0
+    staged: int = 0
+    merged: int = 0
+    seconds: float = 0
+
+    @property
+    def rows_per_second(self) -> float:
+        if not self.seconds:
+            return 0
+        return self.rows / self.seconds
+
+
+def _log_error(number: int, error: str):
+    logger.warning('Skipping invalid row %d: %s', number, error)
+
+
+def _parse_timing(text: Optional[str]) -> datetime:
+    timing = datetime.fromisoformat((text or '').strip())
+    if timing.tzinfo is None:
+        timing = MOSCOW.localize(timing)
+    return timing
+
+
+def parse_rows(
+    account_id: int,
+    first_number: int,
+    rows: Sequence[Dict[str, str]],
+) -> Tuple[List[StagedRecord], List[Tuple[int, str]]]:
+    """Validates CSV rows as transactions, runs in worker processes
+
+    Returns records for the staging table and (row number, error) pairs
+    """
+    records = []
+    errors = []
+
+    for number, row in enumerate(rows, first_number):
+        try:
+            value = row.get('value') or ''
+            data = {
+                'value': value.replace(' ', '').replace(',', '.'),
+                'timing': _parse_timing(row.get('timing')),
+            }
+            for field in ('currency', 'category', 'reason'):
+                text = row.get(field)
+                if not text:
+                    continue
+
+                length = TransactionImportOrm.__table__.c[field].type.length
+                if len(text) > length:
+                    raise ValueError(
+                        f'{field} should have at most {length} characters')
+                data[field] = text
+
+            if row.get('uuid'):
+                data['uuid'] = row['uuid']
+            transaction = Transaction.model_validate(data)
+        except (ValueError, ValidationError) as e:
+            errors.append((number, str(e)))
+            continue
+
+        records.append((
+            account_id,
+            transaction.uuid if 'uuid' in data else None,
+            transaction.value,
+            transaction.currency,
+            transaction.timing,
+            transaction.reason,
+            transaction.category,
+        ))
+    return records, errors
+
+
+def _chunks(reader: Iterator[Dict[str, str]],
+            size: int) -> Iterator[List[Dict[str, str]]]:
+    return iter(lambda: list(islice(reader, size)), [])
+
+
+async def stage_csv(
+    file: Union[str, PathLike],
+    account_id: int,
+    workers: int = None,
+    chunk_size: int = CHUNK_SIZE,
+    on_error: ErrorHandler = _log_error,
+) -> ImportReport:
+    """Copies valid rows of export into the staging table
+
+    At most two chunks per worker are parsed or waiting to be copied at a
+    time, so memory does not depend on the size of the file
+    """
+    report = ImportReport()
+    start = perf_counter()
+    loop = asyncio.get_running_loop()
+
+    async with get_engine().connect() as connection:
+        raw = await connection.get_raw_connection()
+        driver = raw.driver_connection
+
+        async def copy(pending: asyncio.Future):
+            records, errors = await pending
+            for number, error in errors:
+                on_error(number, error)
+
+            await driver.copy_records_to_table('transaction_imports',
+                                               records=records,
+                                               columns=STAGING_COLUMNS)
+
+            report.errors += len(errors)
+            report.staged += len(records)
+            logger.info('Staged %d rows, %.0f rows/s', report.staged,
+                        report.staged / (perf_counter() - start))
+
+        workers = workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(workers) as pool, open(
+                file, newline='', encoding='utf-8') as source:
+            limit = 2 * workers
+            pending: Deque[asyncio.Future] = deque()
+
+            # Line 1 is the header
+            number = 2
+            for rows in _chunks(csv.DictReader(source), chunk_size):
+                pending.append(
+                    loop.run_in_executor(pool, parse_rows, account_id,
+                                         number, rows))
+                number += len(rows)
+                report.rows += len(rows)
+
+                if len(pending) >= limit:
+                    await copy(pending.popleft())
+
+            while pending:
+                await copy(pending.popleft())
+
+    report.seconds = perf_counter() - start
+    return report
+
+
+async def import_csv(
+    file: Union[str, PathLike],
+    account_id: int,
+    workers: int = None,
+    chunk_size: int = CHUNK_SIZE,
+    on_error: ErrorHandler = _log_error,
+) -> ImportReport:
+    """Stages rows of export and merges them into transactions of account"""
+    start = perf_counter()
+
+    report = await stage_csv(file, account_id, workers, chunk_size,
+                             on_error)
+    report.merged = await merge_imported_transactions(account_id)
+
+    report.seconds = perf_counter() - start
+    return report
+
+
+async def _find_account(text: str) -> Optional[int]:
+    account = (await get_account_index()).get(text)
+    if account is None:
+        return None
+    return account.id
+
+
+async def main(argv: Sequence[str] = None):
+    parser = argparse.ArgumentParser(
+        description='Import transactions from a CSV bank export')
+    parser.add_argument('account', help='name or code of the account')
+    parser.add_argument('file', nargs='?', help='CSV export')
+    parser.add_argument('--workers', type=int, help='parsing processes')
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    parser.add_argument('--resume',
+                        action='store_true',
+                        help='only merge rows staged by an interrupted run')
+    args = parser.parse_args(argv)
+
+    if not args.resume and args.file is None:
+        parser.error('the file is required unless --resume is given')
+
+    init()
+    try:
+        account_id = await _find_account(args.account)
+        if account_id is None:
+            parser.error(f'account {args.account} not found')
+
+        if args.resume:
+            start = perf_counter()
+            merged = await merge_imported_transactions(account_id)
+            report = ImportReport(merged=merged,
+                                  seconds=perf_counter() - start)
+        else:
+            report = await import_csv(args.file, account_id, args.workers,
+                                      args.chunk_size)
+    finally:
+        await shutdown()
+
+    print(f'{report.rows} rows ({report.errors} invalid) in'
+          f' {report.seconds:.1f} s, {report.rows_per_second:.0f} rows/s.'
+          f' Staged {report.staged}, added {report.merged} transactions')
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
@@ -0,0 +1,130 @@
+import asyncio
+from collections import OrderedDict
+from functools import wraps
+from time import monotonic
+from typing import (Any, Awaitable, Callable, Dict, Generic, Hashable,
+                    Optional, Tuple, TypeVar)
+
+from pydantic import BaseModel
+
+Value = TypeVar('Value')
+
+
+class CacheStats(BaseModel):
+    hits: int
+    misses: int
+    size: int
+
+
+class AsyncCache(Generic[Value]):
+    """Read-through cache of coroutine results with TTL and LRU eviction
+
+    Concurrent misses of one key share a single load, which runs as a task
+    until done even if its callers are cancelled. Loads started before
+    `invalidate` are returned to their callers but not stored
+    """
+
+    def __init__(self,
+                 ttl: float = 60,
+                 max_size: int = 128,
+                 clock: Callable[[], float] = monotonic):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.clock = clock
+
+        self.hits = 0
+        self.misses = 0
+
+        self._entries: OrderedDict[Hashable, Tuple[float, Value]]
+        self._entries = OrderedDict()
+        self._loads: Dict[Hashable, asyncio.Task] = {}
+        self._generation = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def stats(self) -> CacheStats:
+        return CacheStats(hits=self.hits,
+                          misses=self.misses,
+                          size=len(self._entries))
+
+    def _lookup(self, key: Hashable) -> Tuple[bool, Optional[Value]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+
+        expires, value = entry
+        if expires <= self.clock():
+            del self._entries[key]
+            return False, None
+
+        self._entries.move_to_end(key)
+        return True, value
+
+    def _store(self, key: Hashable, value: Value):
+        self._entries[key] = (self.clock() + self.ttl, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    async def get(self, key: Hashable,
+                  load: Callable[[], Awaitable[Value]]) -> Value:
+        found, value = self._lookup(key)
+        if found:
+            self.hits += 1
+            return value
+
+        # Joining a load in progress counts as a hit, it costs no query
+        pending = self._loads.get(key)
+        if pending is not None:
+            self.hits += 1
+            return await asyncio.shield(pending)
+
+        self.misses += 1
+
+        generation = self._generation
+
+        async def load_and_store() -> Value:
+            try:
+                value = await load()
+                if generation == self._generation:
+                    self._store(key, value)
+                return value
+            finally:
+                if self._loads.get(key) is task:
+                    del self._loads[key]
+
+        # The load is shared by all callers, so a cancelled one does not
+        # cancel it for the others
+        task = asyncio.create_task(load_and_store())
+        # Marks the error as retrieved when nobody waits for it
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        self._loads[key] = task
+        return await asyncio.shield(task)
+
+    def invalidate(self, key: Hashable = None):
+        """Drops `key` or all entries if it is None"""
+        self._generation += 1
+
+        if key is None:
+            self._entries.clear()
+            self._loads.clear()
+        else:
+            self._entries.pop(key, None)
+            self._loads.pop(key, None)
+
+
+def cached(cache: AsyncCache, key: Hashable):
+    """Decorator reading results of a coroutine function through `cache`"""
+
+    def decorator(function: Callable[[], Awaitable[Any]]):
+
+        @wraps(function)
+        async def wrapper():
+            return await cache.get(key, function)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,27 @@
+from datetime import date
+from decimal import Decimal
+
+from sqlalchemy import DECIMAL, Date, ForeignKey, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from money.transaction import CATEGORY_LENGTH
+from orm.base import Base
+
+
+class CategoryTotalOrm(Base):
+    """Monthly totals of transactions by category, kept up to date on write
+
+    Transactions without category are counted under an empty string
+    """
+    __tablename__ = 'category_totals'
+
+    account_id: Mapped[int] = mapped_column(
+        ForeignKey('accounts.id', ondelete='CASCADE'), primary_key=True)
+    category: Mapped[str] = mapped_column(String(CATEGORY_LENGTH),
+                                          primary_key=True)
+    month: Mapped[date] = mapped_column(Date(), primary_key=True)
+    currency: Mapped[str] = mapped_column(String(3), primary_key=True)
+
+    total: Mapped[Decimal] = mapped_column(DECIMAL(scale=2),
+                                           default=Decimal())
+    count: Mapped[int] = mapped_column(default=0)
@@ -0,0 +1,85 @@
+"""Compaction of old transactions into starting balances
+
+Transactions up to the cut-off are moved to `transaction_archive` and
+accounts start at the cut-off with their balance at it. Run from the
+repository root:
+
+    python -m orm.compaction 2024-01-01
+
+Run with --restore to move transactions archived at or after the cut-off
+back
+"""
+import argparse
+import asyncio
+import logging
+from datetime import datetime
+from typing import Optional, Sequence
+
+from money.utils import MOSCOW
+from orm.api import (compact_transactions, get_account_index, init,
+                     restore_transactions, shutdown)
+
+
+def _parse_cutoff(text: str) -> datetime:
+    cutoff = datetime.fromisoformat(text)
+    if cutoff.tzinfo is None:
+        cutoff = MOSCOW.localize(cutoff)
+    return cutoff
+
+
+async def _find_accounts(texts: Sequence[str]) -> Optional[Sequence[int]]:
+    if not texts:
+        return None
+
+    index = await get_account_index()
+    ids = []
+    for text in texts:
+        account = index.get(text)
+        if account is None:
+            raise ValueError(f'account {text} not found')
+        ids.append(account.id)
+    return ids
+
+
+async def main(argv: Sequence[str] = None):
+    parser = argparse.ArgumentParser(
+        description='Archive transactions up to a cut-off')
+    parser.add_argument('cutoff',
+                        help='ISO date or time, Moscow time if naive')
+    parser.add_argument('--account',
+                        action='append',
+                        default=[],
+                        help='name or code of an account, all by default')
+    parser.add_argument('--restore',
+                        action='store_true',
+                        help='undo compactions at or after the cut-off')
+    args = parser.parse_args(argv)
+
+    try:
+        cutoff = _parse_cutoff(args.cutoff)
+    except ValueError as e:
+        parser.error(str(e))
+
+    init()
+    try:
+        if args.restore:
+            restored = await restore_transactions(cutoff)
+            print(f'Restored {restored} transactions')
+            return
+
+        try:
+            account_ids = await _find_accounts(args.account)
+            archived = await compact_transactions(cutoff, account_ids)
+        except ValueError as e:
+            parser.error(str(e))
+    finally:
+        await shutdown()
+
+    print(f'Archived {sum(archived.values())} transactions'
+          f' of {len(archived)} accounts up to'
+          f' {cutoff.astimezone(MOSCOW):%Y-%m-%d %H:%M}')
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
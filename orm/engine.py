@@ -0,0 +1,138 @@
+from configparser import ConfigParser, SectionProxy
+from time import perf_counter
+from typing import Any, Dict, Optional
+
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import (AsyncEngine, AsyncSession,
+                                    async_sessionmaker, create_async_engine)
+from sqlalchemy.pool import AsyncAdaptedQueuePool, PoolProxiedConnection
+
+SETTINGS_FILE = 'settings.ini'
+
+_engine: Optional[AsyncEngine] = None
+_sessions: Optional[async_sessionmaker] = None
+
+
+class PoolStats(BaseModel):
+    size: int
+    checked_in: int
+    checked_out: int
+    overflow: int
+
+    checkouts: int
+    # Seconds spent waiting for connections, including opening new ones
+    wait_time: float
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that counts checkouts and the time spent on them"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.checkouts = 0
+        self.wait_time = 0.0
+
+    def connect(self) -> PoolProxiedConnection:
+        start = perf_counter()
+        try:
+            return super().connect()
+        finally:
+            self.checkouts += 1
+            self.wait_time += perf_counter() - start
+
+
+def engine_options(section: SectionProxy) -> Dict[str, Any]:
+    """Keyword arguments of `create_async_engine` from `[orm]` settings"""
+    server_settings = {}
+    statement_timeout = section.getint('StatementTimeout', fallback=0)
+    if statement_timeout:
+        server_settings['statement_timeout'] = str(statement_timeout)
+
+    return {
+        'echo': section.getboolean('Echo', fallback=False),
+        'poolclass': TimedQueuePool,
+        'pool_size': section.getint('PoolSize', fallback=5),
+        'max_overflow': section.getint('MaxOverflow', fallback=10),
+        'pool_recycle': section.getint('PoolRecycle', fallback=-1),
+        'pool_pre_ping': section.getboolean('PoolPrePing', fallback=False),
+        'connect_args': {
+            'prepared_statement_cache_size':
+            section.getint('PreparedStatementCacheSize', fallback=100),
+            'server_settings':
+            server_settings,
+        },
+    }
+
+
+def pool_stats(engine: AsyncEngine) -> PoolStats:
+    pool = engine.pool
+    return PoolStats(
+        size=pool.size(),
+        checked_in=pool.checkedin(),
+        checked_out=pool.checkedout(),
+        overflow=pool.overflow(),
+        checkouts=getattr(pool, 'checkouts', 0),
+        wait_time=getattr(pool, 'wait_time', 0.0),
+    )
+
+
+def read_settings(path: str = SETTINGS_FILE) -> SectionProxy:
+    """`[orm]` section of settings, empty if there is no such file"""
+    config = ConfigParser()
+    config.read(path)
+    if not config.has_section('orm'):
+        config.add_section('orm')
+    return config['orm']
+
+
+def database_url(settings: SectionProxy) -> str:
+    return ('postgresql+asyncpg://'
+            f'{settings["User"]}:{settings["Password"]}@'
+            f'{settings["Host"]}/{settings["Database"]}')
+
+
+def init(url: str = None,
+         settings: SectionProxy = None,
+         **options) -> AsyncEngine:
+    """Creates the engine and session factory
+
+    Database and engine options are read from settings unless given. Call
+    `shutdown` before initializing again
+    """
+    global _engine, _sessions
+
+    if settings is None:
+        settings = read_settings()
+    if url is None:
+        url = database_url(settings)
+
+    _engine = create_async_engine(url, **{
+        **engine_options(settings),
+        **options
+    })
+    _sessions = async_sessionmaker(_engine, expire_on_commit=False)
+    return _engine
+
+
+def get_engine() -> AsyncEngine:
+    """Engine created by `init`, initializes from settings on first use"""
+    if _engine is None:
+        init()
+    return _engine
+
+
+def async_session() -> AsyncSession:
+    if _sessions is None:
+        init()
+    return _sessions()
+
+
+async def shutdown():
+    """Closes all connections and forgets the engine"""
+    global _engine, _sessions
+
+    if _engine is not None:
+        await _engine.dispose()
+    _engine = None
+    _sessions = None
@@ -0,0 +1,18 @@
+from datetime import date
+from decimal import Decimal
+
+from sqlalchemy import DECIMAL, Date, String, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from orm.base import Base
+
+
+class ExchangeRateOrm(Base):
+    __tablename__ = 'exchange_rates'
+    __table_args__ = (UniqueConstraint('currency', 'day'), )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+
+    currency: Mapped[str] = mapped_column(String(3))
+    day: Mapped[date] = mapped_column(Date())
+    rate: Mapped[Decimal] = mapped_column(DECIMAL(scale=6))
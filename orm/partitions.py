@@ -0,0 +1,116 @@
+"""Monthly range partitions of transactions
+
+Partitions cover Moscow months and are named `transactions_YYYY_MM`.
+Missing ones are created by `ensure_transaction_partitions` before rows
+are written, rows outside of any partition go to `transactions_default`
+and are moved out when their month gets a partition. Months known to have
+partitions are remembered, so writes to them cost no extra query
+"""
+import re
+from datetime import date, datetime, timedelta
+from typing import Dict, Set
+
+from sqlalchemy import DDL, event, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from money.analytics import month_start
+from orm.account import TransactionOrm
+
+PARTITION_NAME = re.compile(r'transactions_(\d{4}_\d{2}|default)')
+
+DEFAULT_PARTITION = DDL(
+    'CREATE TABLE transactions_default PARTITION OF transactions DEFAULT')
+
+ENSURE_FUNCTION = DDL("""
+CREATE OR REPLACE FUNCTION ensure_transaction_partitions(
+    since timestamptz, until timestamptz) RETURNS void
+LANGUAGE plpgsql AS $$
+DECLARE
+    month_start timestamp := date_trunc(
+        'month', since AT TIME ZONE 'Europe/Moscow');
+    lower_bound timestamptz;
+    upper_bound timestamptz;
+    partition text;
+BEGIN
+    WHILE month_start AT TIME ZONE 'Europe/Moscow' <= until LOOP
+        partition := 'transactions_' || to_char(month_start, 'YYYY_MM');
+        lower_bound := month_start AT TIME ZONE 'Europe/Moscow';
+        month_start := month_start + interval '1 month';
+        upper_bound := month_start AT TIME ZONE 'Europe/Moscow';
+
+        CONTINUE WHEN to_regclass(partition) IS NOT NULL;
+
+        PERFORM pg_advisory_xact_lock(hashtext('transactions_partitions'));
+        CONTINUE WHEN to_regclass(partition) IS NOT NULL;
+
+        EXECUTE format('CREATE TABLE %%I (LIKE transactions INCLUDING ALL)',
+                       partition);
+        EXECUTE format(
+            'WITH moved AS (DELETE FROM transactions_default'
+            ' WHERE timing >= $1 AND timing < $2 RETURNING *)'
+            ' INSERT INTO %%I SELECT * FROM moved', partition)
+            USING lower_bound, upper_bound;
+        EXECUTE format(
+            'ALTER TABLE transactions ATTACH PARTITION %%I'
+            ' FOR VALUES FROM (%%L) TO (%%L)',
+            partition, lower_bound, upper_bound);
+    END LOOP;
+END
+$$
+""")
+
+DROP_FUNCTION = DDL(
+    'DROP FUNCTION IF EXISTS ensure_transaction_partitions')
+
+event.listen(TransactionOrm.__table__, 'after_create', DEFAULT_PARTITION)
+event.listen(TransactionOrm.__table__, 'after_create', ENSURE_FUNCTION)
+event.listen(TransactionOrm.__table__, 'after_drop', DROP_FUNCTION)
+
+# Moscow months with committed partitions by database URL, partitions
+# are only dropped with the table
+_known_months: Dict[str, Set[date]] = {}
+
+
+def forget_partitions():
+    """Makes the next writes check partitions, e.g. of a restored database"""
+    _known_months.clear()
+
+
+@event.listens_for(TransactionOrm.__table__, 'after_drop')
+def _forget_months(*args, **kwargs):
+    forget_partitions()
+
+
+def _months(since: datetime, until: datetime) -> Set[date]:
+    months = set()
+    month = month_start(since)
+    last = month_start(until)
+    while month <= last:
+        months.add(month)
+        month = (month + timedelta(days=31)).replace(day=1)
+    return months
+
+
+def is_partition(name: str) -> bool:
+    """Whether table is a partition of transactions, not a mapped table"""
+    return PARTITION_NAME.fullmatch(name) is not None
+
+
+async def ensure_partitions(session: AsyncSession, since: datetime,
+                            until: datetime):
+    """Creates partitions for months from `since` to `until` if missing
+
+    Queries the database only for months not known to have partitions,
+    they are remembered once the transaction of `session` commits
+    """
+    known = _known_months.setdefault(str(session.get_bind().url), set())
+    missing = _months(since, until) - known
+    if not missing:
+        return
+
+    await session.execute(
+        select(func.ensure_transaction_partitions(since, until)))
+    event.listen(session.sync_session,
+                 'after_commit',
+                 lambda _: known.update(missing),
+                 once=True)
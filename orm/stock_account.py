@@ -1,13 +1,37 @@
-from datetime import timedelta
+from datetime import datetime
 from decimal import Decimal
+from typing import List
+from uuid import UUID, uuid4
 
-from sqlalchemy import DECIMAL, ForeignKey, Interval
+from sqlalchemy import (DECIMAL, TIMESTAMP, ForeignKey, String,
+                        UniqueConstraint)
+from sqlalchemy.dialects.postgresql import UUID as SQL_UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.sql import func
 
 from orm.account import AccountOrm
+from orm.base import Base
 from orm.organization import OrganizationOrm
 
 
+class StockTradeOrm(Base):
+    __tablename__ = 'stock_trades'
+    __table_args__ = (UniqueConstraint('account_id', 'uuid'), )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    uuid: Mapped[UUID] = mapped_column(SQL_UUID(as_uuid=True), default=uuid4)
+
+    ticker: Mapped[str] = mapped_column(String(12))
+    quantity: Mapped[Decimal] = mapped_column(DECIMAL(scale=6))
+    price: Mapped[Decimal] = mapped_column(DECIMAL(scale=4))
+    timing: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True),
+                                             server_default=func.now())
+
+    account_id: Mapped[int] = mapped_column(
+        ForeignKey('stock_accounts.id', ondelete='CASCADE'))
+    account: Mapped['StockAccountOrm'] = relationship(back_populates='trades')
+
+
 class StockAccountOrm(AccountOrm):
     __tablename__ = 'stock_accounts'
     id: Mapped[int] = mapped_column(ForeignKey('accounts.id'),
@@ -19,4 +43,7 @@ class StockAccountOrm(AccountOrm):
     broker_id: Mapped[int] = mapped_column(ForeignKey('organizations.id'))
     broker: Mapped[OrganizationOrm] = relationship()
 
+    trades: Mapped[List[StockTradeOrm]] = relationship(
+        back_populates='account', cascade='all,delete')
+
     __mapper_args__ = {'polymorphic_identity': 'stock_account'}
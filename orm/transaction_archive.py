@@ -0,0 +1,56 @@
+from datetime import datetime
+from decimal import Decimal
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import DECIMAL, TIMESTAMP, ForeignKey, Index, String
+from sqlalchemy.dialects.postgresql import UUID as SQL_UUID
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import false
+
+from money.transaction import CATEGORY_LENGTH, REASON_LENGTH
+from orm.base import Base
+
+
+class TransactionCompactionOrm(Base):
+    """Compaction of account history, keeps the start it replaced
+
+    Undoing it moves its archived transactions back and restores the start
+    """
+    __tablename__ = 'transaction_compactions'
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    account_id: Mapped[int] = mapped_column(
+        ForeignKey('accounts.id', ondelete='CASCADE'))
+
+    cutoff: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True))
+    start_date: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True))
+    start_balance: Mapped[Decimal] = mapped_column(DECIMAL(scale=2))
+
+
+class TransactionArchiveOrm(Base):
+    """Transactions moved out of `transactions` by compactions
+
+    Writers skip transactions found here, so imports of old history do not
+    bring archived ones back
+    """
+    __tablename__ = 'transaction_archive'
+    __table_args__ = (Index('ix_transaction_archive_account_id_uuid',
+                            'account_id', 'uuid'), )
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    compaction_id: Mapped[int] = mapped_column(
+        ForeignKey('transaction_compactions.id', ondelete='CASCADE'),
+        index=True)
+    account_id: Mapped[int] = mapped_column(
+        ForeignKey('accounts.id', ondelete='CASCADE'))
+
+    uuid: Mapped[UUID] = mapped_column(SQL_UUID(as_uuid=True))
+    value: Mapped[Decimal] = mapped_column(DECIMAL(scale=2))
+    currency: Mapped[str] = mapped_column(String(3))
+    timing: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True))
+
+    reason: Mapped[Optional[str]] = mapped_column(String(REASON_LENGTH))
+    category: Mapped[Optional[str]] = mapped_column(
+        String(CATEGORY_LENGTH))
+    imported: Mapped[bool] = mapped_column(server_default=false())
@@ -0,0 +1,36 @@
+from datetime import datetime
+from decimal import Decimal
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import (DECIMAL, TIMESTAMP, BigInteger, ForeignKey, Index,
+                        String)
+from sqlalchemy.dialects.postgresql import UUID as SQL_UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from money.transaction import CATEGORY_LENGTH, REASON_LENGTH
+from orm.base import Base
+
+
+class TransactionImportOrm(Base):
+    """Transactions copied from bulk imports and waiting to be merged
+
+    Rows are deleted in the same database transaction that merges them
+    """
+    __tablename__ = 'transaction_imports'
+    __table_args__ = (Index('ix_transaction_imports_account_id_id',
+                            'account_id', 'id'), )
+
+    id: Mapped[int] = mapped_column(BigInteger(), primary_key=True)
+    account_id: Mapped[int] = mapped_column(
+        ForeignKey('accounts.id', ondelete='CASCADE'))
+
+    # Derived from the content when merged if the export has none
+    uuid: Mapped[Optional[UUID]] = mapped_column(SQL_UUID(as_uuid=True))
+    value: Mapped[Decimal] = mapped_column(DECIMAL(scale=2))
+    currency: Mapped[str] = mapped_column(String(3))
+    timing: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True))
+
+    reason: Mapped[Optional[str]] = mapped_column(String(REASON_LENGTH))
+    category: Mapped[Optional[str]] = mapped_column(
+        String(CATEGORY_LENGTH))
@@ -1,6 +1,11 @@
+from datetime import timedelta
+from decimal import Decimal
+
 from pydantic import TypeAdapter
 import pytest
 from money.account import Account
+from money.currency import RateStore
+from money.transaction import Transaction
 from money.utils import validate_field
 
 
@@ -62,3 +67,97 @@ def test_partial_initialization_valid():
 def test_partial_initialization_invalid():
     message = validate_field(Account, 'code', '123409875665' * 2)
     assert message == 'String should have at most 20 characters'
+
+
+def test_from_trusted(account: Account):
+    account.pass_money(Account(name='Other account', code=105), '100.00')
+
+    trusted = Account.from_trusted(account.model_dump())
+
+    assert trusted == account
+    assert trusted.start_date == account.start_date
+    assert trusted.transactions == account.transactions
+    assert trusted.get_balance() == account.get_balance()
+
+
+@pytest.mark.parametrize('model,field,value,message', [
+    (Account, 'name', 'a' * 51, 'String should have at most 50 characters'),
+    (Account, 'start_balance', '1.234',
+     'Decimal input should have no more than 2 decimal places'),
+    (Account, 'start_balance', 'lol', 'Input should be a valid decimal'),
+    (Transaction, 'value', '-12.50', None),
+])
+def test_validate_field(model, field: str, value: str, message: str):
+    assert validate_field(model, field, value) == message
+
+
+def test_checkpoint_balance(account: Account):
+    other = Account(name='Other account', code=105)
+    start = account.start_date
+    for days in range(10):
+        account.pass_money(other, '10.00', timing=start + timedelta(days))
+
+    period_end = start + timedelta(days=5)
+    recent = Account.from_trusted(account.model_dump())
+    recent.transactions = [
+        t for t in recent.transactions if t.timing >= period_end
+    ]
+    recent.set_checkpoint(period_end, account.get_balance(period_end) +
+                          Decimal('10.00'))
+
+    for days in (5, 7, 20):
+        time = start + timedelta(days)
+        assert recent.get_balance(time) == account.get_balance(time)
+
+
+def test_checkpoint_needs_history(account: Account):
+    start = account.start_date
+    for days in range(10):
+        account.transactions.append(
+            Transaction(value='10.00', timing=start + timedelta(days)))
+
+    period_end = start + timedelta(days=5)
+    recent = Account.from_trusted(account.model_dump())
+    recent.transactions = [
+        t for t in recent.transactions if t.timing >= period_end
+    ]
+    recent.set_checkpoint(period_end, Decimal('50.00'))
+
+    with pytest.raises(ValueError):
+        recent.get_balance(period_end - timedelta(microseconds=1))
+    with pytest.raises(ValueError):
+        recent.get_balance(start + timedelta(days=7),
+                           in_currency='USD',
+                           rates=RateStore([]))
+    with pytest.raises(ValueError):
+        recent.to_ledger()
+    assert recent.get_balance(period_end) == Decimal('60.00')
+
+
+def test_index_follows_changes(account: Account):
+    start = account.start_date
+    later = start + timedelta(days=10)
+    account.transactions.append(
+        Transaction(value='1.00', timing=start + timedelta(days=1)))
+    account.transactions.append(
+        Transaction(value='1.00', timing=start + timedelta(days=2)))
+    assert account.get_balance(later) == Decimal('2.00')
+
+    account.transactions.insert(
+        0, Transaction(value='9.00', timing=start + timedelta(days=3)))
+    assert account.get_balance(later) == Decimal('11.00')
+
+    account.transactions[0] = Transaction(value='3.00',
+                                          timing=start + timedelta(days=3))
+    assert account.get_balance(later) == Decimal('5.00')
+
+    account.transactions[1].value = Decimal('-1.00')
+    assert account.get_balance(later) == Decimal('3.00')
+
+    # Transactions before the start do not count after it
+    account.transactions[2].timing = start - timedelta(days=1)
+    assert account.get_balance(later) == Decimal('2.00')
+
+    account.transactions.append(
+        Transaction(value='4.00', timing=start + timedelta(days=4)))
+    assert account.get_balance(later) == Decimal('6.00')
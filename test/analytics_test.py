@@ -0,0 +1,43 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from account_test import account
+from transaction_test import history, naive_balance, other_account
+
+from money.account import Account
+from money.analytics import balance_series, period_bounds
+from money.utils import MOSCOW
+
+
+@pytest.mark.parametrize('period', ['day', 'week', 'month'])
+def test_balance_series(history: Account, period: str):
+    since = history.start_date - timedelta(days=25)
+    until = history.start_date + timedelta(days=35)
+
+    series = balance_series(history, period, since, until)
+    bounds = period_bounds(since, until, period)
+
+    assert len(series) == len(bounds)
+    for (day, balance), (start, end) in zip(series, bounds):
+        assert day == start.date()
+        assert balance == naive_balance(history, end)
+
+
+def test_month_bounds():
+    since = MOSCOW.localize(datetime(2023, 11, 15, 12))
+    until = MOSCOW.localize(datetime(2024, 1, 10, 12))
+
+    bounds = period_bounds(since, until, 'month')
+
+    assert [start.date().isoformat() for start, _ in bounds] == [
+        '2023-11-01', '2023-12-01', '2024-01-01'
+    ]
+    assert bounds[0][1] == MOSCOW.localize(
+        datetime(2023, 11, 30, 23, 59, 59, 999999))
+    assert bounds[-1][1] == until
+
+
+def test_invalid_period(history: Account):
+    with pytest.raises(ValueError):
+        balance_series(history, 'year')
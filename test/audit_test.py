@@ -0,0 +1,42 @@
+from decimal import Decimal
+
+import pytest
+from account_test import account
+from transaction_test import other_account
+
+from money.account import Account
+from money.audit import find_twin_issues
+from money.transaction import Transaction
+
+
+def test_consistent_ledger(account: Account, other_account: Account):
+    account.pass_money(other_account, '100.00')
+    other_account.pass_money(account, '10.00')
+
+    assert find_twin_issues([account, other_account]) == []
+
+
+def test_broken_twins(account: Account, other_account: Account):
+    orphan = account.pass_money(other_account, '100.00')
+    mismatch = account.pass_money(other_account, '10.00')
+    extra = account.pass_money(other_account, '1.00')
+
+    other_account.transactions.remove(orphan.create_twin())
+    other_account.transactions[-2].value = Decimal('9.00')
+    other_account.transactions.append(extra.create_twin())
+
+    issues = find_twin_issues([account, other_account])
+
+    assert sorted((i.uuid, i.legs, i.problem) for i in issues) == sorted([
+        (orphan.uuid, 1, 'orphan'),
+        (mismatch.uuid, 2, 'mismatch'),
+        (extra.uuid, 3, 'extra legs'),
+    ])
+
+
+def test_same_account(account: Account):
+    transaction = Transaction(value='5.00')
+    account.transactions.extend([transaction, transaction.create_twin()])
+
+    issues = find_twin_issues([account])
+    assert [i.problem for i in issues] == ['same account']
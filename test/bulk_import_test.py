@@ -0,0 +1,167 @@
+import csv
+from datetime import timedelta
+from decimal import Decimal
+from pathlib import Path
+from typing import List
+
+import pytest
+from money.account import Account
+from money.utils import moscow_now
+from orm.account import AccountOrm
+from orm.api import (audit_twins, compact_transactions, create_account,
+                     get_account_balance, get_account_details,
+                     get_category_rollups, merge_imported_transactions,
+                     restore_transactions)
+from orm.bulk_import import import_csv, parse_rows, stage_csv
+from orm_test import (accounts, bank_accounts, close_database, organizations,
+                      prepare_database)
+
+ROWS = 1000
+
+
+@pytest.fixture
+def export(tmp_path: Path) -> Path:
+    path = tmp_path / 'export.csv'
+    start = moscow_now() - timedelta(days=ROWS)
+
+    with open(path, 'w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file)
+        writer.writerow(['timing', 'value', 'category', 'reason'])
+        for number in range(ROWS):
+            timing = (start + timedelta(days=number)).replace(tzinfo=None)
+            writer.writerow([
+                timing.isoformat(), f'{number % 7 - 3},50', 'Food',
+                f'Row {number}'
+            ])
+        writer.writerow(['yesterday', '1.00', '', ''])
+        writer.writerow([start.isoformat(), 'a lot', '', ''])
+    return path
+
+
+def test_parse_rows():
+    rows = [
+        {'timing': '2024-01-01T10:00:00', 'value': '1 000,50'},
+        {'timing': '2024-01-01T10:00:00+00:00', 'value': '-1', 'uuid': ''},
+        {'timing': '2024-01-01', 'value': '1', 'category': 'c' * 21},
+        {'timing': None, 'value': '1'},
+    ]
+
+    records, errors = parse_rows(1, 2, rows)
+
+    assert [number for number, _ in errors] == [4, 5]
+    assert records[0][2] == Decimal('1000.50')
+    assert records[0][4].utcoffset() == timedelta(hours=3)
+    # Uuids of rows without one are derived when merged
+    assert records[0][1] is None and records[1][1] is None
+    assert parse_rows(1, 2, rows)[0] == records
+
+
+@pytest.mark.asyncio
+async def test_import_csv(accounts: List[AccountOrm], export: Path):
+    account_id = accounts[0].id
+    before = await get_account_details(account_id)
+
+    errors = []
+    report = await import_csv(export,
+                              account_id,
+                              workers=2,
+                              chunk_size=64,
+                              on_error=lambda n, e: errors.append(n))
+
+    assert report.rows == ROWS + 2
+    assert report.errors == 2
+    assert sorted(errors) == [ROWS + 2, ROWS + 3]
+    assert report.staged == report.merged == ROWS
+    assert report.rows_per_second > 0
+
+    account = await get_account_details(account_id)
+    assert len(account.transactions) == len(before.transactions) + ROWS
+    assert await get_account_balance(account_id) == account.get_balance()
+
+    rollups = await get_category_rollups(account_id)
+    assert sum(r.count for r in rollups if r.category == 'Food') == ROWS
+
+    again = await import_csv(export, account_id, workers=2)
+    assert again.staged == ROWS
+    assert again.merged == 0
+
+
+@pytest.mark.asyncio
+async def test_resume_merge(accounts: List[AccountOrm], export: Path):
+    account_id = accounts[0].id
+
+    report = await stage_csv(export, account_id, workers=1)
+    assert report.staged == ROWS
+
+    merged = await merge_imported_transactions(account_id, batch_size=300)
+    assert merged == ROWS
+    assert await merge_imported_transactions(account_id) == 0
+
+    account = await get_account_details(account_id)
+    assert await get_account_balance(account_id) == account.get_balance()
+
+
+def write_export(path: Path, rows: List[List[str]]) -> Path:
+    with open(path, 'w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file)
+        writer.writerow(['timing', 'value', 'reason'])
+        writer.writerows(rows)
+    return path
+
+
+@pytest.mark.asyncio
+async def test_overlapping_exports(accounts: List[AccountOrm],
+                                   tmp_path: Path):
+    account_id = accounts[0].id
+    start = (moscow_now() - timedelta(days=90)).replace(tzinfo=None)
+    rows = [[(start + timedelta(days=d)).isoformat(), '1,00', 'Coffee']
+            for d in range(90)]
+    # The same purchase twice at one moment
+    rows.insert(40, rows[40])
+
+    first = write_export(tmp_path / 'first.csv', rows[:61])
+    second = write_export(tmp_path / 'second.csv', rows[30:])
+
+    assert (await import_csv(first, account_id, workers=1)).merged == 61
+    assert (await import_csv(second, account_id, workers=1)).merged == 30
+
+    account = await get_account_details(account_id)
+    coffee = [t for t in account.transactions if t.reason == 'Coffee']
+    assert len(coffee) == len(rows)
+    assert await get_account_balance(account_id) == account.get_balance()
+
+
+@pytest.mark.asyncio
+async def test_import_after_compaction(accounts: List[AccountOrm],
+                                       export: Path):
+    account = await create_account(
+        Account(name='Imported',
+                code='imported',
+                start_date=moscow_now() - timedelta(days=ROWS + 1)))
+    account_id = account.id
+    await import_csv(export, account_id, workers=1)
+    balance = await get_account_balance(account_id)
+
+    issues = await audit_twins()
+    cutoff = moscow_now()
+    archived = await compact_transactions(cutoff, [account_id])
+    assert archived[account_id] > 0
+
+    assert (await import_csv(export, account_id, workers=1)).merged == 0
+    assert (await get_account_details(account_id)).transactions == []
+    assert await get_account_balance(account_id) == balance
+
+    # Restored rows are still known as imported
+    await restore_transactions(cutoff)
+    assert await audit_twins() == issues
+
+
+@pytest.mark.asyncio
+async def test_audit_after_import(accounts: List[AccountOrm], export: Path):
+    issues = await audit_twins()
+
+    report = await import_csv(export, accounts[0].id, workers=1)
+    assert report.merged > 0
+
+    # Imported rows are single legs by design, not orphan twins
+    assert await audit_twins() == issues
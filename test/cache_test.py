@@ -0,0 +1,171 @@
+import asyncio
+
+import pytest
+from orm.cache import AsyncCache, cached
+
+
+class Clock:
+
+    def __init__(self):
+        self.time = 0.0
+
+    def __call__(self) -> float:
+        return self.time
+
+
+@pytest.fixture
+def clock() -> Clock:
+    return Clock()
+
+
+def counting_loader(result='value'):
+    calls = []
+
+    async def load():
+        calls.append(1)
+        await asyncio.sleep(0)
+        return result
+
+    return load, calls
+
+
+@pytest.mark.asyncio
+async def test_cache_hit(clock: Clock):
+    cache = AsyncCache(ttl=10, clock=clock)
+    load, calls = counting_loader()
+
+    assert await cache.get('key', load) == 'value'
+    assert await cache.get('key', load) == 'value'
+
+    assert len(calls) == 1
+    assert cache.stats.hits == 1
+    assert cache.stats.misses == 1
+
+
+@pytest.mark.asyncio
+async def test_cache_expires(clock: Clock):
+    cache = AsyncCache(ttl=10, clock=clock)
+    load, calls = counting_loader()
+
+    await cache.get('key', load)
+    clock.time = 9.9
+    await cache.get('key', load)
+    clock.time = 10
+    await cache.get('key', load)
+
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_cache_evicts_least_recent(clock: Clock):
+    cache = AsyncCache(max_size=2, clock=clock)
+    load, calls = counting_loader()
+
+    await cache.get('a', load)
+    await cache.get('b', load)
+    await cache.get('a', load)
+    await cache.get('c', load)
+
+    assert len(cache) == 2
+    await cache.get('a', load)
+    assert len(calls) == 3
+    await cache.get('b', load)
+    assert len(calls) == 4
+
+
+@pytest.mark.asyncio
+async def test_cache_single_flight():
+    cache = AsyncCache()
+    load, calls = counting_loader()
+
+    results = await asyncio.gather(*(cache.get('key', load)
+                                     for _ in range(10)))
+
+    assert results == ['value'] * 10
+    assert len(calls) == 1
+    assert cache.stats.misses == 1
+    assert cache.stats.hits == 9
+
+
+@pytest.mark.asyncio
+async def test_cache_error_is_not_stored():
+    cache = AsyncCache()
+
+    async def fail():
+        await asyncio.sleep(0)
+        raise RuntimeError('No database')
+
+    results = await asyncio.gather(cache.get('key', fail),
+                                   cache.get('key', fail),
+                                   return_exceptions=True)
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+    load, _ = counting_loader()
+    assert await cache.get('key', load) == 'value'
+
+
+@pytest.mark.asyncio
+async def test_invalidate_during_load():
+    cache = AsyncCache()
+    started = asyncio.Event()
+    release = asyncio.Event()
+
+    async def slow():
+        started.set()
+        await release.wait()
+        return 'stale'
+
+    task = asyncio.create_task(cache.get('key', slow))
+    await started.wait()
+    cache.invalidate()
+    release.set()
+
+    assert await task == 'stale'
+    assert len(cache) == 0
+
+    load, _ = counting_loader('fresh')
+    assert await cache.get('key', load) == 'fresh'
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_keeps_load():
+    cache = AsyncCache()
+    started = asyncio.Event()
+    release = asyncio.Event()
+    calls = []
+
+    async def slow():
+        calls.append(1)
+        started.set()
+        await release.wait()
+        return 'value'
+
+    first = asyncio.create_task(cache.get('key', slow))
+    await started.wait()
+    joiner = asyncio.create_task(cache.get('key', slow))
+    await asyncio.sleep(0)
+
+    first.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await first
+    release.set()
+
+    assert await joiner == 'value'
+    assert await cache.get('key', slow) == 'value'
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_cached_decorator():
+    cache = AsyncCache()
+    load, calls = counting_loader()
+
+    get_value = cached(cache, 'key')(load)
+    assert get_value.__name__ == 'load'
+
+    await get_value()
+    await get_value()
+    cache.invalidate('key')
+    await get_value()
+
+    assert len(calls) == 2
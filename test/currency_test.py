@@ -0,0 +1,90 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+from account_test import account
+from transaction_test import other_account
+
+from money.account import Account
+from money.currency import RateStore
+
+
+@pytest.fixture
+def rates() -> RateStore:
+    return RateStore([
+        ('USD', date(2024, 1, 10), Decimal('90.00')),
+        ('USD', date(2024, 1, 1), Decimal('80.00')),
+        ('EUR', date(2024, 1, 1), Decimal('100.00')),
+    ])
+
+
+@pytest.mark.parametrize('day,rate', [
+    (date(2023, 12, 1), '80.00'),
+    (date(2024, 1, 1), '80.00'),
+    (date(2024, 1, 9), '80.00'),
+    (date(2024, 1, 10), '90.00'),
+    (date(2025, 1, 1), '90.00'),
+])
+def test_nearest_rate(rates: RateStore, day: date, rate: str):
+    assert rates.rate('USD', day) == Decimal(rate)
+
+
+def test_unknown_currency(rates: RateStore):
+    with pytest.raises(KeyError):
+        rates.rate('GBP', date(2024, 1, 1))
+
+
+def test_cache_eviction(rates: RateStore):
+    rates.cache_size = 2
+    for day in range(1, 5):
+        rates.rate('USD', date(2024, 1, day))
+
+    assert len(rates._cache) == 2
+    assert rates.convert(Decimal('1.00'), 'EUR', 'USD',
+                         date(2024, 1, 1)) == Decimal('1.25')
+
+
+def test_from_file(tmp_path):
+    path = tmp_path / 'rates.csv'
+    path.write_text('currency,date,rate\nusd,2024-01-01,80.5\n')
+
+    rates = RateStore.from_file(path)
+    assert rates.rate('USD', date(2024, 2, 1)) == Decimal('80.5')
+
+
+def test_balance_in_currency(account: Account, other_account: Account,
+                             rates: RateStore):
+    time = account.start_date + timedelta(minutes=1)
+    rate = rates.rate('USD', time)
+
+    account.start_balance = Decimal('1000.00')
+    account.pass_money(other_account, '10.00', currency='USD')
+    assert other_account.get_balance(time, 'RUB', rates) == 10 * rate
+
+    account.pass_money(other_account, '100.00')
+
+    assert account.get_balance(time) == Decimal('890.00')
+    assert account.get_balance(time, 'RUB', rates) == 900 - 10 * rate
+    assert other_account.get_balance(time, 'USD', rates) == (
+        10 + (100 / rate).quantize(Decimal('0.01')))
+
+
+def test_cross_currency_transfer(account: Account, other_account: Account,
+                                 rates: RateStore):
+    transaction = account.pass_money(other_account,
+                                     '10.00',
+                                     currency='USD',
+                                     target_currency='RUB',
+                                     rates=rates)
+    twin = other_account.transactions[0]
+    rate = rates.rate('USD', transaction.timing)
+
+    assert twin.currency == 'RUB'
+    assert twin.value == 10 * rate
+    assert transaction.is_twin(twin)
+
+    with pytest.raises(ValueError):
+        account.pass_money(other_account,
+                           '10.00',
+                           'USD',
+                           target_currency='RUB')
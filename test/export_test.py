@@ -0,0 +1,51 @@
+import csv
+import io
+import json
+
+import pytest
+from money.export import EXPORT_COLUMNS, TransactionWriter
+from money.transaction import Transaction
+
+
+@pytest.fixture
+def transactions():
+    return [
+        Transaction(value='10.00', category='Food', reason='Lunch, late'),
+        Transaction(value='-5.50', currency='USD'),
+    ]
+
+
+def test_write_csv(transactions):
+    file = io.StringIO()
+    writer = TransactionWriter(file, 'csv')
+    for transaction in transactions:
+        writer.write(7, transaction)
+
+    file.seek(0)
+    rows = list(csv.DictReader(file))
+
+    assert writer.count == 2
+    assert list(rows[0]) == EXPORT_COLUMNS
+    assert rows[0]['reason'] == 'Lunch, late'
+    assert rows[1]['value'] == '-5.50'
+    assert rows[1]['category'] == ''
+    assert rows[1]['account_id'] == '7'
+
+
+def test_write_jsonl(transactions):
+    file = io.StringIO()
+    writer = TransactionWriter(file, 'jsonl')
+    for transaction in transactions:
+        writer.write(7, transaction)
+
+    records = [json.loads(line) for line in file.getvalue().splitlines()]
+
+    assert len(records) == 2
+    assert records[0]['uuid'] == str(transactions[0].uuid)
+    assert records[1]['category'] is None
+    assert Transaction.model_validate(records[1]) == transactions[1]
+
+
+def test_unknown_format():
+    with pytest.raises(ValueError):
+        TransactionWriter(io.StringIO(), 'xml')
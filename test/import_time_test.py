@@ -0,0 +1,64 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, Tuple
+
+import pytest
+
+ROOT = Path(__file__).parent.parent
+
+# Microseconds, slow machines can raise them with environment variables
+IMPORT_BUDGET = int(os.environ.get('IMPORT_BUDGET_US', 6_000_000))
+OWN_IMPORT_BUDGET = int(os.environ.get('OWN_IMPORT_BUDGET_US', 500_000))
+
+OWN_PACKAGES = ('bot', 'money', 'orm')
+
+
+def import_times(module: str, cwd: Path = ROOT) -> Dict[str, Tuple[int, int]]:
+    """Self and cumulative import time of every imported module"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=cwd,
+        env={
+            **os.environ, 'PYTHONPATH': str(ROOT)
+        },
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        own, cumulative, name = line[len('import time:'):].split('|')
+        if not own.strip().isnumeric():
+            continue
+        times[name.strip()] = (int(own), int(cumulative))
+    return times
+
+
+@pytest.fixture(scope='module')
+def logistics_times() -> Dict[str, Tuple[int, int]]:
+    return import_times('bot.logistics')
+
+
+def test_import_budget(logistics_times):
+    _, cumulative = logistics_times['bot.logistics']
+    assert cumulative <= IMPORT_BUDGET
+
+
+def test_own_import_budget(logistics_times):
+    own = sum(t for name, (t, _) in logistics_times.items()
+              if name.split('.')[0] in OWN_PACKAGES)
+    assert own <= OWN_IMPORT_BUDGET
+
+
+def test_database_driver_not_imported(logistics_times):
+    assert 'asyncpg' not in logistics_times
+
+
+def test_import_without_settings(tmp_path):
+    times = import_times('orm.api', cwd=tmp_path)
+    assert 'orm.api' in times
@@ -0,0 +1,62 @@
+from datetime import timedelta
+from decimal import Decimal
+
+import pytest
+
+from money.bank_account import BankAccount
+from money.interest import accrue_interest, post_interest
+from money.organization import Organization
+from money.transaction import Transaction
+
+
+@pytest.fixture
+def deposit() -> BankAccount:
+    return BankAccount(name='Deposit',
+                       code=200,
+                       start_balance='1000.00',
+                       bank=Organization(name='Some bank', shortcut='bank'),
+                       annual_interest='10.00',
+                       interest_period=timedelta(days=365))
+
+
+def test_constant_balance(deposit: BankAccount):
+    until = deposit.start_date + timedelta(days=365)
+
+    accrual = accrue_interest(deposit, until)
+
+    assert [p.value for p in accrual.postings] == [Decimal('100.00')]
+    assert accrual.postings[0].timing == until
+    assert accrual.pending == Decimal('0.00')
+
+
+def test_changing_balance(deposit: BankAccount):
+    deposit.transactions.append(
+        Transaction(value='1000.00',
+                    timing=deposit.start_date + timedelta(days=182.5)))
+
+    accrual = accrue_interest(deposit,
+                              deposit.start_date + timedelta(days=400))
+
+    assert [p.value for p in accrual.postings] == [Decimal('150.00')]
+    assert accrual.pending == Decimal('20.62')
+
+
+def test_incremental_posting(deposit: BankAccount):
+    first = post_interest(deposit, deposit.start_date + timedelta(days=400))
+    second = post_interest(deposit, deposit.start_date + timedelta(days=800))
+
+    assert [p.value for p in first + second] == [
+        Decimal('100.00'), Decimal('110.00')
+    ]
+    assert post_interest(deposit, deposit.start_date +
+                         timedelta(days=800)) == []
+
+    again = accrue_interest(deposit,
+                            deposit.start_date + timedelta(days=800),
+                            since=deposit.start_date)
+    assert [p.uuid for p in again.postings] == [p.uuid for p in first + second]
+
+
+def test_no_interest(deposit: BankAccount):
+    deposit.annual_interest = Decimal()
+    assert accrue_interest(deposit).postings == []
@@ -0,0 +1,63 @@
+from datetime import timedelta
+from decimal import Decimal
+
+import pytest
+from account_test import account
+from transaction_test import history, naive_balance, other_account
+
+from money.account import Account
+from money.ledger import Ledger
+
+
+@pytest.fixture
+def ledger(history: Account) -> Ledger:
+    return history.to_ledger()
+
+
+def test_ledger_rows(history: Account, ledger: Ledger):
+    assert len(ledger) == len(history.transactions)
+
+    for transaction, row in zip(history.transactions, ledger):
+        assert row == transaction
+        assert row.timing == transaction.timing
+        assert row.currency == transaction.currency
+
+
+@pytest.mark.parametrize('days', [-30, -20, -10, 0, 5, 10, 40])
+def test_ledger_balance(history: Account, ledger: Ledger, days: int):
+    time = history.start_date + timedelta(days=days)
+
+    balance = ledger.balance(time, history.start_date, history.start_balance)
+    assert balance == naive_balance(history, time)
+
+
+def test_ledger_sum(history: Account, ledger: Ledger):
+    since = history.start_date
+    expected = sum(t.value for t in history.transactions if t.timing >= since)
+
+    assert ledger.sum() == sum(t.value for t in history.transactions)
+    assert ledger.sum(since=since) == expected
+
+
+def test_ledger_filter(history: Account, ledger: Ledger):
+    until = history.start_date + timedelta(days=5)
+    expected = [t for t in history.transactions if t.timing <= until]
+
+    filtered = ledger.filter(until=until)
+    assert list(filtered) == expected
+    assert filtered.sum() == sum(t.value for t in expected)
+
+
+def test_ledger_append(history: Account, other_account: Account,
+                       ledger: Ledger):
+    time = history.start_date + timedelta(days=2)
+    ledger.balance(time, history.start_date, history.start_balance)
+
+    transaction = history.pass_money(other_account,
+                                     '12.34',
+                                     timing=history.start_date)
+    ledger.append(transaction)
+
+    balance = ledger.balance(time, history.start_date, history.start_balance)
+    assert balance == naive_balance(history, time)
+    assert ledger[-1].value == Decimal('-12.34')
@@ -0,0 +1,64 @@
+import pytest
+
+from money.account import Account
+from money.bank_account import BankAccount
+from money.lookup import LookupIndex, organization_keys
+from money.organization import Organization
+
+
+@pytest.fixture
+def accounts():
+    return [
+        Account(name='Cash', code='c1'),
+        Account(name='Card', code='c2'),
+        Account(name='Savings', code='100'),
+        Account(name='Salary card', code='sal'),
+    ]
+
+
+@pytest.fixture
+def index(accounts) -> LookupIndex:
+    return LookupIndex(accounts)
+
+
+@pytest.mark.parametrize('text,position', [
+    ('cash', 0),
+    (' CARD ', 1),
+    ('100', 2),
+    ('SAL', 3),
+])
+def test_exact(index: LookupIndex, accounts, text: str, position: int):
+    assert index.get(text) is accounts[position]
+
+
+@pytest.mark.parametrize('prefix,positions', [
+    ('ca', [0, 1]),
+    ('C', [0, 1]),
+    ('s', [3, 2]),
+    ('sal', [3]),
+    ('x', []),
+])
+def test_complete(index: LookupIndex, accounts, prefix: str, positions):
+    assert index.complete(prefix) == [accounts[p] for p in positions]
+
+
+def test_match(index: LookupIndex, accounts):
+    assert index.match('c1') == [accounts[0]]
+    assert index.match('c') == [accounts[0], accounts[1]]
+    assert index.complete('', limit=2) == accounts[:2]
+
+
+def test_organizations():
+    orgs = [Organization(name='Some bank', shortcut='sb')]
+    index = LookupIndex(orgs, keys=organization_keys)
+
+    assert index.get('SB') is orgs[0]
+    assert index.complete('some') == orgs
+
+
+def test_hashable(accounts):
+    org = Organization(name='Some bank', shortcut='sb')
+    bank_account = BankAccount(name='Deposit', code='C1', bank=org)
+
+    assert bank_account in set(accounts)
+    assert {org: 1}[Organization(name='SOME BANK', shortcut='SB')] == 1
@@ -1,4 +1,5 @@
 import pytest
+from money.bank_account import BankAccount
 from money.organization import Organization
 
 
@@ -41,3 +42,13 @@ def test_organization_equal_obj(org: Organization):
 def test_organization_unequal_obj(org: Organization, name: str, shortcut: str):
     other = Organization(name=name, shortcut=shortcut)
     assert org != other
+
+
+def test_bank_account_from_trusted(org: Organization):
+    account = BankAccount(name='Bank account', code=100, bank=org)
+
+    trusted = BankAccount.from_trusted(account.model_dump())
+
+    assert isinstance(trusted.bank, Organization)
+    assert trusted.bank == org
+    assert trusted.annual_interest == account.annual_interest
@@ -1,24 +1,44 @@
 import configparser
+from datetime import date, datetime, timedelta
 from decimal import Decimal
 from typing import List
 
 import orm.api
 import pytest
 import pytest_asyncio
+from bot.forms.pass_money import PassMoneyForm
 from money.account import Account
+from money.analytics import month_start, period_bounds
 from money.bank_account import BankAccount
 from money.organization import Organization
+from money.stock_account import StockAccount
+from money.stock_position import StockTrade
+from money.transaction import Transaction
+from money.utils import MOSCOW, moscow_now
 from orm.account import AccountOrm, TransactionOrm
-from orm.api import (add_transactions, create_account, delete_account,
-                     end_connection, get_account_details, get_accounts,
-                     get_bank_account_details, get_bank_accounts,
-                     get_organization)
+from orm.api import (add_exchange_rates, add_trades, add_transactions,
+                     audit_twins, compact_transactions, create_account,
+                     delete_account, end_connection, export_transactions,
+                     get_account_balance, get_account_balances,
+                     get_account_details, get_account_index,
+                     get_account_ledger, get_accounts,
+                     get_bank_account_details, get_bank_account_index,
+                     get_bank_accounts, get_cache_stats,
+                     get_category_rollups, get_category_totals,
+                     get_organization, get_rate_store,
+                     get_stock_account_details, get_typed_accounts,
+                     iter_transactions, rebuild_category_totals,
+                     restore_transactions, stream_transactions, transfer)
+from orm.balance_checkpoint import BalanceCheckpointOrm
 from orm.bank_account import BankAccountOrm
 from orm.base import Base
+from orm.engine import async_session, engine_options, get_engine, pool_stats
 from orm.exc import InvalidFieldsError
 from orm.organization import OrganizationOrm
+from orm.partitions import ensure_partitions, forget_partitions
 from pydantic import ValidationError
-from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy import event, select, text
+from sqlalchemy.ext.asyncio import create_async_engine
 
 config = configparser.ConfigParser()
 config.read('settings.ini')
@@ -32,14 +52,8 @@ DB_URL = ('postgresql+asyncpg://'
           f'{USER}:{PASSWORD}@'
           f'{HOST}/{DB_NAME}')
 
-async_engine = create_async_engine(DB_URL, pool_size=10, max_overflow=10)
-async_session = async_sessionmaker(
-    async_engine,
-    expire_on_commit=False,
-)
-
-orm.api.engine = async_engine
-orm.api.async_session = async_session
+orm.api.init(DB_URL, pool_size=10, max_overflow=10)
+async_engine = get_engine()
 
 
 @pytest.fixture
@@ -104,6 +118,8 @@ async def prepare_database(organizations, accounts, bank_accounts):
             session.add_all(accounts)
             session.add_all(bank_accounts)
 
+    orm.api.list_cache.invalidate()
+
 
 @pytest_asyncio.fixture(autouse=True)
 async def close_database():
@@ -157,6 +173,18 @@ async def test_get_account_details(accounts):
     assert len(account.transactions) == len(db_account.transactions)
 
 
+@pytest.mark.asyncio
+async def test_get_account_ledger(accounts):
+    account = await get_account_details(accounts[0].id)
+    ledger = await get_account_ledger(accounts[0].id)
+
+    assert len(ledger) == len(account.transactions)
+    assert ledger.sum() == sum(t.value for t in account.transactions)
+    assert (ledger.balance(account.start_date, account.start_date,
+                           account.start_balance) == account.get_balance(
+                               account.start_date))
+
+
 @pytest.mark.asyncio
 async def test_get_bank_account_details(bank_accounts):
     account = bank_accounts[0]
@@ -285,13 +313,13 @@ async def test_pass_money(accounts: List[AccountOrm]):
         len(target.transactions) + 1,
     )
 
-    source.pass_money(
+    leg = source.pass_money(
         target,
         '100.00',
     )
 
-    await add_transactions(source)
-    await add_transactions(target)
+    await add_transactions(source.id, [leg])
+    await add_transactions(target.id, target.transactions[-1:])
 
     source = await get_account_details(accounts[0].id)
     target = await get_account_details(accounts[-1].id)
@@ -325,8 +353,8 @@ async def test_pass_money_starting_empty(accounts: List[AccountOrm]):
         '100.00',
     )
 
-    await add_transactions(source)
-    await add_transactions(target)
+    await add_transactions(source.id, source.transactions)
+    await add_transactions(target.id, target.transactions)
 
     source = await get_account_details(accounts[0].id)
     target = await get_account_details(accounts[-1].id)
@@ -336,3 +364,638 @@ async def test_pass_money_starting_empty(accounts: List[AccountOrm]):
         len(target.transactions),
     ) == expected_count
     assert (source.get_balance(), target.get_balance()) == expected_balance
+
+
+@pytest.mark.asyncio
+async def test_exchange_rates():
+    day = date(2024, 1, 1)
+    await add_exchange_rates([('USD', day, Decimal('80.00'))])
+    await add_exchange_rates([('USD', day, Decimal('90.00')),
+                              ('EUR', day, Decimal('100.00'))])
+
+    rates = await get_rate_store()
+
+    assert rates.rate('USD', day) == Decimal('90.00')
+    assert rates.rate('EUR', day) == Decimal('100.00')
+
+
+@pytest.mark.asyncio
+async def test_category_totals(accounts: List[AccountOrm]):
+    await rebuild_category_totals()
+
+    source = await get_account_details(accounts[0].id)
+    target = await get_account_details(accounts[-1].id)
+
+    legs = [
+        source.pass_money(target, '100.00', category='Food'),
+        source.pass_money(target, '20.00', category='Food'),
+        source.pass_money(target, '5.00'),
+    ]
+
+    assert await add_transactions(source.id, legs) == 3
+    await add_transactions(target.id, target.transactions[-3:])
+    assert await add_transactions(source.id, legs) == 0
+
+    month = month_start(source.transactions[-1].timing)
+    for totals in (await get_category_totals(source.id), await
+                   get_category_rollups(source.id)):
+        food = [t for t in totals if t.category == 'Food']
+        assert [(t.month, t.total, t.count) for t in food] == [
+            (month, Decimal('-120.00'), 2)
+        ]
+        assert sum(t.total for t in totals) == sum(
+            t.value for t in source.transactions)
+
+    assert await get_category_totals() == await get_category_rollups()
+
+
+@pytest.mark.asyncio
+async def test_audit_twins(accounts: List[AccountOrm]):
+    assert await audit_twins() == []
+
+    source = await get_account_details(accounts[0].id)
+    target = await get_account_details(accounts[-1].id)
+
+    orphan = source.pass_money(target, '100.00')
+    await add_transactions(source.id, [orphan])
+
+    issues = await audit_twins()
+    assert [(i.uuid, i.legs, i.problem) for i in issues] == [
+        (orphan.uuid, 1, 'orphan')
+    ]
+
+
+@pytest.mark.asyncio
+async def test_stock_trades(organizations):
+    account = StockAccount(name='Broker account',
+                           code=9999,
+                           broker=Organization.model_validate(
+                               organizations[0], from_attributes=True))
+    account.trades.append(StockTrade(ticker='SBER', quantity=10, price=100))
+
+    account_orm = await create_account(account)
+
+    trade = StockTrade(ticker='SBER', quantity=-4, price=150)
+    await add_trades(account_orm.id, [account.trades[0], trade])
+    await add_trades(account_orm.id, [trade])
+
+    details = await get_stock_account_details(account_orm.id)
+    position = details.get_portfolio().positions['SBER']
+
+    assert len(details.trades) == 2
+    assert position.quantity == 6
+    assert position.realized == 4 * 50
+
+
+@pytest.mark.asyncio
+async def test_account_balances(accounts: List[AccountOrm],
+                                bank_accounts: List[AccountOrm]):
+    history = Account(name='History', code=9999, start_balance='50.00')
+    for days, value in [(-2, '10.00'), (0, '-5.00'), (2, '20.00')]:
+        history.transactions.append(
+            Transaction(value=value,
+                        timing=history.start_date + timedelta(days=days)))
+    history = await create_account(history)
+
+    balances = await get_account_balances()
+    assert len(balances) == len(accounts + bank_accounts) + 1
+
+    for account_orm in accounts + bank_accounts + [history]:
+        account = await get_account_details(account_orm.id)
+
+        for days in (-3, -1, 0, 1, 3):
+            at = account.start_date + timedelta(days=days)
+            expected = account.get_balance(at)
+            assert await get_account_balance(account.id, at) == expected
+
+        assert balances[account.id] == account.get_balance()
+
+    assert await get_account_balance(-1) is None
+
+
+@pytest.mark.asyncio
+async def test_balance_checkpoints():
+    account = Account(name='Long', code=8888, start_balance='100.00')
+    account.start_date -= timedelta(days=100)
+    for days in range(0, 100, 7):
+        account.transactions.append(
+            Transaction(value=days,
+                        timing=account.start_date + timedelta(days=days)))
+    account_orm = await create_account(account)
+
+    async with async_session() as session:
+        result = await session.execute(
+            select(BalanceCheckpointOrm).where(
+                BalanceCheckpointOrm.account_id == account_orm.id).order_by(
+                    BalanceCheckpointOrm.period_end))
+        checkpoints = result.scalars().all()
+
+    assert len(checkpoints) >= 3
+    for checkpoint in checkpoints:
+        before = checkpoint.period_end - timedelta(microseconds=1)
+        assert checkpoint.balance == account.get_balance(before)
+
+    late = Transaction(value='1000.00',
+                       timing=account.start_date + timedelta(days=1))
+    account.transactions.append(late)
+    await add_transactions(account_orm.id, [late])
+
+    for days in (-1, 1, 30, 60, 99, 200):
+        at = account.start_date + timedelta(days=days)
+        expected = account.get_balance(at)
+        assert await get_account_balance(account_orm.id, at) == expected
+
+    recent = await get_account_details(account_orm.id, recent_only=True)
+    assert recent.checkpoint is not None
+    assert len(recent.transactions) < len(account.transactions)
+    assert recent.get_balance() == account.get_balance()
+    with pytest.raises(ValueError):
+        recent.get_balance(account.start_date + timedelta(days=1))
+
+
+@pytest.mark.asyncio
+async def test_balance_at_checkpoint():
+    account = Account(name='Boundary', code=7777, start_balance='10.00')
+    account.start_date -= timedelta(days=70)
+    period_end = period_bounds(account.start_date, moscow_now(),
+                               'month')[1][0]
+    account.transactions = [
+        Transaction(value='1.00',
+                    timing=account.start_date + timedelta(days=1)),
+        Transaction(value='2.00', timing=period_end),
+        Transaction(value='4.00', timing=period_end + timedelta(days=1)),
+    ]
+    account_orm = await create_account(account)
+
+    for at in (period_end - timedelta(microseconds=1), period_end,
+               period_end + timedelta(days=2)):
+        expected = account.get_balance(at)
+        assert await get_account_balance(account_orm.id, at) == expected
+
+    account.set_checkpoint(period_end, Decimal('11.00'))
+    assert account.get_balance(period_end) == Decimal('13.00')
+    assert await get_account_balance(account_orm.id,
+                                     period_end) == Decimal('13.00')
+
+
+@pytest.mark.asyncio
+async def test_add_transactions_skips_known(accounts: List[AccountOrm]):
+    account = await get_account_details(accounts[0].id)
+    known = len(account.transactions)
+
+    start = account.start_date
+    new = [
+        Transaction(value='1.00', timing=start + timedelta(seconds=number))
+        for number in range(2500)
+    ]
+    account.transactions.extend(new)
+
+    assert await add_transactions(account.id, new) == 2500
+    assert await add_transactions(account.id, new) == 0
+
+    # A known transaction sent again with a corrected timing is skipped
+    corrected = new[0].model_copy(
+        update={'timing': start - timedelta(days=40)})
+    assert await add_transactions(account.id, [corrected]) == 0
+
+    loaded = await get_account_details(account.id)
+    assert len(loaded.transactions) == known + 2500
+    assert loaded.get_balance() == account.get_balance()
+
+    rollups = await get_category_rollups(account.id)
+    assert sum(t.count for t in rollups) == 2500
+
+
+@pytest.mark.asyncio
+async def test_transfer(accounts: List[AccountOrm]):
+    source_id, target_id = accounts[0].id, accounts[1].id
+
+    balances = await transfer(source_id,
+                              target_id,
+                              Decimal('25.50'),
+                              category='Food',
+                              reason='Lunch')
+
+    source = await get_account_details(source_id)
+    target = await get_account_details(target_id)
+    assert balances == (source.get_balance(), target.get_balance())
+
+    leg = source.transactions[-1]
+    assert leg.value == Decimal('-25.50')
+    assert leg.category == 'Food' and leg.reason == 'Lunch'
+    assert leg.is_twin(target.transactions[-1])
+
+    with pytest.raises(ValueError):
+        await transfer(source_id, source_id, Decimal('1.00'))
+    with pytest.raises(InvalidFieldsError):
+        await transfer(source_id, -1, Decimal('1.00'))
+
+    assert len((await get_account_details(source_id)).transactions) == len(
+        source.transactions)
+
+
+@pytest.mark.asyncio
+async def test_transfer_statements(accounts: List[AccountOrm]):
+    source_id, target_id = accounts[0].id, accounts[1].id
+    await rebuild_category_totals()
+    await transfer(source_id, target_id, Decimal('1.00'))
+
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(async_engine.sync_engine, 'before_cursor_execute', count)
+    try:
+        balances = await transfer(source_id,
+                                  target_id,
+                                  Decimal('2.00'),
+                                  category='Food')
+    finally:
+        event.remove(async_engine.sync_engine, 'before_cursor_execute',
+                     count)
+
+    # The lock and the transfer itself
+    assert len(statements) == 2
+    source = await get_account_details(source_id)
+    target = await get_account_details(target_id)
+    assert balances == (source.get_balance(), target.get_balance())
+
+    # Checkpoints after a transfer into the past are recomputed
+    timing = moscow_now() - timedelta(days=45)
+    balances = await transfer(source_id,
+                              target_id,
+                              Decimal('4.00'),
+                              timing=timing)
+    source = await get_account_details(source_id)
+    assert balances[0] == source.get_balance()
+    for days in (50, 40, 10):
+        at = moscow_now() - timedelta(days=days)
+        assert await get_account_balance(source_id,
+                                         at) == source.get_balance(at)
+    assert await get_category_totals() == await get_category_rollups()
+
+
+@pytest.mark.asyncio
+async def test_transfer_categories(accounts: List[AccountOrm]):
+    source_id, target_id = accounts[0].id, accounts[1].id
+
+    for category in PassMoneyForm.categories:
+        await transfer(source_id,
+                       target_id,
+                       Decimal('1.00'),
+                       category=category,
+                       reason='Comment of 20 chars.')
+
+    source = await get_account_details(source_id)
+    categories = [t.category for t in source.transactions]
+    assert categories[-len(PassMoneyForm.categories):] == (
+        PassMoneyForm.categories)
+
+    with pytest.raises(ValidationError):
+        await transfer(source_id,
+                       target_id,
+                       Decimal('1.00'),
+                       reason='Comment of 21 chars..')
+
+
+@pytest.mark.asyncio
+async def test_iter_transactions(accounts: List[AccountOrm]):
+    account = await get_account_details(accounts[0].id)
+    start = account.start_date
+    new = [
+        Transaction(value=number, timing=start + timedelta(hours=number // 2))
+        for number in range(23)
+    ]
+    account.transactions.extend(new)
+    await add_transactions(account.id, new)
+
+    # Transactions with equal timing are ordered by insertion
+    expected = [
+        t for _, t in sorted(enumerate(account.transactions),
+                             key=lambda pair: (pair[1].timing, pair[0]),
+                             reverse=True)
+    ]
+
+    walked = [
+        t async for _, t in iter_transactions(account.id, page_size=5)
+    ]
+    assert [t.uuid for t in walked] == [t.uuid for t in expected]
+    assert [t.timing for t in walked] == [t.timing for t in expected]
+
+    page = [x async for x in iter_transactions(account.id, limit=7)]
+    assert len(page) == 7
+
+    cursor = page[-1][0]
+    following = [
+        t async for _, t in iter_transactions(
+            account.id, before=cursor, limit=7, page_size=3)
+    ]
+    assert [t.uuid for t in following] == [t.uuid for t in walked[7:14]]
+
+    backwards = [
+        t async for _, t in iter_transactions(account.id, after=cursor)
+    ]
+    assert [t.uuid for t in backwards] == [t.uuid for t in walked[5::-1]]
+
+    until = start + timedelta(hours=3)
+    bounded = [
+        t async for _, t in iter_transactions(
+            account.id, since=start, until=until)
+    ]
+    assert all(start <= t.timing <= until for t in bounded)
+    assert len(bounded) == len(
+        [t for t in account.transactions if start <= t.timing <= until])
+
+
+@pytest.mark.asyncio
+async def test_engine_options():
+    settings = configparser.ConfigParser()
+    settings.read_string('''
+        [orm]
+        PoolSize = 2
+        MaxOverflow = 1
+        PoolPrePing = yes
+        StatementTimeout = 1500
+    ''')
+
+    engine = create_async_engine(DB_URL, **engine_options(settings['orm']))
+    try:
+        async with engine.connect() as connection:
+            result = await connection.execute(text('SHOW statement_timeout'))
+            assert result.scalar() == '1500ms'
+
+            stats = pool_stats(engine)
+            assert stats.size == 2
+            assert stats.checked_out == 1
+            assert stats.checkouts == 1
+
+        stats = pool_stats(engine)
+        assert stats.checked_out == 0
+        assert stats.checked_in == 1
+        assert stats.wait_time > 0
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_account_lists_cached(accounts: List[AccountOrm]):
+    first = await get_accounts()
+    stats = get_cache_stats()
+
+    assert await get_accounts() is first
+    assert get_cache_stats().hits == stats.hits + 1
+
+    await create_account(Account(name='Cached', code=7777))
+    names = [a.name for a in await get_accounts()]
+    assert 'Cached' in names
+    assert get_cache_stats().misses == stats.misses + 1
+
+    await delete_account(id=accounts[0].id)
+    assert len(await get_accounts()) == len(names) - 1
+
+
+@pytest.mark.asyncio
+async def test_account_index_cached(accounts: List[AccountOrm]):
+    index = await get_account_index()
+    assert await get_account_index() is index
+    assert index.get(accounts[0].name).id == accounts[0].id
+    assert index.get('Indexed') is None
+
+    await create_account(Account(name='Indexed', code=7778))
+    index = await get_account_index()
+    assert index.get('indexed').name == 'Indexed'
+    assert (await get_bank_account_index()).get('indexed') is None
+
+
+@pytest.mark.asyncio
+async def test_stream_transactions(accounts: List[AccountOrm]):
+    streamed = [t.uuid async for _, t in stream_transactions(yield_per=2)]
+    whole = [t.uuid async for _, t in stream_transactions(yield_per=1000)]
+    assert len(streamed) > 2
+    assert sorted(streamed) == sorted(whole)
+
+    account = await get_account_details(accounts[0].id)
+    own = [
+        t async for _, t in stream_transactions(account.id, yield_per=1)
+    ]
+    assert sorted(t.uuid for t in own) == sorted(
+        t.uuid for t in account.transactions)
+
+
+@pytest.mark.asyncio
+async def test_export_transactions(accounts: List[AccountOrm], tmp_path):
+    path = tmp_path / 'export.jsonl'
+    count = await export_transactions(path, 'jsonl', accounts[0].id, 2)
+
+    lines = path.read_text(encoding='utf-8').splitlines()
+    assert count == len(lines) == len(accounts[0].transactions)
+
+    with pytest.raises(ValueError):
+        await export_transactions(tmp_path / 'export.xml', 'xml')
+    assert not (tmp_path / 'export.xml').exists()
+
+
+@pytest.mark.asyncio
+async def test_typed_accounts(accounts: List[AccountOrm],
+                              bank_accounts: List[AccountOrm],
+                              organizations: List[OrganizationOrm]):
+    stock = StockAccount(name='Broker account',
+                         code=9999,
+                         broker=Organization.model_validate(
+                             organizations[1], from_attributes=True))
+    await create_account(stock)
+
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(async_engine.sync_engine, 'before_cursor_execute', count)
+    try:
+        typed = await get_typed_accounts()
+    finally:
+        event.remove(async_engine.sync_engine, 'before_cursor_execute',
+                     count)
+
+    assert len(statements) == 1
+    assert [type(a) for a in typed] == ([Account] * len(accounts) +
+                                        [BankAccount] * len(bank_accounts) +
+                                        [StockAccount])
+    assert typed[len(accounts)].bank.name == organizations[0].name
+    assert typed[-1].broker.name == organizations[1].name
+    assert typed[-1].trades == []
+    assert all(a.transactions == [] for a in typed)
+
+    bank_id = bank_accounts[0].id
+    assert [a.id for a in await get_typed_accounts([bank_id])] == [bank_id]
+
+
+@pytest.mark.asyncio
+async def test_transaction_partitions(accounts: List[AccountOrm]):
+    account = await get_account_details(accounts[0].id)
+    balance = account.get_balance()
+    new = [
+        Transaction(value='1.00',
+                    timing=MOSCOW.localize(datetime(2020, month, 15)))
+        for month in (1, 3)
+    ]
+    account.transactions.extend(new)
+    await add_transactions(account.id, new)
+
+    async with async_session() as session:
+        async with session.begin():
+            await ensure_partitions(session, moscow_now(), moscow_now())
+
+            default = await session.scalar(
+                text('SELECT count(*) FROM transactions_default'))
+            plan = await session.scalars(
+                text('EXPLAIN SELECT id FROM transactions'
+                     " WHERE timing >= '2020-02-01 00:00+03'"
+                     " AND timing < '2020-04-01 00:00+03'"))
+            plan = '\n'.join(plan)
+
+    assert default == 0
+    assert 'transactions_2020_01' not in plan
+    assert 'transactions_2020_02' in plan
+    assert 'transactions_2020_03' in plan
+    assert 'transactions_default' not in plan
+
+    loaded = await get_account_details(account.id)
+    assert len(loaded.transactions) == len(account.transactions)
+    # Transactions before the start date do not change the balance
+    assert await get_account_balance(account.id) == balance
+
+    # Known partitions are not ensured again
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(async_engine.sync_engine, 'before_cursor_execute', count)
+    try:
+        async with async_session() as session:
+            async with session.begin():
+                await ensure_partitions(session, new[0].timing,
+                                        new[-1].timing)
+    finally:
+        event.remove(async_engine.sync_engine, 'before_cursor_execute',
+                     count)
+    assert not any('ensure_transaction_partitions' in s for s in statements)
+
+    # Partitions are checked again once forgotten, e.g. on shutdown
+    forget_partitions()
+    event.listen(async_engine.sync_engine, 'before_cursor_execute', count)
+    try:
+        async with async_session() as session:
+            async with session.begin():
+                await ensure_partitions(session, new[0].timing,
+                                        new[0].timing)
+    finally:
+        event.remove(async_engine.sync_engine, 'before_cursor_execute',
+                     count)
+    assert any('ensure_transaction_partitions' in s for s in statements)
+
+
+@pytest.mark.asyncio
+async def test_compact_transactions():
+    start = moscow_now() - timedelta(days=60)
+    history = Account(name='Old',
+                      code='old',
+                      start_date=start,
+                      start_balance='100.00',
+                      transactions=[
+                          Transaction(value='10.00',
+                                      timing=start + timedelta(days=10)),
+                          Transaction(value='-5.00',
+                                      timing=start + timedelta(days=20)),
+                      ])
+    old = await create_account(history)
+    foreign = await create_account(
+        Account(name='Foreign',
+                code='foreign',
+                start_date=start,
+                transactions=[
+                    Transaction(value='1.00',
+                                currency='USD',
+                                timing=start + timedelta(days=1))
+                ]))
+    linked = await create_account(
+        Account(name='Linked', code='linked', start_date=start))
+    await transfer(linked.id, foreign.id, Decimal('3.00'))
+
+    cutoff = moscow_now()
+    later = cutoff + timedelta(hours=1)
+    at_cutoff = await get_account_balances(at=cutoff)
+    at_later = await get_account_balances(at=later)
+    await rebuild_category_totals()
+    rollups = await get_category_rollups()
+    issues = await audit_twins()
+
+    archived = await compact_transactions(cutoff)
+
+    assert archived[old.id] == 2
+    assert foreign.id not in archived
+    assert linked.id not in archived
+    assert await get_account_balances(at=cutoff) == at_cutoff
+    assert await get_account_balances(at=later) == at_later
+    # Single legs of Old are archived, no twin is left without its leg
+    remaining = await audit_twins()
+    assert len(remaining) == len(issues) - 2
+    assert all(issue in issues for issue in remaining)
+
+    details = await get_account_details(old.id)
+    assert details.transactions == []
+    assert details.start_date == cutoff
+    assert details.start_balance == Decimal('105.00')
+    assert details.get_balance(later) == at_later[old.id]
+
+    # Adding the old history again does not bring archived transactions back
+    assert await add_transactions(old.id, history.transactions) == 0
+    assert (await get_account_details(old.id)).transactions == []
+    assert await get_account_balances(at=later) == at_later
+
+    await rebuild_category_totals()
+    assert await get_category_rollups() == rollups
+    assert await get_category_totals() == rollups
+
+    restored = await restore_transactions(cutoff)
+
+    assert restored == sum(archived.values())
+    details = await get_account_details(old.id)
+    assert len(details.transactions) == 2
+    assert details.start_date == start
+    assert await get_account_balances(at=later) == at_later
+    assert await compact_transactions(start) == {}
+
+
+@pytest.mark.asyncio
+async def test_compact_at_start():
+    cutoff = moscow_now() - timedelta(days=1)
+    account = await create_account(
+        Account(name='Edge',
+                code='edge',
+                start_date=cutoff,
+                start_balance='10.00',
+                transactions=[
+                    Transaction(value='2.00',
+                                timing=cutoff - timedelta(hours=1)),
+                    Transaction(value='5.00', timing=cutoff),
+                    Transaction(value='1.00',
+                                timing=cutoff + timedelta(hours=1)),
+                ]))
+    later = cutoff + timedelta(hours=2)
+    balances = [await get_account_balance(account.id, at)
+                for at in (cutoff, later)]
+
+    # The transaction at the start is kept, it counts after the start
+    assert await compact_transactions(cutoff, [account.id]) == {
+        account.id: 1
+    }
+
+    details = await get_account_details(account.id)
+    assert details.start_balance == Decimal('10.00')
+    assert len(details.transactions) == 2
+    assert [await get_account_balance(account.id, at)
+            for at in (cutoff, later)] == balances
+    assert details.get_balance(later) == balances[1]
@@ -0,0 +1,92 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+
+from money.stock_position import (AVERAGE, FIFO, Portfolio, Position,
+                                  PriceHistory, StockTrade)
+from money.utils import moscow_now
+
+
+@pytest.fixture
+def trades():
+    now = moscow_now()
+    return [
+        StockTrade(ticker='SBER', quantity=10, price=100,
+                   timing=now - timedelta(days=3)),
+        StockTrade(ticker='SBER', quantity=10, price=200,
+                   timing=now - timedelta(days=2)),
+        StockTrade(ticker='SBER', quantity=-15, price=300,
+                   timing=now - timedelta(days=1)),
+        StockTrade(ticker='GAZP', quantity=5, price='150.5', timing=now),
+    ]
+
+
+@pytest.fixture
+def history(tmp_path) -> PriceHistory:
+    PriceHistory.write(tmp_path, [
+        ('SBER', date(2024, 1, 10), Decimal('310')),
+        ('GAZP', date(2024, 1, 1), Decimal('140.25')),
+        ('SBER', date(2024, 1, 1), Decimal('290')),
+    ])
+    return PriceHistory(tmp_path)
+
+
+def test_fifo(trades):
+    position = Portfolio(trades, FIFO).positions['SBER']
+
+    assert position.realized == 10 * 200 + 5 * 100
+    assert position.quantity == 5
+    assert position.average_cost == 200
+    assert [lot.quantity for lot in position.lots] == [5]
+
+
+def test_average(trades):
+    position = Portfolio(trades, AVERAGE).positions['SBER']
+
+    assert position.realized == 15 * (300 - 150)
+    assert position.quantity == 5
+    assert position.average_cost == 150
+
+
+def test_oversell():
+    position = Position('SBER')
+    position.buy(Decimal(1), Decimal(10))
+
+    with pytest.raises(ValueError):
+        position.sell(Decimal(2), Decimal(10))
+
+
+@pytest.mark.parametrize('day,prices', [
+    (date(2023, 12, 31), [None, None, None]),
+    (date(2024, 1, 1), ['290', '140.25', None]),
+    (date(2024, 1, 9), ['290', '140.25', None]),
+    (date(2024, 2, 1), ['310', '140.25', None]),
+])
+def test_price_history(history: PriceHistory, day: date, prices):
+    expected = [p and Decimal(p) for p in prices]
+    assert history.prices(['SBER', 'GAZP', 'LKOH'], day) == expected
+
+
+def test_price_round_trip(tmp_path):
+    price = Decimal('123.4567')
+    PriceHistory.write(tmp_path, [('SBER', date(2024, 1, 1), price)])
+
+    assert PriceHistory(tmp_path).prices(['SBER'], date(2024, 1, 1)) == [
+        price
+    ]
+
+    with pytest.raises(ValueError):
+        PriceHistory.write(tmp_path,
+                           [('SBER', date(2024, 1, 1), Decimal('1.23456'))])
+
+
+def test_valuate(trades, history: PriceHistory):
+    portfolio = Portfolio(trades)
+
+    valuation = portfolio.valuate(history, date(2024, 1, 10))
+
+    assert valuation == {
+        'SBER': (5 * Decimal(310), 5 * Decimal(310 - 200)),
+        'GAZP': (5 * Decimal('140.25'), 5 * Decimal('-10.25')),
+    }
@@ -0,0 +1,77 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from account_test import account
+from transaction_test import history, other_account
+
+from money.account import Account
+from money.text_ledger import read_ledger, write_ledger
+from money.transaction import Transaction
+
+
+def test_round_trip(history: Account):
+    buffer = StringIO()
+
+    count = write_ledger(history.transactions, buffer, chunk_size=4)
+    assert count == len(history.transactions)
+
+    buffer.seek(0)
+    transactions = list(read_ledger(buffer, chunk_size=4))
+
+    assert transactions == history.transactions
+    for read, written in zip(transactions, history.transactions):
+        assert read.timing == written.timing
+        assert read.reason == written.reason
+
+
+def test_round_trip_file(history: Account, tmp_path):
+    path = tmp_path / 'ledger.txt'
+
+    write_ledger(history.transactions, path)
+    assert list(read_ledger(path)) == history.transactions
+
+
+def test_invalid_lines(history: Account):
+    lines = [str(t) for t in history.transactions[:2]]
+    buffer = StringIO('\n'.join([lines[0], 'garbage', '', lines[1]]) + '\n')
+
+    errors = []
+    transactions = list(
+        read_ledger(buffer, on_error=lambda *args: errors.append(args)))
+
+    assert transactions == history.transactions[:2]
+    assert [(number, line) for number, line, _ in errors] == [(2, 'garbage')]
+
+    # Bad lines are reported and skipped by default
+    buffer.seek(0)
+    assert list(read_ledger(buffer)) == history.transactions[:2]
+
+    buffer.seek(0)
+    with pytest.raises(ValueError, match='line 2'):
+        list(read_ledger(buffer, strict=True))
+
+
+@pytest.mark.parametrize('text', [
+    'Lunch, late', 'Rent - May', '"quoted" \\ slash', 'Line\nbreak', '',
+    ' spaced ', 'Кафе: 50%'
+])
+def test_round_trip_punctuation(text: str):
+    transactions = [
+        Transaction(value='-1.00', reason=text),
+        Transaction(value='2.00', category=text),
+    ]
+    buffer = StringIO()
+    write_ledger(transactions, buffer)
+    assert buffer.getvalue().count('\n') == 2
+
+    buffer.seek(0)
+    read = list(read_ledger(buffer))
+    assert [(t.reason, t.category) for t in read] == [(text, None),
+                                                     (None, text)]
+
+
+def test_unquoted_punctuation_rejected(history: Account):
+    line = str(history.transactions[0]).rsplit(' - ', 2)[0]
+    with pytest.raises(ValueError):
+        Transaction.from_str(line + ' - Lunch, late - ')
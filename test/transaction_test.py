@@ -38,3 +38,43 @@ def test_balance(account: Account, other_account: Account,
 
     assert account.get_balance(now) == Decimal('-100.00')
     assert other_account.get_balance(now) == Decimal('100.00')
+
+
+def naive_balance(account: Account, time: datetime) -> Decimal:
+    balance = account.start_balance
+    for transaction in account.transactions:
+        if time <= transaction.timing <= account.start_date:
+            balance -= transaction.value
+        if account.start_date <= transaction.timing <= time:
+            balance += transaction.value
+    return balance
+
+
+@pytest.fixture
+def history(account: Account, other_account: Account) -> Account:
+    start = account.start_date
+    for days, value in [(-20, '10.00'), (-10, '-25.50'), (0, '7.00'),
+                        (5, '100.00'), (5, '-1.00'), (30, '3.33')]:
+        account.pass_money(other_account,
+                           value,
+                           timing=start + timedelta(days=days))
+    return account
+
+
+@pytest.mark.parametrize('days', [-30, -20, -15, -10, 0, 3, 5, 10, 30, 40])
+def test_balance_matches_scan(history: Account, days: int):
+    time = history.start_date + timedelta(days=days)
+    assert history.get_balance(time) == naive_balance(history, time)
+
+
+def test_balance_incremental(history: Account, other_account: Account):
+    time = history.start_date + timedelta(days=7)
+    history.get_balance(time)
+
+    history.pass_money(other_account,
+                       '50.00',
+                       timing=history.start_date + timedelta(days=1))
+    assert history.get_balance(time) == naive_balance(history, time)
+
+    history.transactions = history.transactions[:2]
+    assert history.get_balance(time) == naive_balance(history, time)